@@ -0,0 +1,453 @@
+"""Pan/zoom camera and a culling board renderer for boards larger than the window.
+
+Camera maps world pixels (the coordinates intersections, markers and cars
+already use) to the screen through a viewport. Zoom moves through the
+fixed ZOOM_LEVELS, chosen so a 150px cell is a whole number of pixels at
+every level; cell edges then land on exact pixels and sprites never need
+rescaling while drawing.
+
+BoardRenderer draws only what the viewport shows:
+- Intersections sit in a SpatialIndex bucketed by 8x8 cells, so a frame
+  touches the few buckets on screen instead of every cell of the board.
+- Intersection and car sprites are drawn once at zoom 1 and then
+  pre-scaled once per zoom level (SpriteMips). A frame is a list of
+  ready-made surfaces handed to one Surface.blits() call.
+- Cars move every step, so they are culled with one vectorized bounds
+  test per frame rather than indexed.
+- Below LOD_CELL_PIXELS per cell, sprites would be a few pixels across.
+  The board is then drawn from a one-pixel-per-cell map, scaled up in
+  one blit, and cars become dots written straight into the pixel array.
+"""
+
+import math
+
+import numpy as np
+import pygame
+
+from car import CAR_H, CAR_W
+from intersection import Intersection, IntersectionType
+
+ZOOM_LEVELS = (0.02, 0.04, 0.08, 0.16, 0.32, 0.5, 0.76, 1.0, 1.5, 2.0)
+DEFAULT_ZOOM_INDEX = ZOOM_LEVELS.index(1.0)
+LOD_CELL_PIXELS = 20       # below this many pixels per cell, draw the cell map instead of sprites
+SPATIAL_BUCKET_CELLS = 8   # cells per SpatialIndex bucket side
+ANGLE_STEP = 15            # degrees between pre-rotated car sprites
+CAR_DOT_COLOR = (255, 230, 120)
+SPRITE_SIZE = 72           # intersection sprite side at zoom 1 (arms reach 36px from the centre)
+
+MAP_COLORS = {
+    IntersectionType.FOUR_WAY: (150, 150, 150),
+    IntersectionType.T_INTERSECTION: (130, 130, 130),
+    IntersectionType.Y_INTERSECTION: (120, 140, 160),
+    IntersectionType.ROUNDABOUT: (120, 170, 120),
+    IntersectionType.TRUMPET: (170, 150, 110),
+    IntersectionType.CLOVERLEAF: (110, 150, 190),
+    IntersectionType.PARTIAL_CLOVERLEAF: (140, 130, 180),
+    IntersectionType.DIAMOND: (180, 120, 120),
+}
+
+
+class Camera:
+    """Maps world pixels to a screen viewport at one of ZOOM_LEVELS."""
+
+    def __init__(self, viewport, world, zoom_index=DEFAULT_ZOOM_INDEX):
+        """
+        Initialize the camera, centred on the world.
+
+        Args:
+            viewport: Screen rect the camera draws into
+            world: World rect the camera may show (board plus margin)
+            zoom_index: Index into ZOOM_LEVELS
+        """
+        self.viewport = pygame.Rect(viewport)
+        self.world = pygame.Rect(world)
+        self.zoom_index = zoom_index
+        self.x = 0.0  # world point at the viewport's top-left corner
+        self.y = 0.0
+        self.center_on(*self.world.center)
+
+    @property
+    def zoom(self):
+        """Screen pixels per world pixel."""
+        return ZOOM_LEVELS[self.zoom_index]
+
+    def offset(self):
+        """Whole-pixel screen position of the world origin."""
+        zoom = self.zoom
+        return (self.viewport.x + round(-self.x * zoom), self.viewport.y + round(-self.y * zoom))
+
+    def world_to_screen(self, x, y):
+        """Screen position of a world point."""
+        ox, oy = self.offset()
+        zoom = self.zoom
+        return (ox + round(x * zoom), oy + round(y * zoom))
+
+    def screen_to_world(self, sx, sy):
+        """World point under a screen position."""
+        ox, oy = self.offset()
+        zoom = self.zoom
+        return ((sx - ox) / zoom, (sy - oy) / zoom)
+
+    def visible_world(self):
+        """World (x0, y0, x1, y1) covered by the viewport."""
+        zoom = self.zoom
+        return (self.x, self.y, self.x + self.viewport.width / zoom, self.y + self.viewport.height / zoom)
+
+    def center_on(self, x, y):
+        """Put world point (x, y) at the centre of the viewport."""
+        zoom = self.zoom
+        self.x = x - self.viewport.width / zoom / 2
+        self.y = y - self.viewport.height / zoom / 2
+        self.clamp()
+
+    def pan(self, dx, dy):
+        """Move the view by (dx, dy) screen pixels (content follows the pointer)."""
+        zoom = self.zoom
+        self.x -= dx / zoom
+        self.y -= dy / zoom
+        self.clamp()
+
+    def zoom_by(self, steps, anchor=None):
+        """Zoom in (steps > 0) or out, keeping the world point under anchor in place."""
+        index = max(0, min(len(ZOOM_LEVELS) - 1, self.zoom_index + steps))
+        if index == self.zoom_index:
+            return
+        if anchor is None:
+            anchor = self.viewport.center
+        wx, wy = self.screen_to_world(*anchor)
+        self.zoom_index = index
+        zoom = self.zoom
+        self.x = wx - (anchor[0] - self.viewport.x) / zoom
+        self.y = wy - (anchor[1] - self.viewport.y) / zoom
+        self.clamp()
+
+    def fit(self):
+        """Zoom to the closest level that shows the whole world, centred."""
+        self.zoom_index = 0
+        for index, zoom in enumerate(ZOOM_LEVELS):
+            if self.world.width * zoom <= self.viewport.width and self.world.height * zoom <= self.viewport.height:
+                self.zoom_index = index
+        self.center_on(*self.world.center)
+
+    def clamp(self):
+        """Keep the view over the world; centre it along axes where the world is smaller."""
+        zoom = self.zoom
+        view_w = self.viewport.width / zoom
+        view_h = self.viewport.height / zoom
+        if self.world.width <= view_w:
+            self.x = self.world.centerx - view_w / 2
+        else:
+            self.x = min(max(self.x, self.world.left), self.world.right - view_w)
+        if self.world.height <= view_h:
+            self.y = self.world.centery - view_h / 2
+        else:
+            self.y = min(max(self.y, self.world.top), self.world.bottom - view_h)
+
+
+class SpatialIndex:
+    """Uniform-grid buckets of items by world position."""
+
+    def __init__(self, bucket_size):
+        """
+        Initialize the index.
+
+        Args:
+            bucket_size: Bucket side in world pixels
+        """
+        self.bucket_size = bucket_size
+        self._buckets = {}
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def _key(self, x, y):
+        return (int(x // self.bucket_size), int(y // self.bucket_size))
+
+    def insert(self, item, x, y):
+        """Add item at world position (x, y)."""
+        self._buckets.setdefault(self._key(x, y), []).append(item)
+        self._count += 1
+
+    def remove(self, item, x, y):
+        """Remove item previously inserted at (x, y)."""
+        key = self._key(x, y)
+        bucket = self._buckets.get(key)
+        if bucket and item in bucket:
+            bucket.remove(item)
+            self._count -= 1
+            if not bucket:
+                del self._buckets[key]
+
+    def clear(self):
+        """Remove every item."""
+        self._buckets.clear()
+        self._count = 0
+
+    def query(self, x0, y0, x1, y1):
+        """Items in buckets overlapping the world rect; may include a few just outside it."""
+        bx0, by0 = self._key(x0, y0)
+        bx1, by1 = self._key(x1, y1)
+        buckets = self._buckets
+        found = []
+        for by in range(by0, by1 + 1):
+            for bx in range(bx0, bx1 + 1):
+                bucket = buckets.get((bx, by))
+                if bucket:
+                    found.extend(bucket)
+        return found
+
+
+class SpriteMips:
+    """Sprites rendered once at zoom 1 and pre-scaled once per zoom level."""
+
+    def __init__(self, build):
+        """
+        Initialize the cache.
+
+        Args:
+            build: Function key -> Surface drawing the sprite at zoom 1
+        """
+        self.build = build
+        self._base = {}
+        self._scaled = {}
+
+    def __len__(self):
+        return len(self._scaled)
+
+    def get(self, key, zoom_index):
+        """The sprite for key at ZOOM_LEVELS[zoom_index]."""
+        sprite = self._scaled.get((key, zoom_index))
+        if sprite is None:
+            base = self._base.get(key)
+            if base is None:
+                base = self._base[key] = self.build(key)
+            zoom = ZOOM_LEVELS[zoom_index]
+            if zoom == 1.0:
+                sprite = base
+            else:
+                width, height = base.get_size()
+                size = (max(1, round(width * zoom)), max(1, round(height * zoom)))
+                sprite = pygame.transform.smoothscale(base, size)
+            self._scaled[(key, zoom_index)] = sprite
+        return sprite
+
+
+def build_intersection_sprite(key):
+    """Sprite of an (IntersectionType, rotation, highlighted) key, centred in SPRITE_SIZE."""
+    itype, rotation, highlighted = key
+    surface = pygame.Surface((SPRITE_SIZE, SPRITE_SIZE), pygame.SRCALPHA)
+    intersection = Intersection(None, None, SPRITE_SIZE // 2, SPRITE_SIZE // 2, intersection_type=itype)
+    intersection.rotation = rotation
+    intersection.draw(surface, highlighted=highlighted)
+    return surface
+
+
+def build_car_sprite(key):
+    """Sprite of a (colour, angle step) key, drawn like car.draw_car."""
+    color, step = key
+    surface = pygame.Surface((CAR_W, CAR_H), pygame.SRCALPHA)
+    pygame.draw.rect(surface, color, (0, 0, CAR_W, CAR_H), border_radius=2)
+    pygame.draw.rect(surface, (20, 20, 20), (0, 0, CAR_W, CAR_H), 1, border_radius=2)
+    pygame.draw.rect(surface, (180, 225, 255, 210), (CAR_W - 5, 1, 4, CAR_H - 2), border_radius=1)
+    return pygame.transform.rotate(surface, -step * ANGLE_STEP)
+
+
+def build_cell_map(network, background):
+    """Surface with one pixel per cell: MAP_COLORS for placed cells, background elsewhere."""
+    rgb = np.empty((network.cols, network.rows, 3), dtype=np.uint8)
+    rgb[:] = background
+    for (row, col), intersection in network.placed_intersections.items():
+        rgb[col, row] = MAP_COLORS.get(intersection.intersection_type, (150, 150, 150))
+    return pygame.surfarray.make_surface(rgb)
+
+
+class BoardRenderer:
+    """Draws the visible part of a network, its markers and cars through a Camera."""
+
+    def __init__(self, network, spawn_markers, camera, style):
+        """
+        Initialize the renderer.
+
+        Args:
+            network: IntersectionNetwork to draw
+            spawn_markers: Marker dicts as used by the game
+            camera: Camera to draw through
+            style: Dict of 'cell', 'grid', 'start' and 'end' colours plus
+                'marker_radius' and 'marker_offset' in world pixels
+        """
+        self.network = network
+        self.spawn_markers = spawn_markers
+        self.camera = camera
+        self.style = style
+        self.index = SpatialIndex(SPATIAL_BUCKET_CELLS * network.cell_size)
+        self.intersection_sprites = SpriteMips(build_intersection_sprite)
+        self.car_sprites = SpriteMips(build_car_sprite)
+        self._tiles = {}         # zoom index -> tiled cell pattern
+        self._map = None         # one pixel per cell, for far zoom
+        self._map_view = None    # (key, surface) of the last scaled map crop
+        self._cars = None        # (car states, their coordinate columns)
+        self.drawn = 0           # sprites drawn last frame, for debugging
+        self.refresh()
+
+    def refresh(self):
+        """Re-index the network after intersections were added, moved or removed."""
+        self.index.clear()
+        for intersection in self.network.placed_intersections.values():
+            self.index.insert(intersection, intersection.x, intersection.y)
+        self._map = build_cell_map(self.network, self.style['cell'])
+        self._map_view = None
+
+    def _visible_cells(self):
+        network = self.network
+        x0, y0, x1, y1 = self.camera.visible_world()
+        size = network.cell_size
+        c0 = max(0, int((x0 - network.start_x) // size))
+        r0 = max(0, int((y0 - network.start_y) // size))
+        c1 = min(network.cols, int(math.ceil((x1 - network.start_x) / size)))
+        r1 = min(network.rows, int(math.ceil((y1 - network.start_y) / size)))
+        return r0, r1, c0, c1
+
+    def _tile_pattern(self, cell_px):
+        pattern = self._tiles.get(self.camera.zoom_index)
+        viewport = self.camera.viewport
+        if pattern is None:
+            across = viewport.width // cell_px + 2
+            down = viewport.height // cell_px + 2
+            pattern = pygame.Surface((across * cell_px, down * cell_px))
+            pattern.fill(self.style['grid'])
+            border = max(1, round(3 * self.camera.zoom))
+            for row in range(down):
+                for col in range(across):
+                    pattern.fill(self.style['cell'], (col * cell_px + border, row * cell_px + border,
+                                                      cell_px - 2 * border, cell_px - 2 * border))
+            self._tiles[self.camera.zoom_index] = pattern
+        return pattern
+
+    def _draw_cells(self, screen, r0, r1, c0, c1, cell_px):
+        network = self.network
+        sx, sy = self.camera.world_to_screen(network.start_x + c0 * network.cell_size,
+                                             network.start_y + r0 * network.cell_size)
+        area = pygame.Rect(0, 0, (c1 - c0) * cell_px, (r1 - r0) * cell_px)
+        if cell_px >= LOD_CELL_PIXELS:
+            screen.blit(self._tile_pattern(cell_px), (sx, sy), area)
+            return
+        key = (self.camera.zoom_index, r0, r1, c0, c1)
+        if self._map_view is None or self._map_view[0] != key:
+            crop = self._map.subsurface((c0, r0, c1 - c0, r1 - r0))
+            self._map_view = (key, pygame.transform.scale(crop, area.size))
+        screen.blit(self._map_view[1], (sx, sy))
+
+    def _draw_markers(self, screen):
+        camera = self.camera
+        zoom = camera.zoom
+        style = self.style
+        radius = max(2, round(style['marker_radius'] * zoom))
+        offsets = {'top': (0, -1), 'bottom': (0, 1), 'left': (-1, 0), 'right': (1, 0)}
+        for marker in self.spawn_markers:
+            dx, dy = offsets.get(marker.get('side'), (0, 0))
+            x = marker['x'] + dx * style['marker_offset']
+            y = marker['y'] + dy * style['marker_offset']
+            color = style['start'] if marker['type'] == 'start' else style['end']
+            center = camera.world_to_screen(x, y)
+            if camera.viewport.inflate(2 * radius, 2 * radius).collidepoint(center):
+                pygame.draw.line(screen, color, center, camera.world_to_screen(marker['x'], marker['y']),
+                                 max(1, round(2 * zoom)))
+                pygame.draw.circle(screen, color, center, radius)
+
+    def car_columns(self, car_states):
+        """
+        Car.state() tuples as a 6 x n float array (prev x, y, angle, x, y, angle).
+
+        The same snapshot is often drawn for several frames, so the last
+        conversion is kept and reused while car_states is the same object.
+        """
+        if self._cars is None or self._cars[0] is not car_states:
+            columns = list(zip(*car_states))[:6] or np.empty((6, 0))
+            self._cars = (car_states, np.array(columns, dtype=np.float64))
+        return self._cars[1]
+
+    def _draw_cars(self, screen, car_states, alpha, cell_px):
+        if not car_states:
+            return
+        camera = self.camera
+        zoom = camera.zoom
+        prev_x, prev_y, prev_angle, cur_x, cur_y, cur_angle = self.car_columns(car_states)
+        xs = prev_x + (cur_x - prev_x) * alpha
+        ys = prev_y + (cur_y - prev_y) * alpha
+        ox, oy = camera.offset()
+        sxs = ox + np.round(xs * zoom).astype(np.intp)
+        sys_ = oy + np.round(ys * zoom).astype(np.intp)
+        viewport = camera.viewport
+
+        if cell_px < LOD_CELL_PIXELS:
+            # Far out a car is a dot: write them straight into the pixels.
+            inside = ((sxs >= viewport.left) & (sxs < viewport.right - 1)
+                      & (sys_ >= viewport.top) & (sys_ < viewport.bottom - 1))
+            sx, sy = sxs[inside], sys_[inside]
+            pixels = pygame.surfarray.pixels2d(screen)
+            color = screen.map_rgb(CAR_DOT_COLOR)
+            pixels[sx, sy] = color
+            pixels[sx + 1, sy] = color
+            pixels[sx, sy + 1] = color
+            pixels[sx + 1, sy + 1] = color
+            del pixels  # unlock the surface
+            return
+
+        margin = round(CAR_W * zoom)
+        visible = np.flatnonzero((sxs >= viewport.left - margin) & (sxs <= viewport.right + margin)
+                                 & (sys_ >= viewport.top - margin) & (sys_ <= viewport.bottom + margin))
+        if not len(visible):
+            return
+        turn = (cur_angle[visible] - prev_angle[visible] + 180.0) % 360.0 - 180.0
+        angles = prev_angle[visible] + turn * alpha
+        steps = (np.round(angles / ANGLE_STEP).astype(np.intp) % (360 // ANGLE_STEP)).tolist()
+        get = self.car_sprites.get
+        zoom_index = camera.zoom_index
+        blits = []
+        for i, step, sx, sy in zip(visible.tolist(), steps, sxs[visible].tolist(), sys_[visible].tolist()):
+            sprite = get((car_states[i][6], step), zoom_index)
+            blits.append((sprite, (sx - sprite.get_width() // 2, sy - sprite.get_height() // 2)))
+        screen.blits(blits, doreturn=False)
+        self.drawn += len(blits)
+
+    def draw(self, screen, car_states=(), alpha=1.0, highlighted=None, overlay=None):
+        """
+        Draw the board as seen by the camera.
+
+        car_states are Car.state() tuples, blended by alpha as in draw_car.
+        overlay, if given, is called with the screen after the intersections
+        and before markers and cars (for example a heatmap).
+        """
+        camera = self.camera
+        network = self.network
+        cell_px = round(network.cell_size * camera.zoom)
+        previous_clip = screen.get_clip()
+        screen.set_clip(camera.viewport)
+        self.drawn = 0
+
+        r0, r1, c0, c1 = self._visible_cells()
+        if r1 > r0 and c1 > c0:
+            self._draw_cells(screen, r0, r1, c0, c1, cell_px)
+            if cell_px >= LOD_CELL_PIXELS:
+                x0, y0, x1, y1 = camera.visible_world()
+                reach = SPRITE_SIZE / 2
+                ox, oy = camera.offset()
+                zoom = camera.zoom
+                zoom_index = camera.zoom_index
+                get = self.intersection_sprites.get
+                blits = []
+                for intersection in self.index.query(x0 - reach, y0 - reach, x1 + reach, y1 + reach):
+                    sprite = get((intersection.intersection_type, intersection.rotation % 4,
+                                  intersection is highlighted), zoom_index)
+                    half = sprite.get_width() // 2
+                    blits.append((sprite, (ox + round(intersection.x * zoom) - half,
+                                           oy + round(intersection.y * zoom) - half)))
+                screen.blits(blits, doreturn=False)
+                self.drawn += len(blits)
+
+        if overlay is not None:
+            overlay(screen)
+        self._draw_markers(screen)
+        self._draw_cars(screen, car_states, alpha, cell_px)
+        screen.set_clip(previous_clip)
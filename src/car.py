@@ -1,6 +1,7 @@
 import pygame
 import random
-import math
+
+from route import Route, intern_route
 
 CAR_COLORS = [
     (255, 220, 30),   # yellow
@@ -18,70 +19,131 @@ CAR_SPEED = 80  # pixels per second
 
 
 class Car:
-    """A car that follows a pixel-coordinate path."""
-
-    def __init__(self, path_pixels, speed=CAR_SPEED):
-        self.path = path_pixels          # list of (x, y) waypoints
-        self.path_index = 1              # index of next waypoint to reach
-        self.x = float(path_pixels[0][0])
-        self.y = float(path_pixels[0][1])
+    """A car that follows a shared Route."""
+
+    __slots__ = (
+        'route', 'segment', 'distance', 'x', 'y', 'speed', 'done', 'color', 'angle',
+        'prev_x', 'prev_y', 'prev_angle',
+        'gates', 'gate_index', 'queued', 'travel_time', 'idle_time', 'trip',
+    )
+
+    def __init__(self, route, speed=CAR_SPEED, gates=None, color=None):
+        # Accept a raw list of (x, y) waypoints as well as a prebuilt Route.
+        if not isinstance(route, Route):
+            route = intern_route(route)
+        self.route = route
+        self.distance = 0.0              # pixels travelled along the route
+        self.segment = 0                 # route segment containing distance (lookup hint)
+        self.x, self.y = route.points[0]
         self.speed = speed
         self.done = False
-        self.color = random.choice(CAR_COLORS)
-        self.angle = 0.0                 # degrees, 0 = right
+        self.color = random.choice(CAR_COLORS) if color is None else color
+        self.angle = next((h for h in route.headings if h is not None), 0.0)  # degrees, 0 = right
+
+        # State at the start of the last update, for render interpolation
+        self.prev_x, self.prev_y, self.prev_angle = self.x, self.y, self.angle
+
+        # Intersection service: gates[i] is the (server, axis) that must admit
+        # this car at route.stops[i] before it may continue. None = free-flowing.
+        self.gates = gates
+        self.gate_index = 0              # index of the next gate to clear
+        self.queued = False              # True while waiting in a server queue
 
         # Scoring metrics
         self.travel_time = 0.0           # total seconds this car has been alive
         self.idle_time = 0.0             # seconds spent stationary (speed = 0)
-        self.path_length = self._calc_path_length()  # total pixel distance
 
-    def _calc_path_length(self):
-        total = 0.0
-        for i in range(len(self.path) - 1):
-            dx = self.path[i + 1][0] - self.path[i][0]
-            dy = self.path[i + 1][1] - self.path[i][1]
-            total += math.hypot(dx, dy)
-        return total
+        # Spawn details kept for trip telemetry (None when not recorded)
+        self.trip = None
+
+    @property
+    def path(self):
+        """Waypoints of this car's route."""
+        return self.route.points
+
+    @property
+    def path_length(self):
+        """Total pixel distance of this car's route."""
+        return self.route.length
+
+    def admit(self):
+        """Called by an IntersectionServer when this car may leave its current gate."""
+        self.gate_index += 1
+        self.queued = False
 
     def update(self, dt):
+        self.prev_x, self.prev_y, self.prev_angle = self.x, self.y, self.angle
         if self.done:
             return
-        if self.path_index >= len(self.path):
-            self.done = True
-            return
-
         self.travel_time += dt
 
-        tx, ty = self.path[self.path_index]
-        dx = tx - self.x
-        dy = ty - self.y
-        dist = math.hypot(dx, dy)
-
-        if dist > 0:
-            self.angle = math.degrees(math.atan2(dy, dx))
-
-        move = self.speed * dt
-        if dist <= move:
-            self.x, self.y = float(tx), float(ty)
-            self.path_index += 1
+        # Cars may drive up to the next intersection that has not admitted them.
+        route = self.route
+        limit = route.length
+        gated = self.gates is not None and self.gate_index < len(self.gates)
+        if gated:
+            limit = min(limit, route.stops[self.gate_index])
+
+        moved = min(self.speed * dt, max(limit - self.distance, 0.0))
+        if moved > 0:
+            self.distance += moved
+            self.x, self.y, heading, self.segment = route.locate(self.distance, self.segment)
+            if heading is not None:
+                self.angle = heading
+
+        # Whatever part of dt was not spent driving was spent standing still.
+        if self.speed > 0:
+            self.idle_time += dt - moved / self.speed
         else:
-            self.x += move * dx / dist
-            self.y += move * dy / dist
-
-        # Track idle time (car is blocked if it hasn't moved enough)
-        if move == 0 or dist == 0:
             self.idle_time += dt
 
-    def draw(self, screen):
-        surf = pygame.Surface((CAR_W, CAR_H), pygame.SRCALPHA)
-
-        # Body
-        pygame.draw.rect(surf, self.color, (0, 0, CAR_W, CAR_H), border_radius=2)
-        # Outline
-        pygame.draw.rect(surf, (20, 20, 20), (0, 0, CAR_W, CAR_H), 1, border_radius=2)
-        # Windshield (front-right of surface = front of car)
-        pygame.draw.rect(surf, (180, 225, 255, 210), (CAR_W - 5, 1, 4, CAR_H - 2),
-                         border_radius=1)
+        if self.distance < limit:
+            return
+        if gated:
+            if not self.queued:
+                server, axis = self.gates[self.gate_index]
+                self.queued = server.arrive(self, axis)
+        else:
+            self.done = True
 
-        rotated = pygame.transform.rotate(surf, -self.angle)
-        screen.blit(rotated, rotated.get_rect(center=(int(self.x), int(self.y))))
+    def state(self):
+        """Immutable drawing state: (prev_x, prev_y, prev_angle, x, y, angle, color)."""
+        return (self.prev_x, self.prev_y, self.prev_angle, self.x, self.y, self.angle, self.color)
+
+    def draw(self, screen, alpha=1.0):
+        """Draw the car blended between its last two states (alpha 0 = previous, 1 = current)."""
+        draw_car(screen, self.state(), alpha)
+
+
+def draw_car(screen, state, alpha=1.0):
+    """Draw a car from a Car.state() tuple, blended between its two positions."""
+    prev_x, prev_y, prev_angle, cur_x, cur_y, cur_angle, color = state
+    x = prev_x + (cur_x - prev_x) * alpha
+    y = prev_y + (cur_y - prev_y) * alpha
+    turn = (cur_angle - prev_angle + 180.0) % 360.0 - 180.0
+    angle = prev_angle + turn * alpha
+
+    surf = pygame.Surface((CAR_W, CAR_H), pygame.SRCALPHA)
+
+    # Body
+    pygame.draw.rect(surf, color, (0, 0, CAR_W, CAR_H), border_radius=2)
+    # Outline
+    pygame.draw.rect(surf, (20, 20, 20), (0, 0, CAR_W, CAR_H), 1, border_radius=2)
+    # Windshield (front-right of surface = front of car)
+    pygame.draw.rect(surf, (180, 225, 255, 210), (CAR_W - 5, 1, 4, CAR_H - 2),
+                     border_radius=1)
+
+    rotated = pygame.transform.rotate(surf, -angle)
+    screen.blit(rotated, rotated.get_rect(center=(int(x), int(y))))
+
+
+def draw_car_rect(screen, state, alpha=1.0):
+    """Cheap draw_car: an unrotated rectangle, turned upright on vertical roads."""
+    prev_x, prev_y, _, cur_x, cur_y, angle, color = state
+    x = prev_x + (cur_x - prev_x) * alpha
+    y = prev_y + (cur_y - prev_y) * alpha
+    if 45.0 <= angle % 180.0 < 135.0:
+        w, h = CAR_H, CAR_W
+    else:
+        w, h = CAR_W, CAR_H
+    pygame.draw.rect(screen, color, (int(x) - w // 2, int(y) - h // 2, w, h))
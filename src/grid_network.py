@@ -2,6 +2,11 @@
 
 from collections import deque
 from intersection import Intersection
+from hierarchical_router import HierarchicalRouter
+
+# Grids with at least this many cells route through a HierarchicalRouter
+# instead of running a flat BFS for every query.
+HIERARCHICAL_MIN_CELLS = 32 * 32
 
 # Maps grid direction to (arm needed by current cell, arm needed by neighbour)
 _DIR_ARMS = {
@@ -11,6 +16,14 @@ _DIR_ARMS = {
     'right': ('E', 'W'),
 }
 
+# Maps grid direction to (row offset, col offset)
+_DIR_STEPS = {
+    'up':    (-1,  0),
+    'down':  ( 1,  0),
+    'left':  ( 0, -1),
+    'right': ( 0,  1),
+}
+
 
 class IntersectionNetwork:
     """Manages a grid of typed intersections and pathfinding between them."""
@@ -35,13 +48,16 @@ class IntersectionNetwork:
         # Create the grid structure (all cells)
         self.grid = [[None for _ in range(cols)] for _ in range(rows)]
         self.placed_intersections = {}  # {(row, col): Intersection}
+        self.router = HierarchicalRouter(self) if rows * cols >= HIERARCHICAL_MIN_CELLS else None
     
     def add_intersection(self, intersection):
         """Add a placed intersection to the network."""
         if intersection.snapped and intersection.row is not None and intersection.col is not None:
             self.grid[intersection.row][intersection.col] = intersection
             self.placed_intersections[(intersection.row, intersection.col)] = intersection
-            self._reconnect_neighbors()
+            self._reconnect_around(intersection.row, intersection.col)
+            if self.router is not None:
+                self.router.invalidate(intersection.row, intersection.col)
 
     def remove_intersection(self, intersection):
         """Remove a placed intersection and tear down its connections."""
@@ -50,33 +66,36 @@ class IntersectionNetwork:
             return
         del self.placed_intersections[key]
         self.grid[intersection.row][intersection.col] = None
+        if self.router is not None:
+            self.router.invalidate(*key)
         intersection.snapped = False
         intersection.snapped_row = None
         intersection.snapped_col = None
         intersection.row = None
         intersection.col = None
-        self._reconnect_neighbors()
+        self._reconnect_around(*key)
 
-    def _reconnect_neighbors(self):
-        """Reconnect all intersections using arm-matching: both sides must face each other."""
-        for intersection in self.placed_intersections.values():
-            intersection.neighbors = {}
+    def _reconnect_around(self, row, col):
+        """Reconnect only the cell at (row, col) and its four grid neighbours.
 
-        checks = {
-            'up':    (-1,  0),
-            'down':  ( 1,  0),
-            'left':  ( 0, -1),
-            'right': ( 0,  1),
-        }
+        Connections depend solely on the two cells involved, so an edit never
+        changes links further away; this keeps edits O(1) on large grids.
+        """
+        for dr, dc in ((0, 0),) + tuple(_DIR_STEPS.values()):
+            key = (row + dr, col + dc)
+            intersection = self.placed_intersections.get(key)
+            if intersection is not None:
+                intersection.neighbors = {}
+                self._connect_cell(key[0], key[1], intersection)
 
-        for (row, col), intersection in self.placed_intersections.items():
-            for direction, (dr, dc) in checks.items():
-                nr, nc = row + dr, col + dc
-                if (nr, nc) in self.placed_intersections:
-                    neighbor = self.placed_intersections[(nr, nc)]
-                    my_arm, their_arm = _DIR_ARMS[direction]
-                    if my_arm in intersection.get_arms() and their_arm in neighbor.get_arms():
-                        intersection.connect(direction, neighbor)
+    def _connect_cell(self, row, col, intersection):
+        """Connect one intersection to every neighbour; both arms must face each other."""
+        for direction, (dr, dc) in _DIR_STEPS.items():
+            neighbor = self.placed_intersections.get((row + dr, col + dc))
+            if neighbor is not None:
+                my_arm, their_arm = _DIR_ARMS[direction]
+                if my_arm in intersection.get_arms() and their_arm in neighbor.get_arms():
+                    intersection.connect(direction, neighbor)
     
     def get_intersection(self, row, col):
         """Get an intersection by grid position."""
@@ -91,9 +110,15 @@ class IntersectionNetwork:
     def find_path(self, start_intersection, end_intersection):
         """
         Find shortest path between two intersections using BFS.
+
+        Large grids delegate to the hierarchical router, which trades exact
+        shortest paths for query times that do not grow with grid size.
         
         Returns a list of Intersection objects from start to end.
         """
+        if self.router is not None:
+            return self.router.find_path(start_intersection, end_intersection)
+
         if start_intersection is None or end_intersection is None:
             return []
         
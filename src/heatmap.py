@@ -0,0 +1,184 @@
+"""Congestion heatmap: time-decayed occupancy and idle time per grid patch.
+
+Each grid cell is split into SUBDIVISIONS x SUBDIVISIONS patches, so the
+road between two cells (which runs through the facing halves of both) is
+resolved separately from each cell's centre. Occupancy and idle time decay
+exponentially so the map shows recent traffic, not the whole day. The decay
+is kept as one running scale factor instead of being applied to every
+patch, so an update costs one scatter-add per car regardless of board size.
+
+Drawing builds one small RGB array for the visible patches, turns it into
+a surface with pygame.surfarray, scales it to board size and adds it onto
+the screen in a single BLEND_RGB_ADD blit (cold patches are black and so
+leave the board untouched; a keyed, translucent blit of the same surface
+is an order of magnitude slower). The scaled surface is cached and
+rebuilt every refresh_interval frames, or at once when the camera.Camera
+it is drawn through pans or zooms.
+"""
+
+import math
+
+import numpy as np
+import pygame
+
+SUBDIVISIONS = 4         # patches per cell along each axis
+HALF_LIFE = 5.0          # simulated seconds for old traffic to fade by half
+IDLE_WEIGHT = 2.0        # a waiting car heats its patch this much more than a moving one
+OVERLAY_STRENGTH = 0.6  # fraction of the heat colour added onto the board
+REFRESH_INTERVAL = 3     # frames between surface rebuilds
+
+
+class CongestionHeatmap:
+    """Occupancy/idle accumulator and overlay for one board."""
+
+    def __init__(self, rows, cols, start_x, start_y, cell_size, subdivisions=SUBDIVISIONS,
+                 half_life=HALF_LIFE):
+        """
+        Initialize the heatmap.
+
+        Args:
+            rows, cols: Grid size in cells
+            start_x, start_y: Screen position of the grid's top-left corner
+            cell_size: Cell size in pixels
+            subdivisions: Patches per cell along each axis
+            half_life: Simulated seconds for accumulated traffic to halve
+        """
+        self.rows = rows
+        self.cols = cols
+        self.start_x = start_x
+        self.start_y = start_y
+        self.cell_size = cell_size
+        self.subdivisions = subdivisions
+        self.tau = half_life / math.log(2)
+        self.shape = (rows * subdivisions, cols * subdivisions)
+        # Stored values are inflated by 1/_scale; _scale shrinks as time passes.
+        self._occupancy = np.zeros(self.shape, dtype=np.float64)
+        self._idle = np.zeros(self.shape, dtype=np.float64)
+        self._scale = 1.0
+        self.refresh_interval = REFRESH_INTERVAL
+        self._frames = 0
+        self._surface = None   # reused scale target
+        self._overlay = None   # what draw() blits: _surface, or None when off screen
+        self._surface_pos = (0, 0)
+        self._view = None      # what _overlay was built for; a pan or zoom rebuilds it
+
+    def reset(self):
+        """Forget all accumulated traffic."""
+        self._occupancy.fill(0.0)
+        self._idle.fill(0.0)
+        self._scale = 1.0
+        self._overlay = None
+        self._frames = 0
+
+    @property
+    def occupancy(self):
+        """Decayed car-seconds spent in each patch."""
+        return self._occupancy * self._scale
+
+    @property
+    def idle(self):
+        """Decayed car-seconds spent standing still in each patch."""
+        return self._idle * self._scale
+
+    def accumulate(self, car_states, elapsed):
+        """
+        Decay the map by elapsed simulated seconds and add the cars' time.
+
+        car_states: Car.state() tuples, as published in a SimSnapshot. A car
+        whose position did not change over its last step counts as idle.
+        """
+        if elapsed <= 0:
+            return
+        self._scale *= math.exp(-elapsed / self.tau)
+        if self._scale < 1e-12:
+            # Fold the scale back in before the stored values overflow.
+            self._occupancy *= self._scale
+            self._idle *= self._scale
+            self._scale = 1.0
+        if not car_states:
+            return
+
+        states = np.array([state[:5] for state in car_states], dtype=np.float64)
+        x = states[:, 3]
+        y = states[:, 4]
+        idle = (x == states[:, 0]) & (y == states[:, 1])
+        scale = self.subdivisions / self.cell_size
+        col = np.floor((x - self.start_x) * scale).astype(np.intp)
+        row = np.floor((y - self.start_y) * scale).astype(np.intp)
+        height, width = self.shape
+        inside = (row >= 0) & (row < height) & (col >= 0) & (col < width)
+        flat = row[inside] * width + col[inside]
+        weight = elapsed / self._scale
+        np.add.at(self._occupancy.reshape(-1), flat, weight)
+        idle_flat = flat[idle[inside]]
+        if len(idle_flat):
+            np.add.at(self._idle.reshape(-1), idle_flat, weight)
+
+    def heat(self, rows=slice(None), cols=slice(None)):
+        """0-1 heat per patch: average cars present, with waiting cars weighted up."""
+        load = self._occupancy[rows, cols] + (IDLE_WEIGHT - 1.0) * self._idle[rows, cols]
+        return np.clip(load * (self._scale / self.tau), 0.0, 1.0)
+
+    def _visible_patches(self, x0, y0, x1, y1):
+        """Patch row/col bounds overlapping the board-space rect (x0, y0)-(x1, y1)."""
+        patch = self.cell_size / self.subdivisions
+        height, width = self.shape
+        c0 = max(0, int((x0 - self.start_x) // patch))
+        r0 = max(0, int((y0 - self.start_y) // patch))
+        c1 = min(width, int(math.ceil((x1 - self.start_x) / patch)))
+        r1 = min(height, int(math.ceil((y1 - self.start_y) / patch)))
+        return r0, r1, c0, c1
+
+    def _build_surface(self, view, camera=None):
+        r0, r1, c0, c1 = self._visible_patches(*view)
+        if r1 <= r0 or c1 <= c0:
+            return None, (0, 0)
+        patch = self.cell_size / self.subdivisions
+        zoom = 1.0 if camera is None else camera.zoom
+        heat = self.heat(slice(r0, r1), slice(c0, c1))
+        # Zoomed far out, several patches share a pixel: keep the hottest.
+        step = max(1, int(1.0 / (patch * zoom)))
+        if step > 1:
+            rows, cols = heat.shape[0] // step, heat.shape[1] // step
+            if rows and cols:
+                heat = heat[:rows * step, :cols * step].reshape(rows, step, cols, step).max(axis=(1, 3))
+                r1, c1 = r0 + rows * step, c0 + cols * step
+        heat = heat.T  # surfarray indexes [x, y]
+        rgb = np.zeros(heat.shape + (3,), dtype=np.uint8)
+        # Green (light traffic) through yellow to red (jammed); cold patches
+        # stay black, which the additive blit leaves unchanged.
+        strength = OVERLAY_STRENGTH * 255.0
+        rgb[..., 0] = (np.minimum(1.0, 2.0 * heat) * strength).astype(np.uint8)
+        rgb[..., 1] = (np.minimum(1.0, 2.0 * (1.0 - heat)) * strength).astype(np.uint8)
+        rgb[heat < 0.02] = 0
+        small = pygame.surfarray.make_surface(rgb)
+        x, y = self.start_x + c0 * patch, self.start_y + r0 * patch
+        if camera is None:
+            pos = (int(x), int(y))
+            size = (int(round((c1 - c0) * patch)), int(round((r1 - r0) * patch)))
+        else:
+            pos = camera.world_to_screen(x, y)
+            end = camera.world_to_screen(self.start_x + c1 * patch, self.start_y + r1 * patch)
+            size = (max(1, end[0] - pos[0]), max(1, end[1] - pos[1]))
+        if self._surface is None or self._surface.get_size() != size:
+            self._surface = pygame.Surface(size)
+        pygame.transform.scale(small, size, self._surface)
+        return self._surface, pos
+
+    def draw(self, screen, camera=None):
+        """
+        Blit the overlay onto the part of the board that is on screen.
+
+        With a camera.Camera the board is seen through it; otherwise board
+        coordinates are screen coordinates.
+        """
+        if camera is None:
+            view = (0, 0) + screen.get_size()
+        else:
+            view = camera.visible_world() + (camera.zoom,)
+        if self._frames % self.refresh_interval == 0 or view != self._view:
+            self._view = view
+            self._overlay, self._surface_pos = self._build_surface(view[:4], camera)
+        self._frames += 1
+        if self._overlay is not None:
+            screen.blit(self._overlay, self._surface_pos, special_flags=pygame.BLEND_RGB_ADD)
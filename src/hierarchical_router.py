@@ -0,0 +1,349 @@
+"""Hierarchical (HPA*-style) pathfinding for large intersection grids.
+
+The grid is split into square clusters. Roads that cross a cluster border
+become entrances, and the shortest in-cluster route between every pair of
+entrances is cached. A query only searches inside the start and end clusters
+plus the small abstract graph of entrances, so its cost depends on the
+number of clusters crossed rather than the number of placed intersections.
+
+Only repeated queries are guaranteed to take well under a millisecond:
+found paths are cached per (start, end) cell pair until the next edit.
+A cold query still runs two in-cluster searches plus the abstract search
+and takes on the order of 1-3 ms on a 200x200 grid, growing with the
+distance between the clusters crossed.
+"""
+
+import heapq
+from collections import deque
+
+_STEPS = {
+    'up':    (-1,  0),
+    'down':  ( 1,  0),
+    'left':  ( 0, -1),
+    'right': ( 0,  1),
+}
+
+# Border spans at least this long get an entrance at each end instead of one
+# in the middle, which keeps detours short along long straight roads.
+_LONG_SPAN = 6
+
+
+class HierarchicalRouter:
+    """Answers path queries on an IntersectionNetwork using cached cluster entrances."""
+
+    def __init__(self, network, cluster_size=16):
+        """
+        Initialize the router.
+
+        Args:
+            network: IntersectionNetwork whose placed intersections are routed over
+            cluster_size: Width and height of each cluster in grid cells
+        """
+        self.network = network
+        self.cluster_size = cluster_size
+        self.cluster_rows = (network.rows + cluster_size - 1) // cluster_size
+        self.cluster_cols = (network.cols + cluster_size - 1) // cluster_size
+
+        self._borders = {}   # {(cluster_a, cluster_b): [(cell_a, cell_b), ...]}
+        self._nodes = {}     # {cluster: set of entrance cells}
+        self._intra = {}     # {cluster: {cell: {other_cell: path}}}
+        self._links = {}     # {entrance cell: [(other_cell, cost), ...]}
+        self._dirty = {
+            (cr, cc)
+            for cr in range(self.cluster_rows)
+            for cc in range(self.cluster_cols)
+        }
+        self._path_cache = {}
+
+    def cluster_of(self, row, col):
+        """Return the (cluster_row, cluster_col) that owns a grid cell."""
+        return row // self.cluster_size, col // self.cluster_size
+
+    def invalidate(self, row, col):
+        """Mark the cluster containing (row, col) for a refresh before the next query."""
+        self._dirty.add(self.cluster_of(row, col))
+        self.clear_cache()
+
+    def clear_cache(self):
+        """Forget every found path, so the next queries search from scratch."""
+        self._path_cache.clear()
+
+    def find_path(self, start_intersection, end_intersection):
+        """
+        Find a path between two intersections.
+
+        Returns a list of Intersection objects from start to end, or [] when
+        the two are not connected.
+        """
+        if start_intersection is None or end_intersection is None:
+            return []
+        if start_intersection == end_intersection:
+            return [start_intersection]
+
+        start = (start_intersection.row, start_intersection.col)
+        end = (end_intersection.row, end_intersection.col)
+        key = (start, end)
+        cells = self._path_cache.get(key)
+        if cells is None:
+            self._refresh()
+            cells = self._find_cells(start, end)
+            self._path_cache[key] = cells
+
+        placed = self.network.placed_intersections
+        return [placed[cell] for cell in cells]
+
+    # ------------------------------------------------------------------
+    # Abstract graph maintenance
+    # ------------------------------------------------------------------
+
+    def _refresh(self):
+        """Rebuild borders and entrance distances for dirty clusters only."""
+        if not self._dirty:
+            return
+
+        dirty = self._dirty
+        self._dirty = set()
+        touched = set(dirty)
+        for cluster in dirty:
+            for other in self._adjacent_clusters(cluster):
+                self._rebuild_border(cluster, other)
+                touched.add(other)
+
+        for cluster in touched:
+            nodes = self._collect_nodes(cluster)
+            if cluster in dirty or nodes != self._nodes.get(cluster):
+                self._nodes[cluster] = nodes
+                self._intra[cluster] = self._build_intra(cluster, nodes)
+
+        # Border links point into neighbouring clusters, so refresh one ring wider.
+        relink = set(touched)
+        for cluster in touched:
+            relink.update(self._adjacent_clusters(cluster))
+        for cluster in relink:
+            self._build_links(cluster)
+
+    def _adjacent_clusters(self, cluster):
+        cr, cc = cluster
+        for dr, dc in _STEPS.values():
+            nr, nc = cr + dr, cc + dc
+            if 0 <= nr < self.cluster_rows and 0 <= nc < self.cluster_cols:
+                yield nr, nc
+
+    def _rebuild_border(self, a, b):
+        """Recompute the entrances on the shared border between clusters a and b."""
+        if b < a:
+            a, b = b, a
+        size = self.cluster_size
+        placed = self.network.placed_intersections
+
+        if a[0] == b[0]:
+            # Side-by-side clusters: crossings run left → right.
+            col = b[1] * size - 1
+            lo, hi = a[0] * size, min((a[0] + 1) * size, self.network.rows)
+            pairs = [((r, col), (r, col + 1)) for r in range(lo, hi)]
+            direction = 'right'
+        else:
+            # Stacked clusters: crossings run up → down.
+            row = b[0] * size - 1
+            lo, hi = a[1] * size, min((a[1] + 1) * size, self.network.cols)
+            pairs = [((row, c), (row + 1, c)) for c in range(lo, hi)]
+            direction = 'down'
+
+        # A span is a run of crossings whose cells are also linked to each
+        # other along the border on both sides, so any one of them can stand
+        # in for the rest without losing connectivity.
+        along = 'down' if direction == 'right' else 'right'
+        spans = []
+        span = []
+        for cell_a, cell_b in pairs:
+            intersection = placed.get(cell_a)
+            if intersection is None or intersection.get_neighbor(direction) is None:
+                span = []
+                continue
+            if span:
+                prev_a, prev_b = span[-1]
+                if not (placed[prev_a].get_neighbor(along) is intersection
+                        and placed[prev_b].get_neighbor(along) is placed[cell_b]):
+                    span = []
+            if not span:
+                spans.append(span)
+            span.append((cell_a, cell_b))
+
+        transitions = []
+        for span in spans:
+            if len(span) >= _LONG_SPAN:
+                transitions.append(span[0])
+                transitions.append(span[-1])
+            else:
+                transitions.append(span[len(span) // 2])
+
+        self._borders[(a, b)] = transitions
+
+    def _collect_nodes(self, cluster):
+        nodes = set()
+        for other in self._adjacent_clusters(cluster):
+            a, b = (cluster, other) if cluster < other else (other, cluster)
+            for cell_a, cell_b in self._borders.get((a, b), ()):
+                nodes.add(cell_a if a == cluster else cell_b)
+        return nodes
+
+    def _build_intra(self, cluster, nodes):
+        """Shortest in-cluster path between every pair of entrance cells."""
+        intra = {}
+        for node in nodes:
+            parents = self._bfs_in_cluster(node, cluster)
+            intra[node] = {
+                other: path
+                for other in nodes
+                if other != node
+                for path in [self._trace(parents, other)]
+                if path
+            }
+        return intra
+
+    def _build_links(self, cluster):
+        """Flatten in-cluster paths and border crossings into one adjacency list per entrance."""
+        placed = self.network.placed_intersections
+        intra = self._intra.get(cluster, {})
+        for node in self._nodes.get(cluster, ()):
+            links = [(other, len(path) - 1) for other, path in intra[node].items()]
+            intersection = placed[node]
+            for direction in ('up', 'down', 'left', 'right'):
+                neighbor = intersection.get_neighbor(direction)
+                if neighbor is None:
+                    continue
+                nxt = (neighbor.row, neighbor.col)
+                other_cluster = self.cluster_of(*nxt)
+                if other_cluster != cluster and nxt in self._nodes.get(other_cluster, ()):
+                    links.append((nxt, 1))
+            self._links[node] = links
+
+    # ------------------------------------------------------------------
+    # Search helpers
+    # ------------------------------------------------------------------
+
+    def _in_cluster(self, cell, cluster):
+        return (cell[0] // self.cluster_size, cell[1] // self.cluster_size) == cluster
+
+    def _bfs_in_cluster(self, start, cluster):
+        """Breadth-first search from start that never leaves its cluster. Returns parents."""
+        placed = self.network.placed_intersections
+        parents = {start: None}
+        queue = deque([start])
+        while queue:
+            cell = queue.popleft()
+            intersection = placed[cell]
+            for direction in ('up', 'down', 'left', 'right'):
+                neighbor = intersection.get_neighbor(direction)
+                if neighbor is None:
+                    continue
+                nxt = (neighbor.row, neighbor.col)
+                if nxt not in parents and self._in_cluster(nxt, cluster):
+                    parents[nxt] = cell
+                    queue.append(nxt)
+        return parents
+
+    @staticmethod
+    def _trace(parents, target):
+        if target not in parents:
+            return []
+        path = []
+        cell = target
+        while cell is not None:
+            path.append(cell)
+            cell = parents[cell]
+        path.reverse()
+        return path
+
+    def _find_cells(self, start, end):
+        placed = self.network.placed_intersections
+        if start not in placed or end not in placed:
+            return []
+
+        start_cluster = self.cluster_of(*start)
+        end_cluster = self.cluster_of(*end)
+
+        start_parents = self._bfs_in_cluster(start, start_cluster)
+        if start_cluster == end_cluster:
+            local = self._trace(start_parents, end)
+            if local:
+                return local
+        end_parents = self._bfs_in_cluster(end, end_cluster)
+
+        # Virtual edges from the query endpoints to their cluster entrances.
+        start_links = {}
+        for node in self._nodes.get(start_cluster, ()):
+            path = self._trace(start_parents, node)
+            if path:
+                start_links[node] = path
+        end_links = {}
+        for node in self._nodes.get(end_cluster, ()):
+            path = self._trace(end_parents, node)
+            if path:
+                end_links[node] = path[::-1]
+
+        abstract = self._abstract_search(start_links, end_links, end)
+        if abstract is None:
+            return []
+
+        # Refine the abstract route into concrete cells.
+        first, last = abstract[0], abstract[-1]
+        cells = list(start_links[first])
+        for prev, node in zip(abstract, abstract[1:]):
+            cluster = self.cluster_of(*prev)
+            if self.cluster_of(*node) != cluster:
+                cells.append(node)
+                continue
+            cells.extend(self._intra[cluster][prev][node][1:])
+        cells.extend(end_links[last][1:])
+        return cells
+
+    def _abstract_search(self, start_links, end_links, end):
+        """A* over entrance nodes. Returns the entrance sequence or None."""
+        def heuristic(cell):
+            return abs(cell[0] - end[0]) + abs(cell[1] - end[1])
+
+        # Heap entries break f-ties toward the deepest node, which keeps the
+        # search from flooding the many equal-cost fronts of an open grid.
+        links = self._links
+        open_heap = []
+        best = {}
+        parents = {}
+        for node, path in start_links.items():
+            cost = len(path) - 1
+            best[node] = cost
+            parents[node] = None
+            heapq.heappush(open_heap, (cost + heuristic(node), -cost, node))
+
+        best_goal = None
+        best_goal_cost = float('inf')
+        while open_heap:
+            estimate, neg_cost, node = heapq.heappop(open_heap)
+            if estimate >= best_goal_cost:
+                break
+            cost = -neg_cost
+            if cost > best.get(node, float('inf')):
+                continue
+
+            if node in end_links:
+                total = cost + len(end_links[node]) - 1
+                if total < best_goal_cost:
+                    best_goal_cost = total
+                    best_goal = node
+
+            for nxt, step_cost in links.get(node, ()):
+                new_cost = cost + step_cost
+                if new_cost < best.get(nxt, float('inf')):
+                    best[nxt] = new_cost
+                    parents[nxt] = node
+                    heapq.heappush(open_heap, (new_cost + heuristic(nxt), -new_cost, nxt))
+
+        if best_goal is None:
+            return None
+        route = []
+        node = best_goal
+        while node is not None:
+            route.append(node)
+            node = parents[node]
+        route.reverse()
+        return route
@@ -0,0 +1,231 @@
+"""Input sources for the game loop, with recording and replay.
+
+The game loop reads time and input only through an input source:
+tick() once per frame, get_events() for that frame's events and now_ms()
+for timestamps. LiveInput wraps pygame's clock and event queue and can
+record what it sees to a compact binary log; ReplayInput plays such a log
+back, frame for frame, without waiting on a real clock.
+
+Log layout (little-endian):
+    header  b'CLIN', u16 version, u8 has_seed, u32 seed
+    frame   b'F', u16 frame milliseconds
+    pointer b'P', u8 kind, u8 pointer, u8 button, f32 x, f32 y
+    key     b'K', u8 down, i32 key
+    wheel   b'W', i32 x, i32 y
+    quit    b'Q'
+
+Version 1 logs have no wheel records and still replay.
+"""
+
+import struct
+import time
+
+import pygame
+
+MAGIC = b'CLIN'
+VERSION = 2
+
+_HEADER = struct.Struct('<4sHBI')
+_FRAME = struct.Struct('<H')
+_POINTER = struct.Struct('<BBBff')
+_KEY = struct.Struct('<Bi')
+_WHEEL = struct.Struct('<ii')
+
+_KINDS = ('down', 'up', 'move')
+_POINTERS = ('mouse', 'touch')
+_MOUSE_TYPES = {
+    'down': pygame.MOUSEBUTTONDOWN,
+    'up': pygame.MOUSEBUTTONUP,
+    'move': pygame.MOUSEMOTION,
+}
+_TOUCH_TYPES = {
+    'down': pygame.FINGERDOWN,
+    'up': pygame.FINGERUP,
+    'move': pygame.FINGERMOTION,
+}
+
+
+class InputRecorder:
+    """Appends frames and input events to a binary session log."""
+
+    def __init__(self, path, seed=None):
+        self._file = open(path, 'wb')
+        self._file.write(_HEADER.pack(MAGIC, VERSION, seed is not None, seed or 0))
+
+    def frame(self, ms):
+        self._file.write(b'F' + _FRAME.pack(max(0, min(int(ms), 0xFFFF))))
+
+    def pointer(self, normalized):
+        x, y = normalized['pos']
+        self._file.write(b'P' + _POINTER.pack(
+            _KINDS.index(normalized['kind']),
+            _POINTERS.index(normalized['pointer']),
+            normalized['button'],
+            x, y,
+        ))
+
+    def key(self, down, key):
+        self._file.write(b'K' + _KEY.pack(bool(down), key))
+
+    def wheel(self, x, y):
+        self._file.write(b'W' + _WHEEL.pack(x, y))
+
+    def quit(self):
+        self._file.write(b'Q')
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+class LiveInput:
+    """Real clock and event queue, optionally recorded to a session log."""
+
+    def __init__(self, record_path=None, seed=None, normalize=None, width=800, height=600):
+        """
+        Initialize live input.
+
+        Args:
+            record_path: Where to write the session log (None = do not record)
+            seed: Seed of the session, stored in the log header for replay
+            normalize: normalize_pointer_event-style function used to pick
+                out pointer events when recording
+            width, height: Window size, used to normalize touch positions
+        """
+        self._clock = pygame.time.Clock()
+        self.normalize = normalize
+        self.width = width
+        self.height = height
+        self.recorder = InputRecorder(record_path, seed) if record_path else None
+
+    def tick(self, fps=60):
+        """Wait for the next frame and return the elapsed milliseconds."""
+        ms = self._clock.tick(fps)
+        if self.recorder:
+            self.recorder.frame(ms)
+        return ms
+
+    def get_events(self):
+        """Return this frame's events from the pygame queue."""
+        events = pygame.event.get()
+        recorder = self.recorder
+        if recorder:
+            for event in events:
+                normalized = self.normalize(event, self.width, self.height)
+                if normalized:
+                    recorder.pointer(normalized)
+                elif event.type in (pygame.KEYDOWN, pygame.KEYUP):
+                    recorder.key(event.type == pygame.KEYDOWN, event.key)
+                elif event.type == pygame.MOUSEWHEEL:
+                    recorder.wheel(event.x, event.y)
+                elif event.type == pygame.QUIT:
+                    recorder.quit()
+        return events
+
+    def now_ms(self):
+        return pygame.time.get_ticks()
+
+    def close(self):
+        if self.recorder:
+            self.recorder.close()
+
+
+def read_log(path, width=800, height=600):
+    """
+    Parse a session log.
+
+    width and height are the window size touch positions are scaled by.
+    Returns (seed, frames) where seed is None if none was recorded and each
+    frame is (milliseconds, [pygame events]).
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, has_seed, seed = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC or not 1 <= version <= VERSION:
+        raise ValueError(f"{path} is not a version 1-{VERSION} session log")
+
+    frames = []
+    events = None
+    offset = _HEADER.size
+    while offset < len(data):
+        tag = data[offset:offset + 1]
+        offset += 1
+        if tag != b'F' and events is None:
+            raise ValueError("session log has events before its first frame")
+        if tag == b'F':
+            (ms,) = _FRAME.unpack_from(data, offset)
+            offset += _FRAME.size
+            events = []
+            frames.append((ms, events))
+        elif tag == b'P':
+            kind, pointer, button, x, y = _POINTER.unpack_from(data, offset)
+            offset += _POINTER.size
+            kind = _KINDS[kind]
+            if _POINTERS[pointer] == 'touch':
+                event = pygame.event.Event(_TOUCH_TYPES[kind], x=x / width, y=y / height)
+            elif kind == 'move':
+                event = pygame.event.Event(pygame.MOUSEMOTION, pos=(x, y))
+            else:
+                event = pygame.event.Event(_MOUSE_TYPES[kind], pos=(x, y), button=button)
+            events.append(event)
+        elif tag == b'K':
+            down, key = _KEY.unpack_from(data, offset)
+            offset += _KEY.size
+            events.append(pygame.event.Event(pygame.KEYDOWN if down else pygame.KEYUP, key=key))
+        elif tag == b'W':
+            x, y = _WHEEL.unpack_from(data, offset)
+            offset += _WHEEL.size
+            events.append(pygame.event.Event(pygame.MOUSEWHEEL, x=x, y=y, precise_x=float(x),
+                                             precise_y=float(y), flipped=False))
+        elif tag == b'Q':
+            events.append(pygame.event.Event(pygame.QUIT))
+        else:
+            raise ValueError(f"corrupt session log at byte {offset - 1}")
+    return (seed if has_seed else None), frames
+
+
+class ReplayInput:
+    """Plays a session log back as fast as the game can process it.
+
+    The recorded frame times drive the game clock, so the simulation sees
+    exactly the same steps and inputs. The real time each frame took to
+    process is kept in frame_times for reporting.
+    """
+
+    def __init__(self, path, width=800, height=600):
+        self.seed, self._frames = read_log(path, width, height)
+        self._index = -1
+        self._now_ms = 0
+        self._events = []
+        self._last = None
+        self.frame_times = []  # real seconds spent on each replayed frame
+
+    def tick(self, fps=60):
+        now = time.perf_counter()
+        if self._last is not None:
+            self.frame_times.append(now - self._last)
+        self._last = now
+
+        self._index += 1
+        if self._index < len(self._frames):
+            ms, self._events = self._frames[self._index]
+        else:
+            # Past the end of the log: ask the game to quit.
+            ms, self._events = 1000 // fps, [pygame.event.Event(pygame.QUIT)]
+        self._now_ms += ms
+        return ms
+
+    def get_events(self):
+        events = self._events
+        self._events = []
+        return events
+
+    def now_ms(self):
+        return self._now_ms
+
+    @property
+    def finished(self):
+        return self._index >= len(self._frames)
+
+    def close(self):
+        pass
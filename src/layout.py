@@ -0,0 +1,247 @@
+"""Canonical board snapshots and an on-disk cache of their simulated scores.
+
+A Layout is everything about a board that affects its score: the grid
+size, the spawn markers and each placed intersection's cell, type and
+rotation. It serializes to a short, canonical byte string (cells sorted,
+positions relative to the grid origin) so the same board always produces
+the same bytes no matter where it is drawn or the order it was built in.
+
+ScoreCache keys simulated results by a SHA-256 of those bytes plus city,
+level, seed, day length and ENGINE_VERSION, so re-scoring a board that has been seen
+before is a file read instead of a simulated day.
+
+Snapshot layout (little-endian):
+    header  b'CLLY', u8 version, u16 rows, u16 cols, u16 cell size,
+            u8 marker count, u32 cell count
+    marker  u8 kind (0 start, 1 end), u8 end number, i32 dx, i32 dy
+    cell    u16 row, u16 col, u8 type, u8 rotation
+"""
+
+import hashlib
+import json
+import os
+import struct
+import tempfile
+
+from grid_network import IntersectionNetwork
+from intersection import Intersection, IntersectionType
+from rng import RandomStreams
+from simulation import ENGINE_VERSION, Simulation
+
+MAGIC = b'CLLY'
+VERSION = 2  # 2: marker offsets widened to i32 for sandbox-sized boards
+
+_HEADER = struct.Struct('<4sBHHHBI')
+_MARKER = struct.Struct('<BBii')
+_CELL = struct.Struct('<HHBB')
+
+# Type codes are positions in this tuple; append new types, never reorder.
+_TYPES = (
+    IntersectionType.T_INTERSECTION,
+    IntersectionType.TRUMPET,
+    IntersectionType.Y_INTERSECTION,
+    IntersectionType.FOUR_WAY,
+    IntersectionType.ROUNDABOUT,
+    IntersectionType.CLOVERLEAF,
+    IntersectionType.DIAMOND,
+    IntersectionType.PARTIAL_CLOVERLEAF,
+)
+_TYPE_CODES = {itype: code for code, itype in enumerate(_TYPES)}
+_MARKER_KINDS = ('start', 'end')
+
+DEFAULT_DAY_LENGTH = 300.0
+
+
+class Layout:
+    """Immutable snapshot of a board.
+
+    Attributes:
+        rows, cols: Grid size
+        cell_size: Cell size in pixels
+        markers: ((kind, number, dx, dy), ...) in generation order, with
+            positions relative to the grid origin and number 0 for starts
+        cells: ((row, col, IntersectionType, rotation), ...) sorted by cell
+    """
+
+    __slots__ = ('rows', 'cols', 'cell_size', 'markers', 'cells', '_bytes')
+
+    def __init__(self, rows, cols, cell_size, markers, cells):
+        self.rows = rows
+        self.cols = cols
+        self.cell_size = cell_size
+        self.markers = tuple(markers)
+        self.cells = tuple(sorted(cells, key=lambda cell: (cell[0], cell[1])))
+        self._bytes = None
+
+    @classmethod
+    def capture(cls, network, spawn_markers):
+        """Snapshot a live IntersectionNetwork and its spawn markers."""
+        markers = [
+            (m['type'], m.get('number', 0), int(m['x'] - network.start_x), int(m['y'] - network.start_y))
+            for m in spawn_markers
+        ]
+        cells = [
+            (row, col, intersection.intersection_type, intersection.rotation % 4)
+            for (row, col), intersection in network.placed_intersections.items()
+        ]
+        return cls(network.rows, network.cols, network.cell_size, markers, cells)
+
+    def to_bytes(self):
+        """The canonical serialization (cached after the first call)."""
+        if self._bytes is None:
+            parts = [_HEADER.pack(MAGIC, VERSION, self.rows, self.cols, self.cell_size,
+                                  len(self.markers), len(self.cells))]
+            for kind, number, dx, dy in self.markers:
+                parts.append(_MARKER.pack(_MARKER_KINDS.index(kind), number, dx, dy))
+            for row, col, itype, rotation in self.cells:
+                parts.append(_CELL.pack(row, col, _TYPE_CODES[itype], rotation))
+            self._bytes = b''.join(parts)
+        return self._bytes
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Parse a snapshot produced by to_bytes()."""
+        magic, version, rows, cols, cell_size, marker_count, cell_count = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"not a version {VERSION} layout snapshot")
+        offset = _HEADER.size
+        markers = []
+        for kind, number, dx, dy in _MARKER.iter_unpack(data[offset:offset + marker_count * _MARKER.size]):
+            markers.append((_MARKER_KINDS[kind], number, dx, dy))
+        offset += marker_count * _MARKER.size
+        cells = [
+            (row, col, _TYPES[code], rotation)
+            for row, col, code, rotation in _CELL.iter_unpack(data[offset:offset + cell_count * _CELL.size])
+        ]
+        if len(cells) != cell_count:
+            raise ValueError("truncated layout snapshot")
+        layout = cls(rows, cols, cell_size, markers, cells)
+        layout._bytes = bytes(data)
+        return layout
+
+    def with_cell(self, row, col, intersection_type, rotation=0):
+        """A copy of this layout with (row, col) holding the given intersection."""
+        cells = [cell for cell in self.cells if (cell[0], cell[1]) != (row, col)]
+        cells.append((row, col, intersection_type, rotation % 4))
+        return Layout(self.rows, self.cols, self.cell_size, self.markers, cells)
+
+    def digest(self):
+        """SHA-256 hex digest of the snapshot bytes alone."""
+        return hashlib.sha256(self.to_bytes()).hexdigest()
+
+    def build(self, start_x=0, start_y=0):
+        """
+        Rebuild the board with its grid origin at (start_x, start_y).
+
+        Returns (network, spawn_markers) ready for a Simulation.
+        """
+        network = IntersectionNetwork(self.rows, self.cols, start_x, start_y, self.cell_size)
+        half = self.cell_size // 2
+        for row, col, itype, rotation in self.cells:
+            intersection = Intersection(
+                row, col,
+                start_x + col * self.cell_size + half,
+                start_y + row * self.cell_size + half,
+                intersection_type=itype,
+            )
+            intersection.rotation = rotation
+            intersection.snapped = True
+            intersection.snapped_row = row
+            intersection.snapped_col = col
+            network.add_intersection(intersection)
+
+        spawn_markers = []
+        for kind, number, dx, dy in self.markers:
+            marker = {'type': kind, 'x': start_x + dx, 'y': start_y + dy}
+            if kind == 'end':
+                marker['number'] = number
+            spawn_markers.append(marker)
+        return network, spawn_markers
+
+    def __eq__(self, other):
+        return isinstance(other, Layout) and self.to_bytes() == other.to_bytes()
+
+    def __hash__(self):
+        return hash(self.to_bytes())
+
+
+def score_key(layout, city, level, seed, day_length=DEFAULT_DAY_LENGTH, engine_version=ENGINE_VERSION):
+    """Content hash identifying one simulated result."""
+    h = hashlib.sha256(layout.to_bytes())
+    h.update(f"|{city}|{level}|{seed}|{float(day_length)!r}|{engine_version}".encode('utf-8'))
+    return h.hexdigest()
+
+
+def simulate_layout(layout, city, level, seed, day_length=DEFAULT_DAY_LENGTH):
+    """
+    Run one simulated day headlessly, as run_game does, and return its result.
+
+    The day starts at 07:00 like the game. Returns a dict with flow_rate,
+    delivered, spawn_attempts and spawn_successes.
+    """
+    network, spawn_markers = layout.build()
+    sim = Simulation(network, spawn_markers, city, level, day_length,
+                     start_time=day_length * 7 / 24, streams=RandomStreams(seed))
+    while not sim.finished:
+        sim.step()
+    return {
+        'flow_rate': sim.flow_rate(),
+        'delivered': len(sim.completed_stats),
+        'spawn_attempts': sim.spawn_attempts,
+        'spawn_successes': sim.spawn_successes,
+    }
+
+
+class ScoreCache:
+    """Simulated results on disk, one small JSON file per content hash."""
+
+    def __init__(self, directory):
+        """
+        Initialize the cache.
+
+        Args:
+            directory: Cache root; created on first write
+        """
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.json')
+
+    def get(self, key):
+        """Return the cached result for key, or None."""
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, result):
+        """Store a result; the write is atomic so readers never see half a file."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(result, f)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def score(self, layout, city, level, seed, day_length=DEFAULT_DAY_LENGTH, simulate=simulate_layout):
+        """Return the result for this layout, simulating and storing it on a miss.
+
+        simulate is called as simulate(layout, city, level, seed, day_length).
+        """
+        key = score_key(layout, city, level, seed, day_length)
+        result = self.get(key)
+        if result is not None:
+            self.hits += 1
+            return result
+        self.misses += 1
+        result = simulate(layout, city, level, seed, day_length)
+        self.put(key, result)
+        return result
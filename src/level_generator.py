@@ -0,0 +1,177 @@
+"""Procedural levels of any size: spawn markers plus a matching demand profile.
+
+generate_spawn_points picks markers by rejection sampling, which is fine
+for the handful of markers the built-in levels use but slows down and
+eventually gives up as boards and marker counts grow. Here markers are
+spread evenly around the perimeter (in get_perimeter_positions order)
+and each is nudged by a bounded random jitter, so placement costs O(n)
+in the number of markers, never fails, and keeps every pair of markers at
+least MIN_MARKER_GAP positions apart whenever the perimeter has room.
+
+generate_demand draws a 24-hour volume profile (vehicles per hour, like a
+traffic_data.TRAFFIC_DATA entry) with a morning and an evening rush whose
+timing and height vary by seed; Simulation takes it as demand=.
+
+Layout snapshots store marker counts and end numbers in one byte, so
+levels meant for the Layout-based tools need at most 255 markers.
+"""
+
+import math
+import random
+from collections import namedtuple
+
+MARKER_JITTER = 0.8      # share of the free space between markers a marker may drift
+MIN_MARKER_GAP = 2       # perimeter positions between neighbouring markers, when they fit
+DEMAND_PEAK_VOLUME = 3000
+
+GeneratedLevel = namedtuple('GeneratedLevel', 'rows cols markers demand')
+
+
+def get_perimeter_positions(rows, cols):
+    """Return all grid-edge positions in clockwise order as (side, index) tuples.
+
+    Indices refer to which cell along that side (0-based).
+    Order: top L→R, right T→B, bottom R→L, left B→T.
+    """
+    positions = []
+    for c in range(cols):
+        positions.append(('top', c))
+    for r in range(rows):
+        positions.append(('right', r))
+    for c in range(cols - 1, -1, -1):
+        positions.append(('bottom', c))
+    for r in range(rows - 1, -1, -1):
+        positions.append(('left', r))
+    return positions
+
+
+def perimeter_distance(a, b, total):
+    """Shortest clockwise/counter-clockwise distance between two perimeter indices."""
+    diff = abs(a - b)
+    return min(diff, total - diff)
+
+
+def edge_pixel(side, index, start_x, start_y, cell_size, rows, cols):
+    """Pixel coordinate at the midpoint of the outer face of an edge cell."""
+    half = cell_size // 2
+    if side == 'top':
+        return (start_x + index * cell_size + half, start_y)
+    elif side == 'bottom':
+        return (start_x + index * cell_size + half, start_y + rows * cell_size)
+    elif side == 'left':
+        return (start_x, start_y + index * cell_size + half)
+    else:  # right
+        return (start_x + cols * cell_size, start_y + index * cell_size + half)
+
+
+def spread_positions(total, count, rng, jitter=MARKER_JITTER):
+    """
+    Pick count distinct indices out of a ring of total, evenly spaced with jitter.
+
+    Args:
+        total: Ring size (perimeter positions)
+        count: Indices wanted; at most total
+        rng: random.Random drawing the offset and jitter
+        jitter: 0 for exact even spacing, up to 1 to use all the free space
+
+    Returns the indices in ring order, starting from a random offset.
+    """
+    if count > total:
+        raise ValueError(f"cannot place {count} markers on {total} perimeter positions")
+    if count <= 0:
+        return []
+    spacing = total / count
+    offset = rng.random() * spacing
+    # Each index may drift this far either way; two neighbours drifting
+    # towards each other still leave MIN_MARKER_GAP between them.
+    reach = max(0.0, spacing - MIN_MARKER_GAP) / 2 * min(max(jitter, 0.0), 1.0)
+    chosen = []
+    for i in range(count):
+        position = offset + i * spacing + (rng.random() * 2 - 1) * reach
+        chosen.append(int(math.floor(position)) % total)
+    return chosen
+
+
+def generate_markers(rows, cols, num_starts, num_ends, start_x, start_y, cell_size, rng=None,
+                     jitter=MARKER_JITTER):
+    """
+    Return marker dicts in the format of generate_spawn_points.
+
+    Starts and ends are dealt out at random over the evenly spread
+    positions, and ends are numbered from 1 in that order.
+
+    Args:
+        rows, cols: Grid size in cells
+        num_starts, num_ends: Markers of each kind
+        start_x, start_y: Pixel position of the grid's top-left corner
+        cell_size: Cell size in pixels
+        rng: random.Random for placement (default: the random module)
+        jitter: See spread_positions
+    """
+    if rng is None:
+        rng = random
+    perimeter = get_perimeter_positions(rows, cols)
+    chosen = spread_positions(len(perimeter), num_starts + num_ends, rng, jitter)
+    kinds = ['start'] * num_starts + ['end'] * num_ends
+    rng.shuffle(kinds)
+
+    markers = []
+    end_counter = 1
+    for kind, idx in zip(kinds, chosen):
+        side, index = perimeter[idx]
+        px, py = edge_pixel(side, index, start_x, start_y, cell_size, rows, cols)
+        m = {'type': kind, 'side': side, 'index': index, 'x': px, 'y': py}
+        if kind == 'end':
+            m['number'] = end_counter
+            end_counter += 1
+        markers.append(m)
+    return markers
+
+
+def _bump(hour, centre, width):
+    # Gaussian bump on the 24-hour circle, so late peaks wrap to midnight.
+    distance = min(abs(hour - centre), 24 - abs(hour - centre))
+    return math.exp(-0.5 * (distance / width) ** 2)
+
+
+def generate_demand(rng=None, peak_volume=DEMAND_PEAK_VOLUME):
+    """
+    Return 24 hourly volumes with a seeded morning and evening rush.
+
+    Args:
+        rng: random.Random shaping the profile (default: the random module)
+        peak_volume: Volume of the busiest hour
+    """
+    if rng is None:
+        rng = random
+    night = rng.uniform(0.04, 0.08)
+    midday = rng.uniform(0.45, 0.65)
+    am_hour, am_height = rng.uniform(7.0, 9.0), rng.uniform(0.65, 0.9)
+    pm_hour, pm_height = rng.uniform(16.5, 18.5), rng.uniform(0.85, 1.0)
+    shape = [
+        night
+        + midday * _bump(hour, 13.0, 3.0)
+        + am_height * _bump(hour, am_hour, 1.2)
+        + pm_height * _bump(hour, pm_hour, 1.6)
+        for hour in range(24)
+    ]
+    top = max(shape)
+    return [int(round(peak_volume * value / top)) for value in shape]
+
+
+def generate_level(rows, cols, num_starts, num_ends, cell_size, streams, start_x=0, start_y=0,
+                   peak_volume=DEMAND_PEAK_VOLUME):
+    """
+    Generate markers and a demand profile for a rows x cols board.
+
+    Args:
+        rows, cols: Grid size in cells
+        num_starts, num_ends: Markers of each kind
+        cell_size: Cell size in pixels
+        streams: RandomStreams; markers come from .markers, demand from .demand
+        start_x, start_y: Pixel position of the grid's top-left corner
+        peak_volume: Volume of the busiest hour in the demand profile
+    """
+    markers = generate_markers(rows, cols, num_starts, num_ends, start_x, start_y, cell_size,
+                               rng=streams.markers)
+    return GeneratedLevel(rows, cols, markers, generate_demand(streams.demand, peak_volume))
@@ -1,11 +1,29 @@
+import argparse
 import asyncio
 import pygame
 import sys
 import random
+from camera import BoardRenderer, Camera
+from minimap import MINIMAP_MARGIN, Minimap
+from car import draw_car, draw_car_rect
 from intersection import Intersection, IntersectionType
 from grid_network import IntersectionNetwork
-from car import Car, CAR_SPEED
-from traffic_data import get_spawn_interval, get_current_volume
+from heatmap import CongestionHeatmap
+from scoring import calculate_flow_rate, get_grade
+from input_log import LiveInput
+from layout import Layout
+from level_generator import (edge_pixel, generate_level, generate_markers, get_perimeter_positions,
+                             perimeter_distance)
+from metrics import MetricsRecorder, MetricsRing, SparklineHUD
+from particles import ParticlePool
+from preview import PreviewWorker, shutdown_previews
+from quality import QualityGovernor
+from rng import RandomStreams, new_seed
+from simulation import MAX_FRAME_TIME, SIM_DT, Simulation
+from sim_task import SimulationTask
+from cell_automaton import CellTrafficTask
+from telemetry import TelemetryWriter
+from traffic_data import get_current_volume
 
 # Initialize pygame
 #(runs the game) python src/main.py
@@ -217,89 +235,6 @@ def build_intersection_for_cell(row, col, start_x, start_y, cell_size, intersect
     placed.snapped_col = col
     return placed
 
-def calculate_flow_rate(completed_stats, spawn_attempts=0, spawn_successes=0):
-    """Compute flow rate using the equation from the README:
-
-    Flow Rate = (V_Avg / V_limit) x (T_Ideal / T_Actual) x (1 - T_Idle / T_Actual)
-
-    completed_stats is a list of (path_length, travel_time, idle_time) tuples
-    for every car that has reached its destination.
-
-    spawn_attempts / spawn_successes are used to penalise incomplete networks:
-    cars that cannot be routed drag the score down proportionally.
-    """
-    if not completed_stats:
-        return 0.0
-
-    total_dist   = sum(pl for pl, _, _  in completed_stats)
-    total_actual = sum(tt for _,  tt, _ in completed_stats)
-    total_idle   = sum(it for _,  _,  it in completed_stats)
-
-    if total_actual == 0:
-        return 0.0
-
-    v_avg    = total_dist / total_actual          # average speed (px/s)
-    v_ratio  = min(v_avg / CAR_SPEED, 1.0)        # V_Avg / V_limit
-    t_ideal  = total_dist / CAR_SPEED             # ideal travel time at speed limit
-    t_ratio  = min(t_ideal / total_actual, 1.0)   # T_Ideal / T_Actual
-    idle_ratio = 1.0 - (total_idle / total_actual) # 1 - T_Idle / T_Actual
-
-    base_rate = v_ratio * t_ratio * idle_ratio
-
-    # Penalise missed routings — an incomplete network lowers the score
-    if spawn_attempts > 0:
-        routing_ratio = spawn_successes / spawn_attempts
-        return base_rate * routing_ratio
-
-    return base_rate
-
-
-def get_grade(flow_rate):
-    """Convert a 0–1 flow rate to a letter grade."""
-    if flow_rate >= 0.80: return 'A'
-    if flow_rate >= 0.65: return 'B'
-    if flow_rate >= 0.45: return 'C'
-    if flow_rate >= 0.25: return 'D'
-    return 'F'
-
-
-def get_perimeter_positions(rows, cols):
-    """Return all grid-edge positions in clockwise order as (side, index) tuples.
-
-    Indices refer to which cell along that side (0-based).
-    Order: top L→R, right T→B, bottom R→L, left B→T.
-    """
-    positions = []
-    for c in range(cols):
-        positions.append(('top', c))
-    for r in range(rows):
-        positions.append(('right', r))
-    for c in range(cols - 1, -1, -1):
-        positions.append(('bottom', c))
-    for r in range(rows - 1, -1, -1):
-        positions.append(('left', r))
-    return positions
-
-
-def perimeter_distance(a, b, total):
-    """Shortest clockwise/counter-clockwise distance between two perimeter indices."""
-    diff = abs(a - b)
-    return min(diff, total - diff)
-
-
-def edge_pixel(side, index, start_x, start_y, cell_size, rows, cols):
-    """Pixel coordinate at the midpoint of the outer face of an edge cell."""
-    half = cell_size // 2
-    if side == 'top':
-        return (start_x + index * cell_size + half, start_y)
-    elif side == 'bottom':
-        return (start_x + index * cell_size + half, start_y + rows * cell_size)
-    elif side == 'left':
-        return (start_x, start_y + index * cell_size + half)
-    else:  # right
-        return (start_x + cols * cell_size, start_y + index * cell_size + half)
-
-
 def compute_grid_origin(rows, cols, cell_size, left_ui_right_edge=240):
     """Compute a grid origin that avoids overlapping the left-side UI panel."""
     grid_width = cols * cell_size
@@ -319,18 +254,25 @@ def compute_grid_origin(rows, cols, cell_size, left_ui_right_edge=240):
     return safe_x, centered_y
 
 
-def generate_spawn_points(level, rows, cols, start_x, start_y, cell_size):
+def generate_spawn_points(level, rows, cols, start_x, start_y, cell_size, rng=None):
     """Return a list of marker dicts for the given level.
 
     Each dict has: type ('start'/'end'), side, index, x, y.
     Points are placed on the grid perimeter with a minimum spacing to
-    ensure they are never adjacent.
+    ensure they are never adjacent. Pass rng (a random.Random) to make the
+    placement reproducible; the global random module is used otherwise.
+    Levels past 3 have level - 1 starts and ends each, placed by
+    level_generator.generate_markers.
     """
+    if rng is None:
+        rng = random
     spawn_configs = {
         1: (1, 1),  # 1 start, 1 end
         2: (1, 2),  # 1 start, 2 ends
         3: (2, 2),  # 2 starts, 2 ends
     }
+    if level not in spawn_configs:
+        return generate_markers(rows, cols, level - 1, level - 1, start_x, start_y, cell_size, rng=rng)
     num_starts, num_ends = spawn_configs[level]
     total_points = num_starts + num_ends
 
@@ -342,7 +284,7 @@ def generate_spawn_points(level, rows, cols, start_x, start_y, cell_size):
 
     chosen = []
     for _ in range(5000):  # retry budget
-        idx = random.randint(0, total - 1)
+        idx = rng.randint(0, total - 1)
         if all(perimeter_distance(idx, c, total) >= min_dist for c in chosen):
             chosen.append(idx)
         if len(chosen) == total_points:
@@ -351,10 +293,10 @@ def generate_spawn_points(level, rows, cols, start_x, start_y, cell_size):
     # Fallback: relax spacing if we still don't have enough points
     if len(chosen) < total_points:
         remaining = [i for i in range(total) if i not in chosen]
-        random.shuffle(remaining)
+        rng.shuffle(remaining)
         chosen.extend(remaining[: total_points - len(chosen)])
 
-    random.shuffle(chosen)
+    rng.shuffle(chosen)
 
     markers = []
     end_counter = 1
@@ -377,21 +319,6 @@ def generate_spawn_points(level, rows, cols, start_x, start_y, cell_size):
 
 
 
-def _find_nearest_intersection(network, x, y):
-    """Find the nearest intersection to pixel coordinates (x, y)."""
-    nearest = None
-    min_dist = float('inf')
-    
-    for intersection in network.get_all_intersections():
-        dist = ((intersection.x - x) ** 2 + (intersection.y - y) ** 2) ** 0.5
-        if dist < min_dist:
-            min_dist = dist
-            nearest = intersection
-    
-    return nearest
-
-
-
 def draw_clock(screen, elapsed_seconds, font, center=(WINDOW_WIDTH // 2, 20)):
     """Draw the game clock at the top center of the screen.
 
@@ -640,6 +567,8 @@ def draw_spawn_markers(screen, markers, font, label_alpha=255):
         # S / E label
         text = font.render(label, True, (255, 255, 255))
         screen.blit(text, text.get_rect(center=(mx, my)))
+        if label_alpha <= 0:
+            continue
 
         # Place IN / OUT labels toward the grid so edge labels stay on-screen.
         tag = "IN" if is_start else "OUT"
@@ -826,7 +755,7 @@ def draw_undo_prompt(screen, small_font, undo_timer, anchor_x=150):
 
 def draw_control_hint_strip(screen, hint_font):
     """Draw a compact control hint strip for new players."""
-    msg = "R rotate | Right-click delete | U undo | P/Esc pause"
+    msg = "R rotate | Right-click delete | U undo | H heatmap | P/Esc pause"
     msg_surf = hint_font.render(msg, True, (225, 225, 225))
     strip_rect = msg_surf.get_rect(bottomleft=(18, WINDOW_HEIGHT - 14))
     bg_rect = strip_rect.inflate(20, 10)
@@ -1074,8 +1003,23 @@ def _place_dragging_intersection(dragging_intersection, network, placed_intersec
     return True
 
 
+def draw_preview_delta(screen, font, pos, status, delta):
+    """Draw the predicted flow-rate change of the dragged placement next to the cursor."""
+    if status == 'pending':
+        text, color = "...", (170, 170, 170)
+    elif abs(delta) < 0.005:
+        text, color = "±0.00", (200, 200, 200)
+    else:
+        text = f"{delta:+.2f}"
+        color = (80, 220, 80) if delta > 0 else (255, 80, 80)
+    surf = font.render(text, True, color)
+    bg = surf.get_rect(midleft=(pos[0] + 24, pos[1] - 20)).inflate(8, 4)
+    pygame.draw.rect(screen, (20, 20, 20), bg, border_radius=4)
+    screen.blit(surf, surf.get_rect(center=bg.center))
+
+
 def draw_end_screen(screen, flow_rate, delivered, city, level, target_flow, passed,
-                    has_next_level, font, title_font, small_font, mouse_pos):
+                    has_next_level, font, title_font, small_font, mouse_pos, seed=None):
     """Draw end-of-day results. Returns (again_rect, menu_rect, next_rect)."""
     grade = get_grade(flow_rate)
     grade_colors = {
@@ -1125,6 +1069,10 @@ def draw_end_screen(screen, flow_rate, delivered, city, level, target_flow, pass
     del_surf = small_font.render(f"Cars Delivered:  {delivered}", True, (200, 200, 200))
     screen.blit(del_surf, del_surf.get_rect(centerx=WINDOW_WIDTH // 2, top=py + 222))
 
+    if seed is not None:
+        seed_surf = pygame.font.Font(None, 20).render(f"Seed {seed}", True, (140, 140, 140))
+        screen.blit(seed_surf, seed_surf.get_rect(topright=(px + pw - 12, py + 10)))
+
     bh = 44
     by = py + ph - 60
 
@@ -1179,8 +1127,18 @@ def draw_end_screen(screen, flow_rate, delivered, city, level, target_flow, pass
     return again_rect, menu_rect, next_rect
 
 
-async def run_game(screen, selected_city, selected_level, unlocked_levels=None):
-    """Run the game for the selected city."""
+async def run_game(screen, selected_city, selected_level, unlocked_levels=None, seed=None, results=None,
+                   inputs=None, telemetry=None, metrics=None):
+    """Run the game for the selected city.
+
+    seed fixes every random stream (markers, demand, destinations and
+    cosmetics); a fresh seed is drawn when it is None. The results dict, if
+    given, is kept up to date with the seed, flow rate and deliveries.
+    inputs is the frame clock and event source (default: live pygame input).
+    telemetry, if given, is a TelemetryWriter that receives a row per trip.
+    metrics is the MetricsRing that collects per-minute samples for the HUD
+    sparklines (default: a fresh one).
+    """
     pygame.display.set_caption(f"City Limits - {selected_city} - Level {selected_level}")
     browser_mode = is_browser_runtime()
 
@@ -1193,11 +1151,10 @@ async def run_game(screen, selected_city, selected_level, unlocked_levels=None):
     grid_start_x, grid_start_y = compute_grid_origin(rows, cols, CELL_SIZE, left_ui_right_edge=240)
     network = IntersectionNetwork(rows, cols, grid_start_x, grid_start_y, CELL_SIZE)
 
+    streams = RandomStreams(seed)
     spawn_markers = generate_spawn_points(
-        selected_level, rows, cols, grid_start_x, grid_start_y, CELL_SIZE
+        selected_level, rows, cols, grid_start_x, grid_start_y, CELL_SIZE, rng=streams.markers
     )
-    starts = [m for m in spawn_markers if m['type'] == 'start']
-    ends = [m for m in spawn_markers if m['type'] == 'end']
 
     if browser_mode:
         browser_controls = get_browser_control_rects(WINDOW_WIDTH, WINDOW_HEIGHT)
@@ -1251,14 +1208,42 @@ async def run_game(screen, selected_city, selected_level, unlocked_levels=None):
     dragging_intersection = None
     selected_intersection = None
 
-    cars = []
-    clock = pygame.time.Clock()
-    spawn_timer = 0.0
+    sim = Simulation(
+        network, spawn_markers, selected_city, selected_level, GAME_DAY_LENGTH,
+        start_time=GAME_DAY_LENGTH * 7 / 24, streams=streams, telemetry=telemetry,
+    )
+    if results is not None:
+        results.update({
+            'city': selected_city,
+            'level': selected_level,
+            'seed': streams.seed,
+            'flow_rate': 0.0,
+            'delivered': 0,
+            'passed': None,
+        })
+    if inputs is None:
+        inputs = LiveInput(normalize=normalize_pointer_event, width=WINDOW_WIDTH, height=WINDOW_HEIGHT)
+    # What-if previews need a worker process and a player to look at them:
+    # live desktop play only.
+    previews = PreviewWorker(
+        selected_city, selected_level, streams.seed, GAME_DAY_LENGTH,
+        enabled=not browser_mode and isinstance(inputs, LiveInput),
+    )
+    preview_target = None
+    # The simulation steps in its own task; this loop only reads its snapshots.
+    sim_task = SimulationTask(sim)
+    heatmap = CongestionHeatmap(rows, cols, grid_start_x, grid_start_y, CELL_SIZE)
+    show_heatmap = False
+    heatmap_steps = 0
+    if metrics is None:
+        metrics = MetricsRing()
+    metrics_recorder = MetricsRecorder(metrics, GAME_DAY_LENGTH)
+    sparklines = SparklineHUD(metrics, hud_font)
+    # Sheds drawing effects when frames run long (mostly for phones).
+    quality = QualityGovernor()
+    show_quality = False
 
-    completed_stats = []
     flow_rate = 0.0
-    spawn_attempts = 0
-    spawn_successes = 0
     _stats_len = 0
     _prev_attempts = 0
 
@@ -1267,7 +1252,6 @@ async def run_game(screen, selected_city, selected_level, unlocked_levels=None):
     delta_alpha = 0.0
     delta_y_offset = 0.0
 
-    game_timer = GAME_DAY_LENGTH * 7 / 24
     is_started = False
     is_paused = False
     pause_confirm_exit = False
@@ -1277,7 +1261,7 @@ async def run_game(screen, selected_city, selected_level, unlocked_levels=None):
     progress_recorded = False
     label_alpha = 255.0
     first_car_spawned = False
-    hint_particles = []
+    particles = ParticlePool(marker_font)
     pending_undo_data = None
     undo_timer = 0.0
     title_font = pygame.font.Font(None, 72)
@@ -1287,19 +1271,32 @@ async def run_game(screen, selected_city, selected_level, unlocked_levels=None):
 
     running = True
     while running:
-        dt = min(clock.tick(60) / 1000.0, 0.1)
-
+        frame_ms = inputs.tick(60)
+        dt = min(frame_ms / 1000.0, MAX_FRAME_TIME)
+        quality.observe(frame_ms)
+        heatmap.refresh_interval = quality.overlay_refresh
+        draw_car_state = draw_car_rect if quality.plain_cars else draw_car
+
+        # Frame time only feeds the simulation task's clock; it works off the
+        # due SIM_DT steps between frames while this loop handles input and
+        # draws the latest snapshot.
         if is_started and not is_paused:
-            game_timer += dt
+            sim_task.feed(dt)
             if first_car_spawned and label_alpha > 0:
-                label_alpha = max(0.0, label_alpha - 127.5 * dt)
+                label_alpha = max(0.0, label_alpha - 127.5 * dt) if quality.label_fade else 0.0
 
         if undo_timer > 0.0:
             undo_timer = max(0.0, undo_timer - dt)
             if undo_timer == 0.0:
                 pending_undo_data = None
 
-        if is_started and not is_paused and not game_ended and game_timer >= GAME_DAY_LENGTH:
+        snapshot = sim_task.snapshot
+        if show_heatmap and snapshot.steps > heatmap_steps:
+            heatmap.accumulate(snapshot.cars, (snapshot.steps - heatmap_steps) * SIM_DT)
+            heatmap_steps = snapshot.steps
+        if is_started:
+            metrics_recorder.observe(snapshot)
+        if is_started and not is_paused and not game_ended and snapshot.finished:
             game_ended = True
             is_started = False
 
@@ -1318,7 +1315,7 @@ async def run_game(screen, selected_city, selected_level, unlocked_levels=None):
 
         if is_paused and not game_ended:
             screen.fill(BACKGROUND_COLOR)
-            pause_hour = draw_clock(screen, game_timer, font, center=clock_anchor)
+            pause_hour = draw_clock(screen, snapshot.game_timer, font, center=clock_anchor)
             if (7 <= pause_hour < 10) or (16 <= pause_hour < 19):
                 rh_surf = small_font.render("RUSH HOUR", True, (255, 165, 40))
                 screen.blit(rh_surf, rh_surf.get_rect(center=rush_anchor))
@@ -1339,9 +1336,11 @@ async def run_game(screen, selected_city, selected_level, unlocked_levels=None):
                     pygame.draw.rect(screen, GRID_COLOR, (x, y, CELL_SIZE, CELL_SIZE), 3)
 
             network.draw(screen, highlighted_intersection=selected_intersection)
+            if show_heatmap:
+                heatmap.draw(screen)
             draw_spawn_markers(screen, spawn_markers, marker_font, label_alpha)
-            for car in cars:
-                car.draw(screen)
+            for car_state in snapshot.cars:
+                draw_car_state(screen, car_state, snapshot.alpha)
 
             draw_palette_toggle_button(
                 screen,
@@ -1379,10 +1378,10 @@ async def run_game(screen, selected_city, selected_level, unlocked_levels=None):
                 screen, selected_city, selected_level, font, small_font, mouse_pos, pause_confirm_exit
             )
 
-            for event in pygame.event.get():
+            for event in inputs.get_events():
                 normalized = normalize_pointer_event(event, WINDOW_WIDTH, WINDOW_HEIGHT)
                 if normalized and browser_mode and normalized["kind"] == "down" and normalized["button"] == 1:
-                    now_ms = pygame.time.get_ticks()
+                    now_ms = inputs.now_ms()
                     if is_duplicate_pointer_down(normalized, recent_pointer_down, now_ms):
                         normalized = None
                     else:
@@ -1432,10 +1431,10 @@ async def run_game(screen, selected_city, selected_level, unlocked_levels=None):
             draw_spawn_markers(screen, spawn_markers, marker_font, label_alpha)
             got_it_rect = draw_intro_overlay(screen, font, small_font, mouse_pos, touch_mode=browser_mode)
 
-            for event in pygame.event.get():
+            for event in inputs.get_events():
                 normalized = normalize_pointer_event(event, WINDOW_WIDTH, WINDOW_HEIGHT)
                 if normalized and browser_mode and normalized["kind"] == "down" and normalized["button"] == 1:
-                    now_ms = pygame.time.get_ticks()
+                    now_ms = inputs.now_ms()
                     if is_duplicate_pointer_down(normalized, recent_pointer_down, now_ms):
                         normalized = None
                     else:
@@ -1456,82 +1455,42 @@ async def run_game(screen, selected_city, selected_level, unlocked_levels=None):
                         showing_intro = False
                         is_started = True
                         is_paused = False
-                        spawn_timer = 0.0
+                        sim.spawn_timer = 0.0
 
             pygame.display.flip()
             await asyncio.sleep(0)
             continue
 
-        current_spawn_interval = get_spawn_interval(selected_city, game_timer, GAME_DAY_LENGTH, selected_level)
-        spawn_timer += dt if (is_started and not is_paused) else 0.0
-        if spawn_timer >= current_spawn_interval and ends and is_started:
-            spawn_timer = 0.0
-            for start_m in starts:
-                end_m = random.choice(ends)
-                if network.get_all_intersections():
-                    spawn_attempts += 1
-                    start_int = _find_nearest_intersection(network, start_m['x'], start_m['y'])
-                    end_int = _find_nearest_intersection(network, end_m['x'], end_m['y'])
-
-                    if start_int and end_int:
-                        intersection_path = network.find_path(start_int, end_int)
-                        if intersection_path:
-                            pixel_path = network.intersections_to_pixels(intersection_path)
-                            cars.append(Car(pixel_path))
-                            spawn_successes += 1
-                        else:
-                            hint_particles.append({
-                                'text': '?',
-                                'color': (255, 160, 30),
-                                'x': float(start_m['x']),
-                                'y': float(start_m['y']),
-                                'alpha': 255.0,
-                                'vy': -40.0,
-                            })
-                    else:
-                        hint_particles.append({
-                            'text': '?',
-                            'color': (255, 160, 30),
-                            'x': float(start_m['x']),
-                            'y': float(start_m['y']),
-                            'alpha': 255.0,
-                            'vy': -40.0,
-                        })
-
-        for car in cars:
-            if car.done:
-                completed_stats.append((car.path_length, car.travel_time, car.idle_time))
+        for kind, x, y in sim_task.drain_events():
+            if kind == 'delivered':
                 first_car_spawned = True
-                hint_particles.append({
-                    'text': '+1',
-                    'color': (80, 220, 80),
-                    'x': float(car.x),
-                    'y': float(car.y),
-                    'alpha': 255.0,
-                    'vy': -60.0,
-                })
-        cars = [c for c in cars if not c.done]
-
-        if len(completed_stats) != _stats_len or spawn_attempts != _prev_attempts:
-            new_flow_rate = calculate_flow_rate(completed_stats, spawn_attempts, spawn_successes)
-            _stats_len = len(completed_stats)
-            _prev_attempts = spawn_attempts
+                particles.emit('+1', (80, 220, 80), x, y, -60.0)
+            else:
+                particles.emit('?', (255, 160, 30), x, y, -40.0)
+
+        if snapshot.delivered != _stats_len or snapshot.spawn_attempts != _prev_attempts:
+            new_flow_rate = snapshot.flow_rate
+            _stats_len = snapshot.delivered
+            _prev_attempts = snapshot.spawn_attempts
             if abs(new_flow_rate - prev_flow_rate) > 0.001:
                 score_delta = new_flow_rate - prev_flow_rate
                 delta_alpha = 255.0
                 delta_y_offset = 0.0
                 prev_flow_rate = new_flow_rate
             flow_rate = new_flow_rate
+            if results is not None:
+                results['flow_rate'] = flow_rate
+                results['delivered'] = snapshot.delivered
 
         if delta_alpha > 0:
             delta_alpha = max(0.0, delta_alpha - 127.5 * dt)
             delta_y_offset -= 25.0 * dt
 
         if not game_ended:
-            for event in pygame.event.get():
+            for event in inputs.get_events():
                 normalized = normalize_pointer_event(event, WINDOW_WIDTH, WINDOW_HEIGHT)
                 if normalized and browser_mode and normalized["kind"] == "down" and normalized["button"] == 1:
-                    now_ms = pygame.time.get_ticks()
+                    now_ms = inputs.now_ms()
                     if is_duplicate_pointer_down(normalized, recent_pointer_down, now_ms):
                         normalized = None
                     else:
@@ -1577,24 +1536,14 @@ async def run_game(screen, selected_city, selected_level, unlocked_levels=None):
                                 CELL_SIZE,
                             )
                             if restored:
-                                hint_particles.append({
-                                    'text': 'U',
-                                    'color': (80, 220, 80),
-                                    'x': pending_undo_data['x'],
-                                    'y': pending_undo_data['y'],
-                                    'alpha': 255.0,
-                                    'vy': -55.0,
-                                })
+                                particles.emit(
+                                    'U', (80, 220, 80), pending_undo_data['x'], pending_undo_data['y'], -55.0
+                                )
                                 selected_intersection = restored
                             else:
-                                hint_particles.append({
-                                    'text': 'X',
-                                    'color': (255, 100, 100),
-                                    'x': pending_undo_data['x'],
-                                    'y': pending_undo_data['y'],
-                                    'alpha': 255.0,
-                                    'vy': -45.0,
-                                })
+                                particles.emit(
+                                    'X', (255, 100, 100), pending_undo_data['x'], pending_undo_data['y'], -45.0
+                                )
                             pending_undo_data = None
                             undo_timer = 0.0
                             continue
@@ -1604,7 +1553,7 @@ async def run_game(screen, selected_city, selected_level, unlocked_levels=None):
                     if start_button_rect.collidepoint(pos):
                         is_started = not is_started
                         is_paused = False
-                        spawn_timer = 0.0
+                        sim.spawn_timer = 0.0
                         continue
                     if pause_button_rect.collidepoint(pos):
                         if is_started and not is_paused:
@@ -1634,14 +1583,9 @@ async def run_game(screen, selected_city, selected_level, unlocked_levels=None):
                                 if slot_rect.collidepoint(pos):
                                     handled_palette_click = True
                                     if itype in used_palette_types:
-                                        hint_particles.append({
-                                            'text': 'USED',
-                                            'color': (255, 120, 120),
-                                            'x': float(slot_rect.centerx),
-                                            'y': float(slot_rect.centery),
-                                            'alpha': 255.0,
-                                            'vy': -36.0,
-                                        })
+                                        particles.emit(
+                                            'USED', (255, 120, 120), slot_rect.centerx, slot_rect.centery, -36.0
+                                        )
                                     else:
                                         touch_palette_selection = itype
                                         selected_intersection = None
@@ -1661,14 +1605,9 @@ async def run_game(screen, selected_city, selected_level, unlocked_levels=None):
                                 if slot_rect.collidepoint(pos):
                                     handled_palette_click = True
                                     if itype in used_palette_types:
-                                        hint_particles.append({
-                                            'text': 'USED',
-                                            'color': (255, 120, 120),
-                                            'x': float(slot_rect.centerx),
-                                            'y': float(slot_rect.centery),
-                                            'alpha': 255.0,
-                                            'vy': -36.0,
-                                        })
+                                        particles.emit(
+                                            'USED', (255, 120, 120), slot_rect.centerx, slot_rect.centery, -36.0
+                                        )
                                     else:
                                         dragging_intersection = Intersection(
                                             None, None, pos[0], pos[1], intersection_type=itype
@@ -1764,26 +1703,23 @@ async def run_game(screen, selected_city, selected_level, unlocked_levels=None):
                             CELL_SIZE,
                         )
                         if restored:
-                            hint_particles.append({
-                                'text': 'U',
-                                'color': (80, 220, 80),
-                                'x': pending_undo_data['x'],
-                                'y': pending_undo_data['y'],
-                                'alpha': 255.0,
-                                'vy': -55.0,
-                            })
+                            particles.emit(
+                                'U', (80, 220, 80), pending_undo_data['x'], pending_undo_data['y'], -55.0
+                            )
                             selected_intersection = restored
                         else:
-                            hint_particles.append({
-                                'text': 'X',
-                                'color': (255, 100, 100),
-                                'x': pending_undo_data['x'],
-                                'y': pending_undo_data['y'],
-                                'alpha': 255.0,
-                                'vy': -45.0,
-                            })
+                            particles.emit(
+                                'X', (255, 100, 100), pending_undo_data['x'], pending_undo_data['y'], -45.0
+                            )
                         pending_undo_data = None
                         undo_timer = 0.0
+                    elif event.key == pygame.K_F3:
+                        show_quality = not show_quality
+                    elif event.key == pygame.K_h:
+                        show_heatmap = not show_heatmap
+                        if show_heatmap:
+                            heatmap.reset()
+                            heatmap_steps = snapshot.steps
                     elif event.key in (pygame.K_ESCAPE, pygame.K_p):
                         if is_started and not is_paused:
                             is_paused = True
@@ -1799,12 +1735,24 @@ async def run_game(screen, selected_city, selected_level, unlocked_levels=None):
         if dragging_intersection:
             dragging_intersection.update_position(mouse_pos)
 
-        if is_started and not is_paused:
-            for car in cars:
-                car.update(dt)
+        preview_status, preview_value = None, None
+        if previews.enabled:
+            hover_cell = None
+            if dragging_intersection and not game_ended:
+                hover_cell = find_grid_cell_at_pos(mouse_pos, grid_start_x, grid_start_y, CELL_SIZE, rows, cols)
+            target = None if hover_cell is None else (
+                hover_cell, dragging_intersection.intersection_type, dragging_intersection.rotation,
+            )
+            if target != preview_target:
+                preview_target = target
+                if target is None:
+                    previews.clear()
+                else:
+                    previews.request(Layout.capture(network, spawn_markers), *target)
+            preview_status, preview_value = previews.poll()
 
         screen.fill(BACKGROUND_COLOR)
-        game_hour = draw_clock(screen, game_timer, font, center=clock_anchor)
+        game_hour = draw_clock(screen, snapshot.game_timer, font, center=clock_anchor)
         if (7 <= game_hour < 10) or (16 <= game_hour < 19):
             rh_surf = small_font.render("RUSH HOUR", True, (255, 165, 40))
             screen.blit(rh_surf, rh_surf.get_rect(center=rush_anchor))
@@ -1827,14 +1775,14 @@ async def run_game(screen, selected_city, selected_level, unlocked_levels=None):
         fr_text = hud_font.render(f"Flow: {flow_rate:.2f}", True, fr_color)
         screen.blit(fr_text, fr_text.get_rect(bottomright=(WINDOW_WIDTH - 10, WINDOW_HEIGHT - 25)))
 
-        vol = get_current_volume(selected_city, game_timer, GAME_DAY_LENGTH)
+        vol = get_current_volume(selected_city, snapshot.game_timer, GAME_DAY_LENGTH)
         vol_text = hud_font.render(f"Traffic: {vol}", True, (200, 200, 200))
         screen.blit(vol_text, vol_text.get_rect(bottomright=(WINDOW_WIDTH - 10, WINDOW_HEIGHT - 45)))
 
-        active_text = hud_font.render(f"Cars: {len(cars)}", True, (200, 200, 200))
+        active_text = hud_font.render(f"Cars: {len(snapshot.cars)}", True, (200, 200, 200))
         screen.blit(active_text, active_text.get_rect(bottomright=(WINDOW_WIDTH - 10, WINDOW_HEIGHT - 65)))
 
-        done_text = hud_font.render(f"Delivered: {len(completed_stats)}", True, (200, 200, 200))
+        done_text = hud_font.render(f"Delivered: {snapshot.delivered}", True, (200, 200, 200))
         screen.blit(done_text, done_text.get_rect(bottomright=(WINDOW_WIDTH - 10, WINDOW_HEIGHT - 85)))
 
         diff_labels = {
@@ -1857,12 +1805,19 @@ async def run_game(screen, selected_city, selected_level, unlocked_levels=None):
                 delta_surf.get_rect(bottomright=(WINDOW_WIDTH - 10, int(base_y + delta_y_offset))),
             )
 
+        if show_quality:
+            quality_text = f"Quality {quality.level} ({quality.name}) {quality.mean_ms:.1f} ms"
+            quality_surf = hud_font.render(quality_text, True, (200, 200, 200))
+            screen.blit(quality_surf, quality_surf.get_rect(topright=(WINDOW_WIDTH - 10, pause_button_rect.bottom + 8)))
+
         if pending_undo_data and undo_timer > 0.0 and not game_ended:
             draw_undo_prompt(screen, small_font, undo_timer, anchor_x=150)
 
         draw_pause_controls(screen, start_button_rect, pause_button_rect, is_paused, is_started, small_font, mouse_pos)
 
         if not game_ended and not browser_mode:
+            if not palette_open:
+                sparklines.draw(screen, (20, palette_toggle_rect.bottom + 18))
             draw_control_hint_strip(screen, hint_font)
             if back_button_hovered:
                 draw_button_tooltip(screen, marker_font, back_button_rect, "Back to level select")
@@ -1920,25 +1875,23 @@ async def run_game(screen, selected_city, selected_level, unlocked_levels=None):
                 pygame.draw.rect(screen, GRID_COLOR, (x, y, CELL_SIZE, CELL_SIZE), 3)
 
         network.draw(screen, highlighted_intersection=selected_intersection)
+        if show_heatmap:
+            heatmap.draw(screen)
         draw_spawn_markers(screen, spawn_markers, marker_font, label_alpha)
 
-        for car in cars:
-            car.draw(screen)
+        for car_state in snapshot.cars:
+            draw_car_state(screen, car_state, snapshot.alpha)
 
-        for particle in hint_particles:
-            particle['y'] += particle['vy'] * dt
-            particle['alpha'] = max(0.0, particle['alpha'] - 255.0 * dt)
-        hint_particles = [particle for particle in hint_particles if particle['alpha'] > 0]
-        for particle in hint_particles:
-            particle_surf = marker_font.render(particle['text'], True, particle['color'])
-            particle_surf.set_alpha(int(particle['alpha']))
-            screen.blit(
-                particle_surf,
-                particle_surf.get_rect(center=(int(particle['x']), int(particle['y']))),
-            )
+        if quality.hint_particles:
+            particles.update(dt)
+            particles.draw(screen)
+        else:
+            particles.clear()
 
         if dragging_intersection:
             dragging_intersection.draw(screen)
+            if preview_status:
+                draw_preview_delta(screen, hud_font, mouse_pos, preview_status, preview_value)
 
         if browser_mode and not game_ended:
             draw_touch_toolbar(screen, touch_font, mouse_pos, touch_action_states)
@@ -1953,12 +1906,14 @@ async def run_game(screen, selected_city, selected_level, unlocked_levels=None):
                         unlocked_levels.get(selected_city, 1),
                         selected_level + 1,
                     )
+                if results is not None:
+                    results['passed'] = level_passed
                 progress_recorded = True
 
             again_rect, menu_rect, next_rect = draw_end_screen(
                 screen,
                 flow_rate,
-                len(completed_stats),
+                snapshot.delivered,
                 selected_city,
                 selected_level,
                 level_target,
@@ -1968,12 +1923,13 @@ async def run_game(screen, selected_city, selected_level, unlocked_levels=None):
                 title_font,
                 small_font,
                 mouse_pos,
+                seed=streams.seed,
             )
 
-            for event in pygame.event.get():
+            for event in inputs.get_events():
                 normalized = normalize_pointer_event(event, WINDOW_WIDTH, WINDOW_HEIGHT)
                 if normalized and browser_mode and normalized["kind"] == "down" and normalized["button"] == 1:
-                    now_ms = pygame.time.get_ticks()
+                    now_ms = inputs.now_ms()
                     if is_duplicate_pointer_down(normalized, recent_pointer_down, now_ms):
                         normalized = None
                     else:
@@ -2004,14 +1960,193 @@ async def run_game(screen, selected_city, selected_level, unlocked_levels=None):
     return True
 
 
-async def async_main():
-    """Main function managing menu, level-select, and gameplay states."""
+SANDBOX_FILL = 0.9            # share of sandbox cells given an intersection
+SANDBOX_PAN_SPEED = 600.0     # screen pixels per second for the arrow keys
+SANDBOX_MARKER_SPACING = 50   # board rows + cols per start (and per end) marker
+
+
+def parse_board_size(text):
+    """Parse a "ROWSxCOLS" board size such as 200x200."""
+    try:
+        rows, cols = (int(part) for part in text.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected ROWSxCOLS, got {text!r}")
+    if not (1 <= rows <= 1000 and 1 <= cols <= 1000):
+        raise argparse.ArgumentTypeError("rows and columns must be between 1 and 1000")
+    return rows, cols
+
+
+def build_sandbox(rows, cols, streams, fill=SANDBOX_FILL):
+    """A rows x cols board at world origin (0, 0), randomly filled, with a generated level.
+
+    Returns (network, level) where level is a level_generator.GeneratedLevel
+    with more markers the bigger the board.
+    """
+    count = max(2, (rows + cols) // SANDBOX_MARKER_SPACING)
+    level = generate_level(rows, cols, count, count, CELL_SIZE, streams)
+    rng = streams.markers
+    types = list(IntersectionType)
+    cells = [
+        (row, col, rng.choice(types), rng.randrange(4))
+        for row in range(rows) for col in range(cols)
+        if rng.random() < fill
+    ]
+    network, _ = Layout(rows, cols, CELL_SIZE, [], cells).build()
+    return network, level
+
+
+async def run_sandbox(screen, rows, cols, seed=None, inputs=None, city="New York City", traffic='cars'):
+    """Watch traffic on a large random board through a pan/zoom camera.
+
+    Drag or use the arrow keys to pan, scroll to zoom, F to fit the board,
+    H for the heatmap, M for the minimap (click it to jump there), Space to
+    pause and Esc to quit. traffic picks the model: 'cars' for the game's
+    Simulation, 'cells' for the cell_automaton one. Returns False when the
+    window is closed.
+    """
+    pygame.display.set_caption(f"City Limits - Sandbox {rows}x{cols}")
+    streams = RandomStreams(seed)
+    network, level = build_sandbox(rows, cols, streams)
+    spawn_markers = level.markers
+    if traffic == 'cells':
+        sim_task = CellTrafficTask(network, spawn_markers, city, 3, GAME_DAY_LENGTH,
+                                   start_time=GAME_DAY_LENGTH * 7 / 24, streams=streams, demand=level.demand)
+    else:
+        sim = Simulation(network, spawn_markers, city, 3, GAME_DAY_LENGTH,
+                         start_time=GAME_DAY_LENGTH * 7 / 24, streams=streams, demand=level.demand)
+        sim_task = SimulationTask(sim)
+    if inputs is None:
+        inputs = LiveInput(normalize=normalize_pointer_event, width=WINDOW_WIDTH, height=WINDOW_HEIGHT)
+
+    margin = MARKER_OFFSET + MARKER_RADIUS
+    camera = Camera(
+        (0, 0, WINDOW_WIDTH, WINDOW_HEIGHT),
+        (-margin, -margin, cols * CELL_SIZE + 2 * margin, rows * CELL_SIZE + 2 * margin),
+    )
+    camera.fit()
+    renderer = BoardRenderer(network, spawn_markers, camera, {
+        'cell': CELL_COLOR, 'grid': GRID_COLOR, 'start': START_COLOR, 'end': END_COLOR,
+        'marker_radius': MARKER_RADIUS, 'marker_offset': MARKER_OFFSET,
+    })
+    heatmap = CongestionHeatmap(rows, cols, 0, 0, CELL_SIZE)
+    show_heatmap = False
+    heatmap_steps = 0
+    minimap = Minimap(network, CELL_COLOR)
+    minimap.rect.bottomright = (WINDOW_WIDTH - MINIMAP_MARGIN, WINDOW_HEIGHT - 40)
+    show_minimap = True
+    font = pygame.font.Font(None, 36)
+    hud_font = pygame.font.Font(None, 22)
+    hint_font = pygame.font.Font(None, 24)
+
+    is_paused = False
+    dragging = False
+    pan_keys = {pygame.K_LEFT: (1, 0), pygame.K_RIGHT: (-1, 0), pygame.K_UP: (0, 1), pygame.K_DOWN: (0, -1)}
+    held = set()
+    pointer_pos = (WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2)
+
+    while True:
+        frame_ms = inputs.tick(60)
+        dt = min(frame_ms / 1000.0, MAX_FRAME_TIME)
+        if not is_paused:
+            sim_task.feed(dt)
+        snapshot = sim_task.snapshot
+        sim_task.drain_events()
+        if show_heatmap and snapshot.steps > heatmap_steps:
+            heatmap.accumulate(snapshot.cars, (snapshot.steps - heatmap_steps) * SIM_DT)
+            heatmap_steps = snapshot.steps
+
+        for event in inputs.get_events():
+            if event.type == pygame.QUIT:
+                return False
+            if event.type == pygame.KEYDOWN:
+                if event.key in (pygame.K_ESCAPE, pygame.K_q):
+                    return True
+                if event.key in pan_keys:
+                    held.add(event.key)
+                elif event.key == pygame.K_SPACE:
+                    is_paused = not is_paused
+                elif event.key == pygame.K_f:
+                    camera.fit()
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_MINUS):
+                    camera.zoom_by(-1 if event.key == pygame.K_MINUS else 1)
+                elif event.key == pygame.K_h:
+                    show_heatmap = not show_heatmap
+                    if show_heatmap:
+                        heatmap.reset()
+                        heatmap_steps = snapshot.steps
+                elif event.key == pygame.K_m:
+                    show_minimap = not show_minimap
+                    if show_minimap:
+                        minimap.reset()
+            elif event.type == pygame.KEYUP:
+                held.discard(event.key)
+            elif event.type == pygame.MOUSEWHEEL:
+                camera.zoom_by(1 if event.y > 0 else -1, pointer_pos)
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button in (1, 2, 3):
+                pointer_pos = event.pos
+                if show_minimap and minimap.rect.collidepoint(event.pos):
+                    camera.center_on(*minimap.minimap_to_world(*event.pos))
+                else:
+                    dragging = True
+            elif event.type == pygame.MOUSEBUTTONUP and event.button in (1, 2, 3):
+                dragging = False
+            elif event.type == pygame.MOUSEMOTION:
+                if dragging:
+                    camera.pan(event.pos[0] - pointer_pos[0], event.pos[1] - pointer_pos[1])
+                pointer_pos = event.pos
+        for key in held:
+            dx, dy = pan_keys[key]
+            camera.pan(dx * SANDBOX_PAN_SPEED * dt, dy * SANDBOX_PAN_SPEED * dt)
+
+        screen.fill(BACKGROUND_COLOR)
+        overlay = (lambda target: heatmap.draw(target, camera)) if show_heatmap else None
+        renderer.draw(screen, snapshot.cars, snapshot.alpha, overlay=overlay)
+        if show_minimap:
+            if minimap.due:
+                columns = renderer.car_columns(snapshot.cars)
+                minimap.update(columns[3], columns[4])
+            minimap.draw(screen, camera)
+
+        draw_clock(screen, snapshot.game_timer, font)
+        status = (f"{rows}x{cols} | zoom {camera.zoom:g} | cars {len(snapshot.cars)} | "
+                  f"sprites {renderer.drawn} | flow {snapshot.flow_rate:.2f} | {frame_ms:.0f} ms")
+        if is_paused:
+            status += " | paused"
+        status_surf = hud_font.render(status, True, (225, 225, 225))
+        screen.blit(status_surf, (10, 44))
+        msg_surf = hint_font.render("Drag/arrows pan | Wheel zoom | F fit | H heatmap | M minimap | Space pause | Esc quit",
+                                    True, (225, 225, 225))
+        screen.blit(msg_surf, msg_surf.get_rect(bottomleft=(18, WINDOW_HEIGHT - 14)))
+
+        pygame.display.flip()
+        await asyncio.sleep(0)
+
+
+async def sandbox_main(rows, cols, seed=None, inputs=None, traffic='cars'):
+    """Open the window and run the sandbox until it is closed."""
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    if inputs is None:
+        inputs = LiveInput(normalize=normalize_pointer_event, width=WINDOW_WIDTH, height=WINDOW_HEIGHT)
+    await run_sandbox(screen, rows, cols, seed=seed, inputs=inputs, traffic=traffic)
+    inputs.close()
+    pygame.quit()
+
+
+async def async_main(seed=None, inputs=None, results=None, telemetry=None, metrics_path=None):
+    """Main function managing menu, level-select, and gameplay states.
+
+    A given seed is reused for every level played, so replays are identical.
+    inputs, results and telemetry are passed through to run_game; telemetry
+    is closed on exit. With metrics_path, each game's per-minute metrics are
+    written there as CSV when the game ends (overwriting the previous one).
+    """
     screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
     pygame.display.set_caption("City Limits")
 
     font = pygame.font.Font(None, 36)
     title_font = pygame.font.Font(None, 72)
-    frame_clock = pygame.time.Clock()
+    if inputs is None:
+        inputs = LiveInput(normalize=normalize_pointer_event, width=WINDOW_WIDTH, height=WINDOW_HEIGHT)
     browser_mode = is_browser_runtime()
     recent_pointer_down = None
 
@@ -2023,7 +2158,7 @@ async def async_main():
 
     running = True
     while running:
-        frame_clock.tick(60)
+        inputs.tick(60)
 
         if current_state == STATE_MENU:
             all_unlocked = all(level >= MAX_LEVEL for level in unlocked_levels.values())
@@ -2035,10 +2170,10 @@ async def async_main():
                 touch_mode=browser_mode,
             )
 
-            for event in pygame.event.get():
+            for event in inputs.get_events():
                 normalized = normalize_pointer_event(event, WINDOW_WIDTH, WINDOW_HEIGHT)
                 if normalized and browser_mode and normalized["kind"] == "down" and normalized["button"] == 1:
-                    now_ms = pygame.time.get_ticks()
+                    now_ms = inputs.now_ms()
                     if is_duplicate_pointer_down(normalized, recent_pointer_down, now_ms):
                         normalized = None
                     else:
@@ -2076,10 +2211,10 @@ async def async_main():
                 touch_mode=browser_mode,
             )
 
-            for event in pygame.event.get():
+            for event in inputs.get_events():
                 normalized = normalize_pointer_event(event, WINDOW_WIDTH, WINDOW_HEIGHT)
                 if normalized and browser_mode and normalized["kind"] == "down" and normalized["button"] == 1:
-                    now_ms = pygame.time.get_ticks()
+                    now_ms = inputs.now_ms()
                     if is_duplicate_pointer_down(normalized, recent_pointer_down, now_ms):
                         normalized = None
                     else:
@@ -2107,9 +2242,14 @@ async def async_main():
             await asyncio.sleep(0)
 
         elif current_state == STATE_GAME:
-            result = await run_game(screen, selected_city, selected_level, unlocked_levels)
+            result = "REPLAY"
             while result == "REPLAY":
-                result = await run_game(screen, selected_city, selected_level, unlocked_levels)
+                metrics = MetricsRing()
+                result = await run_game(screen, selected_city, selected_level, unlocked_levels,
+                                        seed=seed, results=results, inputs=inputs, telemetry=telemetry,
+                                        metrics=metrics)
+                if metrics_path:
+                    metrics.export_csv(metrics_path)
             if result == "NEXT_LEVEL":
                 selected_level = min(MAX_LEVEL, selected_level + 1)
                 current_state = STATE_GAME
@@ -2118,13 +2258,50 @@ async def async_main():
             else:
                 running = False
 
+    inputs.close()
+    if telemetry is not None:
+        telemetry.close()
+    shutdown_previews()
     pygame.quit()
     raise SystemExit
 
 
+def parse_args(argv=None):
+    """Parse command-line options. Unknown options are ignored (the browser runtime adds its own)."""
+    parser = argparse.ArgumentParser(description="City Limits")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed for every random stream, for reproducible runs")
+    parser.add_argument("--record", metavar="PATH", default=None,
+                        help="record every input to a session log for tools/replay_session.py")
+    parser.add_argument("--telemetry", metavar="PATH", default=None,
+                        help="append a row per trip to a columnar telemetry file")
+    parser.add_argument("--metrics", metavar="PATH", default=None,
+                        help="write each game's per-minute metrics to a CSV file")
+    parser.add_argument("--sandbox", metavar="ROWSxCOLS", type=parse_board_size, default=None,
+                        help="watch traffic on a large random board with a pan/zoom camera")
+    parser.add_argument("--traffic", choices=('cars', 'cells'), default='cars',
+                        help="traffic model for --sandbox: the game's cars or the cell automaton")
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+
 def main():
     """Launch the game on desktop or in the browser."""
-    asyncio.run(async_main())
+    args = parse_args()
+    seed = args.seed
+    inputs = None
+    if args.record:
+        # A replay needs the seed, so pin one down before anything is random.
+        seed = new_seed() if seed is None else seed
+        inputs = LiveInput(args.record, seed, normalize_pointer_event, WINDOW_WIDTH, WINDOW_HEIGHT)
+    if args.sandbox:
+        asyncio.run(sandbox_main(*args.sandbox, seed=seed, inputs=inputs, traffic=args.traffic))
+        return
+    telemetry = None
+    if args.telemetry:
+        # Browser builds have no threads; write chunks inline there.
+        telemetry = TelemetryWriter(args.telemetry, background=not is_browser_runtime())
+    asyncio.run(async_main(seed=seed, inputs=inputs, telemetry=telemetry, metrics_path=args.metrics))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,381 @@
+"""Mesoscopic queue-based simulation for city-scale what-if runs.
+
+Each directed connection between neighbouring intersections is a FIFO link
+with a free-flow travel time and a discharge capacity (vehicles/second).
+Trips are grouped into packets — every vehicle with the same route that
+departs inside one packet window — and a packet moves link to link as a
+single event. Queueing follows a point-queue model: a link remembers how
+many vehicles are still ahead of the next arrival and drains them at its
+capacity, so the cost of a run grows with packets × links rather than with
+vehicles or simulated seconds.
+
+simulate_days runs a week, a year or any span of calendar days, each with
+its own weekday/weekend and month-of-year demand. Days reuse one engine
+and only aggregated accumulators outlive a day, so memory does not grow
+with the number of days simulated.
+"""
+
+import datetime
+import heapq
+import math
+
+from car import CAR_SPEED
+from scoring import calculate_flow_rate
+from throughput import CONTROL_SIGNAL, SERVICE_PROFILES
+from traffic_data import TRAFFIC_DATA, daily_profile, day_type
+
+FULL_DAY_SECONDS = 24 * 3600.0
+FLOW_RATE_BINS = 20                             # histogram bins over flow rates 0–1
+DEFAULT_START_DATE = datetime.date(2024, 1, 1)  # a Monday
+MONTH_NAMES = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+def link_capacity(intersection):
+    """Vehicles per second that can leave a link into this intersection."""
+    profile = SERVICE_PROFILES[intersection.intersection_type]
+    rate = profile['capacity'] / profile['service_time']
+    if profile['control'] == CONTROL_SIGNAL:
+        rate *= 0.5  # each approach only has green half the cycle
+    return rate
+
+
+class MesoscopicEngine:
+    """Moves packets of vehicles through capacity-limited FIFO links."""
+
+    def __init__(self, network, speed=CAR_SPEED):
+        """
+        Initialize the engine.
+
+        Args:
+            network: IntersectionNetwork whose connections become links
+            speed: Free-flow speed in pixels per second
+        """
+        self.network = network
+        self.speed = speed
+
+        self._link_index = {}    # {(from_cell, to_cell): link id}
+        self.link_length = []    # pixels
+        self.link_free_time = [] # seconds at free-flow speed
+        self.link_capacity = []  # vehicles per second
+        for (row, col), intersection in sorted(network.placed_intersections.items()):
+            for direction in ('up', 'down', 'left', 'right'):
+                neighbor = intersection.get_neighbor(direction)
+                if neighbor is None:
+                    continue
+                length = ((neighbor.x - intersection.x) ** 2 + (neighbor.y - intersection.y) ** 2) ** 0.5
+                self._link_index[((row, col), (neighbor.row, neighbor.col))] = len(self.link_length)
+                self.link_length.append(length)
+                self.link_free_time.append(length / speed)
+                self.link_capacity.append(link_capacity(neighbor))
+
+        self._backlog = [0.0] * len(self.link_length)       # vehicles queued per link
+        self._backlog_time = [0.0] * len(self.link_length)  # when each backlog was measured
+        self._routes = {}        # {tuple of cells: (link ids, length)}
+        self.completed_stats = []
+        self.trips = 0
+        self.spawn_attempts = 0
+        self.spawn_successes = 0
+
+        # Pending packets, ordered by the time their head reaches a link end.
+        self._events = []
+        self._seq = 0
+
+    def reset(self):
+        """Forget all traffic and results, keeping the links and cached routes."""
+        self._backlog = [0.0] * len(self.link_length)
+        self._backlog_time = [0.0] * len(self.link_length)
+        self.completed_stats = []
+        self.trips = 0
+        self.spawn_attempts = 0
+        self.spawn_successes = 0
+        self._events = []
+        self._seq = 0
+
+    def route_for(self, intersection_path):
+        """Return (link ids, pixel length) for a path, or None if it is not drivable."""
+        key = tuple((i.row, i.col) for i in intersection_path)
+        cached = self._routes.get(key)
+        if cached is not None or key in self._routes:
+            return cached
+        links = []
+        for a, b in zip(key, key[1:]):
+            link = self._link_index.get((a, b))
+            if link is None:
+                self._routes[key] = None
+                return None
+            links.append(link)
+        route = (tuple(links), sum(self.link_length[link] for link in links))
+        self._routes[key] = route
+        return route
+
+    def add_packet(self, intersection_path, depart_time, count, spread=0.0):
+        """
+        Queue a packet of vehicles departing along a path.
+
+        Args:
+            intersection_path: List of Intersection objects from start to end
+            depart_time: Seconds at which the first vehicle departs
+            count: Number of vehicles in the packet
+            spread: Seconds between the first and last departure
+
+        Returns False (and counts the vehicles as unroutable) when the path
+        cannot be driven.
+        """
+        self.spawn_attempts += count
+        route = self.route_for(intersection_path) if intersection_path else None
+        if route is None:
+            return False
+        self.spawn_successes += count
+        links, length = route
+        if not links:
+            self._finish(count, length, 0.0, 0.0)
+            return True
+        packet = [links, 0, count, spread, 0.0, length]
+        self._push(depart_time + self.link_free_time[links[0]], packet)
+        return True
+
+    def _push(self, time, packet):
+        self._seq += 1
+        heapq.heappush(self._events, (time, self._seq, packet))
+
+    def _finish(self, count, length, travel, idle):
+        self.trips += count
+        self.completed_stats.append((length * count, travel * count, idle * count))
+
+    def run(self, until=float('inf')):
+        """Process packet events up to the given simulated time."""
+        events = self._events
+        free_time = self.link_free_time
+        capacity = self.link_capacity
+        backlog = self._backlog
+        backlog_time = self._backlog_time
+
+        pop = heapq.heappop
+        while events and events[0][0] <= until:
+            time, _, packet = pop(events)
+            links, leg, count, spread, delay, length = packet
+            link = links[leg]
+            cap = capacity[link]
+
+            # Drain the link's queue up to now, then join the back of it.
+            ahead = backlog[link] - cap * (time - backlog_time[link])
+            if ahead < 0.0:
+                ahead = 0.0
+            backlog[link] = ahead + count
+            backlog_time[link] = time
+
+            # Vehicles arrive over `spread` seconds and leave at `cap`;
+            # average their waits over the packet.
+            head_wait = ahead / cap
+            headway = spread / count if count > 1 else 0.0
+            slack = headway - 1.0 / cap
+            if slack >= 0.0:
+                waiting = count if slack == 0.0 else min(count, int(head_wait / slack) + 1)
+                avg_wait = (waiting * head_wait - slack * waiting * (waiting - 1) / 2) / count
+            else:
+                avg_wait = head_wait - slack * (count - 1) / 2
+            packet[3] = max(spread, count / cap)
+            delay += avg_wait
+            packet[4] = delay
+
+            leg += 1
+            if leg == len(links):
+                self._finish(count, length, length / self.speed + delay, delay)
+                continue
+            packet[1] = leg
+            self._push(time + head_wait + free_time[links[leg]], packet)
+
+    def flow_rate(self):
+        """Flow rate of every finished packet, penalising unroutable vehicles."""
+        return calculate_flow_rate(self.completed_stats, self.spawn_attempts, self.spawn_successes)
+
+
+def hourly_trip_counts(city, total_trips, profile=None):
+    """Split a day's trips across 24 hours in proportion to a city's traffic profile."""
+    volumes = profile if profile is not None else TRAFFIC_DATA.get(city, TRAFFIC_DATA["New York City"])
+    total_volume = float(sum(volumes))
+    exact = [total_trips * v / total_volume for v in volumes]
+    counts = [int(x) for x in exact]
+    # Largest-remainder rounding keeps the total exact without randomness.
+    shortfall = total_trips - sum(counts)
+    for hour in sorted(range(24), key=lambda h: exact[h] - counts[h], reverse=True)[:shortfall]:
+        counts[hour] += 1
+    return counts
+
+
+def simulate_day(network, od_paths, city, total_trips, packet_seconds=60.0,
+                 day_length=FULL_DAY_SECONDS, profile=None, engine=None):
+    """
+    Run one day of demand through a MesoscopicEngine.
+
+    Args:
+        network: IntersectionNetwork to simulate
+        od_paths: List of intersection paths, one per origin/destination pair;
+            an empty path counts as unroutable demand
+        city: TRAFFIC_DATA key whose hourly profile shapes demand
+        total_trips: Vehicles departing over the whole day
+        packet_seconds: Departure window grouped into one packet
+        day_length: Simulated seconds in one 24-hour day
+        profile: Optional 24-value volume list overriding the city profile
+        engine: MesoscopicEngine for this network to reset and reuse
+            (default: a new one)
+
+    Returns the finished engine; read flow_rate() and completed_stats from it.
+    """
+    if engine is None:
+        engine = MesoscopicEngine(network)
+    else:
+        engine.reset()
+    if not od_paths:
+        return engine
+
+    hour_length = day_length / 24.0
+    windows = max(1, int(round(hour_length / packet_seconds)))
+    window_length = hour_length / windows
+    slots = len(od_paths) * windows
+
+    for hour, trips in enumerate(hourly_trip_counts(city, total_trips, profile)):
+        base, extra = divmod(trips, slots)
+        for slot in range(slots):
+            count = base + (1 if slot < extra else 0)
+            if count == 0:
+                continue
+            window, pair = divmod(slot, len(od_paths))
+            depart = hour * hour_length + window * window_length
+            engine.add_packet(od_paths[pair], depart, count, spread=window_length)
+
+    engine.run()
+    return engine
+
+
+class FlowRateDistribution:
+    """Running distribution of per-day flow rates in constant memory.
+
+    Keeps the count, mean and variance (Welford's method), the extremes
+    and a FLOW_RATE_BINS histogram over 0–1 from which quantiles are read.
+    """
+
+    def __init__(self, bins=FLOW_RATE_BINS):
+        """
+        Initialize an empty distribution.
+
+        Args:
+            bins: Histogram bins spanning flow rates 0–1
+        """
+        self.days = 0
+        self.mean = 0.0
+        self.min = None
+        self.max = None
+        self.counts = [0] * bins
+        self._m2 = 0.0
+
+    def add(self, flow_rate):
+        """Fold in one day's flow rate."""
+        self.days += 1
+        delta = flow_rate - self.mean
+        self.mean += delta / self.days
+        self._m2 += delta * (flow_rate - self.mean)
+        self.min = flow_rate if self.min is None else min(self.min, flow_rate)
+        self.max = flow_rate if self.max is None else max(self.max, flow_rate)
+        bins = len(self.counts)
+        self.counts[min(bins - 1, max(0, int(flow_rate * bins)))] += 1
+
+    @property
+    def stdev(self):
+        """Sample standard deviation (0 with fewer than two days)."""
+        return math.sqrt(self._m2 / (self.days - 1)) if self.days > 1 else 0.0
+
+    def quantile(self, q):
+        """Approximate q-quantile (0–1), interpolated within a histogram bin."""
+        if not self.days:
+            return 0.0
+        bins = len(self.counts)
+        target = q * self.days
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= target:
+                value = (index + (target - seen) / count) / bins
+                return min(max(value, self.min), self.max)
+            seen += count
+        return self.max
+
+    def summary(self):
+        """Dict of days, mean, stdev, min, p10, median, p90 and max."""
+        return {
+            'days': self.days,
+            'mean': self.mean,
+            'stdev': self.stdev,
+            'min': self.min,
+            'p10': self.quantile(0.1),
+            'median': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'max': self.max,
+        }
+
+
+def simulate_days(network, od_paths, city, trips_per_day, days=7, start=DEFAULT_START_DATE,
+                  packet_seconds=60.0, day_length=FULL_DAY_SECONDS, profile=None):
+    """
+    Run consecutive calendar days, each with its own weekly and seasonal demand.
+
+    Each day's hourly demand comes from traffic_data.daily_profile for its
+    weekday and month, and its trip count is trips_per_day scaled by that
+    profile's volume relative to the base weekday profile. Days run one at
+    a time through a single reused engine; only running totals and
+    FlowRateDistribution accumulators are kept between them.
+
+    Args:
+        network: IntersectionNetwork to simulate
+        od_paths: List of intersection paths, one per origin/destination pair
+        city: TRAFFIC_DATA key whose hourly profile shapes demand
+        trips_per_day: Vehicles departing on an average-month weekday
+        days: Number of days to run (7 for a week, 365 for a year)
+        start: datetime.date of the first day
+        packet_seconds: Departure window grouped into one packet
+        day_length: Simulated seconds in one 24-hour day
+        profile: Optional 24-value weekday volume list overriding the city profile
+
+    Returns a dict with days, trips, spawn_attempts, spawn_successes, the
+    overall flow_rate, and distributions: {'all', 'weekday', 'weekend',
+    'Jan'...'Dec': FlowRateDistribution} of per-day flow rates (months not
+    simulated are left out).
+    """
+    base = profile if profile is not None else TRAFFIC_DATA.get(city, TRAFFIC_DATA["New York City"])
+    base_volume = float(sum(base))
+    engine = MesoscopicEngine(network)
+    distributions = {'all': FlowRateDistribution(), 'weekday': FlowRateDistribution(),
+                     'weekend': FlowRateDistribution()}
+    # The flow rate only needs these sums, so the whole run scores exactly.
+    totals = [0.0, 0.0, 0.0]  # path length, travel time, idle time
+    trips = attempts = successes = 0
+
+    for offset in range(days):
+        date = start + datetime.timedelta(days=offset)
+        volumes = daily_profile(city, date.weekday(), date.month, base)
+        day_trips = int(round(trips_per_day * sum(volumes) / base_volume))
+        simulate_day(network, od_paths, city, day_trips, packet_seconds, day_length,
+                     profile=volumes, engine=engine)
+
+        flow_rate = engine.flow_rate()
+        month = MONTH_NAMES[date.month - 1]
+        if month not in distributions:
+            distributions[month] = FlowRateDistribution()
+        for key in ('all', day_type(date.weekday()), month):
+            distributions[key].add(flow_rate)
+        for length, travel, idle in engine.completed_stats:
+            totals[0] += length
+            totals[1] += travel
+            totals[2] += idle
+        trips += engine.trips
+        attempts += engine.spawn_attempts
+        successes += engine.spawn_successes
+    engine.reset()
+
+    return {
+        'days': days,
+        'trips': trips,
+        'spawn_attempts': attempts,
+        'spawn_successes': successes,
+        'flow_rate': calculate_flow_rate([tuple(totals)], attempts, successes),
+        'distributions': distributions,
+    }
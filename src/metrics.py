@@ -0,0 +1,221 @@
+"""Per-game-minute metrics in a fixed-size ring buffer, with sparklines.
+
+MetricsRecorder watches the SimSnapshots the game loop already reads and,
+each time the clock passes a game minute, writes one sample to a
+MetricsRing: trips delivered and spawn failures in that minute, active
+cars and the share of them standing still. The ring is one preallocated
+NumPy array, so a session of any length uses the same memory; once full,
+the oldest minutes are overwritten.
+
+SparklineHUD draws one small chart per metric. Each chart is rendered to
+its own surface only when the ring gains a sample, so a frame costs one
+blit per sparkline.
+"""
+
+import csv
+
+import numpy as np
+import pygame
+
+METRIC_FIELDS = ('throughput', 'active_cars', 'idle_fraction', 'spawn_failures')
+METRICS_CAPACITY = 1440  # one full day of game minutes
+
+SPARKLINE_SIZE = (160, 26)
+SPARKLINE_POINTS = 60    # most recent minutes shown
+SPARKLINE_COLORS = {
+    'throughput': (80, 220, 80),
+    'active_cars': (120, 180, 255),
+    'idle_fraction': (255, 210, 50),
+    'spawn_failures': (255, 80, 80),
+}
+SPARKLINE_LABELS = {
+    'throughput': "Trips/min",
+    'active_cars': "Cars",
+    'idle_fraction': "Idle",
+    'spawn_failures': "Blocked",
+}
+
+
+class MetricsRing:
+    """Fixed-capacity ring of (minute, metric...) samples."""
+
+    def __init__(self, capacity=METRICS_CAPACITY, fields=METRIC_FIELDS):
+        """
+        Initialize the ring.
+
+        Args:
+            capacity: Samples kept; older ones are overwritten
+            fields: Metric names, one column each
+        """
+        self.capacity = capacity
+        self.fields = tuple(fields)
+        self._columns = {name: index + 1 for index, name in enumerate(self.fields)}
+        self._data = np.zeros((capacity, len(self.fields) + 1), dtype=np.float64)  # column 0: minute
+        self._next = 0
+        self.count = 0
+        self.version = 0  # bumped on every record(), for cache invalidation
+
+    def __len__(self):
+        return self.count
+
+    def record(self, minute, **values):
+        """Store one sample; metrics not given are recorded as 0."""
+        row = self._data[self._next]
+        row[0] = minute
+        row[1:] = 0.0
+        for name, value in values.items():
+            row[self._columns[name]] = value
+        self._next = (self._next + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.version += 1
+
+    def _ordered(self, column, last=None):
+        count = self.count if last is None else min(last, self.count)
+        start = (self._next - count) % self.capacity
+        if start + count <= self.capacity:
+            return self._data[start:start + count, column].copy()
+        return np.concatenate((self._data[start:, column], self._data[:self._next, column]))
+
+    def minutes(self, last=None):
+        """Sample minutes, oldest first (the last `last` only, if given)."""
+        return self._ordered(0, last)
+
+    def series(self, name, last=None):
+        """One metric's samples, oldest first (the last `last` only, if given)."""
+        return self._ordered(self._columns[name], last)
+
+    def latest(self):
+        """The newest sample as a {field: value} dict, or None when empty."""
+        if not self.count:
+            return None
+        row = self._data[(self._next - 1) % self.capacity]
+        return {'minute': row[0], **{name: row[i] for name, i in self._columns.items()}}
+
+    def rows(self):
+        """Every sample as a tuple (minute, metric...), oldest first."""
+        columns = [self._ordered(i) for i in range(len(self.fields) + 1)]
+        return list(zip(*(column.tolist() for column in columns)))
+
+    def export_csv(self, path):
+        """Write the samples to a CSV file with a header row."""
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(('minute',) + self.fields)
+            writer.writerows(self.rows())
+
+
+class MetricsRecorder:
+    """Turns SimSnapshots into one MetricsRing sample per game minute."""
+
+    def __init__(self, ring, day_length):
+        """
+        Initialize the recorder.
+
+        Args:
+            ring: MetricsRing to write to
+            day_length: Simulated seconds in a 24-hour game day
+        """
+        self.ring = ring
+        self.minute_length = day_length / 1440.0
+        self._minute = None
+        self._delivered = 0
+        self._failures = 0
+        self._idle_sum = 0.0
+        self._cars_sum = 0.0
+        self._samples = 0
+        self._steps = None
+
+    def observe(self, snapshot):
+        """Fold one snapshot into the current minute; record it once the minute is over."""
+        if snapshot.steps == self._steps:
+            return
+        self._steps = snapshot.steps
+        minute = int(snapshot.game_timer // self.minute_length)
+        failures = snapshot.spawn_attempts - snapshot.spawn_successes
+        if self._minute is None:
+            self._minute = minute
+            self._delivered = snapshot.delivered
+            self._failures = failures
+
+        if minute > self._minute and self._samples:
+            # A long frame can cover several minutes; rates are per minute.
+            elapsed = minute - self._minute
+            self.ring.record(
+                minute - 1,
+                throughput=(snapshot.delivered - self._delivered) / elapsed,
+                active_cars=self._cars_sum / self._samples,
+                idle_fraction=self._idle_sum / self._samples,
+                spawn_failures=(failures - self._failures) / elapsed,
+            )
+            self._minute = minute
+            self._delivered = snapshot.delivered
+            self._failures = failures
+            self._idle_sum = 0.0
+            self._cars_sum = 0.0
+            self._samples = 0
+
+        cars = snapshot.cars
+        if cars:
+            idle = sum(1 for state in cars if state[0] == state[3] and state[1] == state[4])
+            self._idle_sum += idle / len(cars)
+        self._cars_sum += len(cars)
+        self._samples += 1
+
+
+class SparklineHUD:
+    """Cached sparkline surfaces for the fields of a MetricsRing."""
+
+    def __init__(self, ring, font, fields=METRIC_FIELDS, size=SPARKLINE_SIZE, points=SPARKLINE_POINTS):
+        """
+        Initialize the HUD.
+
+        Args:
+            ring: MetricsRing to chart
+            font: Font for the label and latest value
+            fields: Metrics to chart, top to bottom
+            size: (width, height) of each sparkline
+            points: Most recent samples shown
+        """
+        self.ring = ring
+        self.font = font
+        self.fields = tuple(fields)
+        self.size = size
+        self.points = points
+        self._surfaces = {}
+        self._version = None
+
+    def _render(self, name):
+        width, height = self.size
+        surface = pygame.Surface(self.size, pygame.SRCALPHA)
+        surface.fill((25, 25, 25, 200))
+        color = SPARKLINE_COLORS.get(name, (200, 200, 200))
+        values = self.ring.series(name, self.points)
+
+        label = SPARKLINE_LABELS.get(name, name)
+        if len(values):
+            latest = values[-1]
+            text = f"{label} {latest:.0%}" if name == 'idle_fraction' else f"{label} {latest:.0f}"
+        else:
+            text = label
+        text_surf = self.font.render(text, True, (220, 220, 220))
+        surface.blit(text_surf, (4, (height - text_surf.get_height()) // 2))
+
+        chart_x = 4 + max(text_surf.get_width(), width // 2 - 4) + 4
+        chart_w = width - chart_x - 3
+        if len(values) >= 2 and chart_w > 2:
+            top = values.max()
+            top = top if top > 0 else 1.0
+            xs = chart_x + np.arange(len(values)) * (chart_w / (self.points - 1))
+            ys = (height - 3) - values / top * (height - 6)
+            pygame.draw.lines(surface, color, False, list(zip(xs.tolist(), ys.tolist())), 1)
+        return surface
+
+    def draw(self, screen, topleft, spacing=4):
+        """Blit every sparkline, stacked downward from topleft."""
+        if self._version != self.ring.version:
+            self._version = self.ring.version
+            self._surfaces = {name: self._render(name) for name in self.fields}
+        x, y = topleft
+        for name in self.fields:
+            screen.blit(self._surfaces[name], (x, y))
+            y += self.size[1] + spacing
@@ -0,0 +1,132 @@
+"""Corner minimap: the whole board, car density and the camera's view.
+
+The board is drawn once from camera.build_cell_map (one pixel per cell),
+averaged down or scaled up to the minimap's size, and redrawn only when
+the network changes. Cars are never drawn one by one: each refresh bins
+their positions into a small density grid with one np.bincount, blends it
+into a running, exponentially smoothed density, and adds the coloured
+result onto the board image in one BLEND_RGB_ADD blit. Refreshes happen
+every refresh_interval frames; between them a frame costs one blit plus
+the viewport outline, whatever the number of cars.
+"""
+
+import numpy as np
+import pygame
+
+from camera import build_cell_map
+
+MINIMAP_SIZE = 180           # longest side in pixels
+DENSITY_PIXELS = 2           # minimap pixels per density bin along each axis
+MINIMAP_REFRESH = 10         # frames between density refreshes
+DENSITY_SMOOTHING = 0.5      # weight of the newest counts in the running density
+SATURATION_FRACTION = 0.25   # share of the busiest bin's density drawn at full colour
+MINIMAP_BORDER = (200, 200, 200)
+MINIMAP_VIEW = (255, 255, 255)
+MINIMAP_MARGIN = 10
+
+
+class Minimap:
+    """Low-resolution view of a whole network with smoothed car density."""
+
+    def __init__(self, network, background, size=MINIMAP_SIZE, refresh_interval=MINIMAP_REFRESH):
+        """
+        Initialize the minimap; place it with the rect attribute.
+
+        Args:
+            network: IntersectionNetwork to show
+            background: Colour of empty cells
+            size: Longest side of the minimap in pixels
+            refresh_interval: Frames between density refreshes
+        """
+        self.network = network
+        self.background = background
+        self.refresh_interval = refresh_interval
+        width = network.cols * network.cell_size
+        height = network.rows * network.cell_size
+        self.scale = size / max(width, height)  # minimap pixels per world pixel
+        self.rect = pygame.Rect(0, 0, max(1, round(width * self.scale)), max(1, round(height * self.scale)))
+        self.bins = (max(1, self.rect.height // DENSITY_PIXELS), max(1, self.rect.width // DENSITY_PIXELS))
+        self.density = np.zeros(self.bins, dtype=np.float64)
+        self._base = None       # board image at minimap size
+        self._surface = None    # board plus density, what draw() blits
+        self._frames = 0
+        self._pending = None    # newest car positions, binned at the next refresh
+        self.refresh()
+
+    def refresh(self):
+        """Redraw the board image after intersections were added, moved or removed."""
+        cell_map = build_cell_map(self.network, self.background)
+        if cell_map.get_width() > self.rect.width or cell_map.get_height() > self.rect.height:
+            # Several cells per pixel: average them rather than dropping most.
+            self._base = pygame.transform.smoothscale(cell_map, self.rect.size)
+        else:
+            self._base = pygame.transform.scale(cell_map, self.rect.size)
+        self._surface = self._base.copy()
+        self._frames = 0
+
+    def reset(self):
+        """Forget the accumulated density."""
+        self.density.fill(0.0)
+        self._pending = None
+        self._surface = self._base.copy()
+
+    def world_to_minimap(self, x, y):
+        """Screen position on the minimap of a world point."""
+        network = self.network
+        return (self.rect.x + round((x - network.start_x) * self.scale),
+                self.rect.y + round((y - network.start_y) * self.scale))
+
+    def minimap_to_world(self, sx, sy):
+        """World point under a screen position on the minimap."""
+        network = self.network
+        return (network.start_x + (sx - self.rect.x) / self.scale,
+                network.start_y + (sy - self.rect.y) / self.scale)
+
+    @property
+    def due(self):
+        """Whether the next draw() refreshes the density; update() is only needed then."""
+        return self._frames % self.refresh_interval == 0
+
+    def update(self, xs, ys):
+        """Give the latest car positions (world x and y arrays) to the next refresh."""
+        self._pending = (xs, ys)
+
+    def _fold_density(self, xs, ys):
+        network = self.network
+        rows, cols = self.bins
+        col = ((xs - network.start_x) * (cols / (network.cols * network.cell_size))).astype(np.intp)
+        row = ((ys - network.start_y) * (rows / (network.rows * network.cell_size))).astype(np.intp)
+        inside = (row >= 0) & (row < rows) & (col >= 0) & (col < cols)
+        counts = np.bincount(row[inside] * cols + col[inside], minlength=rows * cols)
+        self.density *= 1.0 - DENSITY_SMOOTHING
+        self.density += DENSITY_SMOOTHING * counts.reshape(rows, cols)
+
+    def _compose(self):
+        top = self.density.max()
+        self._surface.blit(self._base, (0, 0))
+        if top <= 0:
+            return
+        level = np.minimum(1.0, self.density / (top * SATURATION_FRACTION)).T  # surfarray indexes [x, y]
+        rgb = np.zeros(level.shape + (3,), dtype=np.uint8)
+        rgb[..., 0] = (255 * level).astype(np.uint8)
+        rgb[..., 1] = (160 * level).astype(np.uint8)
+        rgb[..., 2] = (40 * level).astype(np.uint8)
+        overlay = pygame.transform.scale(pygame.surfarray.make_surface(rgb), self.rect.size)
+        self._surface.blit(overlay, (0, 0), special_flags=pygame.BLEND_RGB_ADD)
+
+    def draw(self, screen, camera=None):
+        """Blit the minimap at rect, with the camera's view outlined when given."""
+        if self.due and self._pending is not None:
+            self._fold_density(*self._pending)
+            self._pending = None
+            self._compose()
+        self._frames += 1
+        screen.blit(self._surface, self.rect)
+        pygame.draw.rect(screen, MINIMAP_BORDER, self.rect.inflate(2, 2), 1)
+        if camera is not None:
+            x0, y0, x1, y1 = camera.visible_world()
+            left, top = self.world_to_minimap(x0, y0)
+            right, bottom = self.world_to_minimap(x1, y1)
+            view = pygame.Rect(left, top, right - left, bottom - top).clip(self.rect)
+            if view.width and view.height and view != self.rect:
+                pygame.draw.rect(screen, MINIMAP_VIEW, view, 1)
@@ -0,0 +1,95 @@
+"""Fixed-capacity pool of floating hint glyphs ("+1", "?", "U", ...).
+
+Particles live in preallocated NumPy arrays: position, rise speed, alpha
+and a glyph index. update() moves and fades every particle in one
+vectorized step; draw() hands every live particle to a single
+Surface.blits() call. Glyph surfaces are rendered once per (text, colour)
+and per alpha step, so nothing is rendered or allocated per particle per
+frame. When the pool is full a new particle replaces the oldest one.
+"""
+
+import numpy as np
+
+PARTICLE_CAPACITY = 256
+FADE_PER_SECOND = 255.0  # alpha lost per second; particles last one second
+ALPHA_STEPS = 16         # distinct alpha levels cached per glyph
+
+
+class ParticlePool:
+    """Hint particles in NumPy arrays, drawn from cached glyph surfaces."""
+
+    def __init__(self, font, capacity=PARTICLE_CAPACITY):
+        """
+        Initialize the pool.
+
+        Args:
+            font: Font used to render glyphs
+            capacity: Most particles alive at once
+        """
+        self.font = font
+        self.capacity = capacity
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.alpha = np.zeros(capacity, dtype=np.float32)
+        self.glyph = np.zeros(capacity, dtype=np.intp)
+        self._next = 0
+        self._glyph_index = {}
+        self._variants = []  # per glyph: surfaces by alpha step
+        self._offsets = []   # per glyph: (half width, half height)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alpha > 0))
+
+    def _glyph(self, text, color):
+        key = (text, tuple(color))
+        index = self._glyph_index.get(key)
+        if index is None:
+            base = self.font.render(text, True, color)
+            variants = []
+            for step in range(ALPHA_STEPS):
+                surface = base.copy()
+                surface.set_alpha(int(255 * (step + 1) / ALPHA_STEPS))
+                variants.append(surface)
+            index = len(self._variants)
+            self._glyph_index[key] = index
+            self._variants.append(variants)
+            self._offsets.append((base.get_width() // 2, base.get_height() // 2))
+        return index
+
+    def emit(self, text, color, x, y, vy, alpha=255.0):
+        """Start a particle showing text at (x, y), rising at vy pixels per second."""
+        slot = self._next
+        self._next = (slot + 1) % self.capacity
+        self.glyph[slot] = self._glyph(text, color)
+        self.x[slot] = x
+        self.y[slot] = y
+        self.vy[slot] = vy
+        self.alpha[slot] = alpha
+
+    def clear(self):
+        """Remove every particle."""
+        self.alpha.fill(0.0)
+
+    def update(self, dt):
+        """Move and fade every particle by dt seconds."""
+        self.y += self.vy * dt
+        np.maximum(self.alpha - FADE_PER_SECOND * dt, 0.0, out=self.alpha)
+
+    def draw(self, screen):
+        """Blit every live particle, centred on its position, in one call."""
+        live = np.flatnonzero(self.alpha > 0)
+        if not len(live):
+            return
+        steps = np.minimum((self.alpha[live] * ALPHA_STEPS / 256.0).astype(np.intp), ALPHA_STEPS - 1)
+        xs = self.x[live].astype(np.intp).tolist()
+        ys = self.y[live].astype(np.intp).tolist()
+        variants = self._variants
+        offsets = self._offsets
+        screen.blits(
+            [
+                (variants[g][s], (x - offsets[g][0], y - offsets[g][1]))
+                for g, s, x, y in zip(self.glyph[live].tolist(), steps.tolist(), xs, ys)
+            ],
+            doreturn=False,
+        )
@@ -0,0 +1,168 @@
+"""Speculative "what-if" scoring of a placement while it is being dragged.
+
+While the player drags an intersection over a cell, PreviewWorker simulates
+the board with and without that placement in a worker process and reports
+the predicted flow-rate change. Both runs replay the same short window
+(PREVIEW_SECONDS of simulated time from 07:00, the start of the day) with
+the game's seed, so the delta reflects the placement rather than different
+random demand.
+
+The game loop never waits on a worker: request() is called when the
+hovered cell, type or rotation changes, and poll() is checked once per
+frame. Moving to another cell abandons the pending job; results are kept
+per (layout, cell, type, rotation), so hovering back over a cell is
+instant. Browser builds have no worker processes, so the preview is
+disabled there.
+"""
+
+import atexit
+import concurrent.futures
+import multiprocessing
+from collections import OrderedDict
+
+from layout import Layout
+from rng import RandomStreams
+from simulation import SIM_DT, Simulation
+
+PREVIEW_SECONDS = 60.0   # simulated seconds per preview run (~5 game hours)
+CACHE_SIZE = 256         # previews remembered per worker
+BASELINE_CACHE_SIZE = 8  # base layouts remembered per worker process
+
+_executor = None
+_baselines = OrderedDict()  # per worker process: {(layout bytes, city, level, seed, day): flow}
+
+
+def simulate_window(layout, city, level, seed, day_length, seconds=PREVIEW_SECONDS):
+    """Flow rate of a layout over the first `seconds` of a day starting at 07:00."""
+    network, spawn_markers = layout.build()
+    sim = Simulation(network, spawn_markers, city, level, day_length,
+                     start_time=day_length * 7 / 24, streams=RandomStreams(seed))
+    for _ in range(int(round(seconds / SIM_DT))):
+        if sim.finished:
+            break
+        sim.step()
+    return sim.flow_rate()
+
+
+def preview_delta(layout_bytes, row, col, intersection_type, rotation, city, level, seed, day_length):
+    """Predicted flow-rate change from placing one intersection (runs in a worker)."""
+    layout = Layout.from_bytes(layout_bytes)
+    base_key = (layout_bytes, city, level, seed, day_length)
+    baseline = _baselines.get(base_key)
+    if baseline is None:
+        baseline = simulate_window(layout, city, level, seed, day_length)
+        _baselines[base_key] = baseline
+        # Every placement changes the base layout; keep only the recent ones.
+        if len(_baselines) > BASELINE_CACHE_SIZE:
+            _baselines.popitem(last=False)
+    else:
+        _baselines.move_to_end(base_key)
+    candidate = layout.with_cell(row, col, intersection_type, rotation)
+    return simulate_window(candidate, city, level, seed, day_length) - baseline
+
+
+def _shared_executor():
+    global _executor
+    if _executor is None:
+        # spawn rather than fork: a forked child would inherit the parent's
+        # SDL window and audio state.
+        _executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context('spawn'),
+        )
+        atexit.register(shutdown_previews)
+    return _executor
+
+
+def shutdown_previews():
+    """Stop the shared worker process, dropping any queued previews."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+class PreviewWorker:
+    """Background what-if previews for one game."""
+
+    def __init__(self, city, level, seed, day_length, enabled=True, executor=None):
+        """
+        Initialize the worker.
+
+        Args:
+            city, level, seed: The game being previewed
+            day_length: Simulated seconds in one day (GAME_DAY_LENGTH)
+            enabled: False disables previews entirely (browser builds)
+            executor: concurrent.futures executor to run previews on
+                (default: a shared single-process pool started on first use)
+        """
+        self.city = city
+        self.level = level
+        self.seed = seed
+        self.day_length = day_length
+        self.enabled = enabled
+        self._executor = executor
+        self._cache = OrderedDict()  # {(layout bytes, cell, type, rotation): delta}
+        self._key = None
+        self._future = None
+
+    def request(self, layout, cell, intersection_type, rotation):
+        """
+        Ask for the preview of placing intersection_type at cell on layout.
+
+        Passing cell=None (pointer off the grid) clears the request. Any
+        pending job for a different key is cancelled.
+        """
+        if not self.enabled:
+            return
+        key = None if cell is None else (layout.to_bytes(), cell, intersection_type, rotation % 4)
+        if key == self._key:
+            return
+        self._cancel()
+        self._key = key
+        if key is None or key in self._cache:
+            return
+        executor = self._executor or _shared_executor()
+        self._future = executor.submit(
+            preview_delta, key[0], cell[0], cell[1], intersection_type, rotation,
+            self.city, self.level, self.seed, self.day_length,
+        )
+
+    def poll(self):
+        """
+        Return the state of the current request without blocking.
+
+        Returns (status, delta) with status None (nothing requested),
+        'pending' or 'ready'.
+        """
+        key = self._key
+        if key is None:
+            return None, None
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return 'ready', self._cache[key]
+        future = self._future
+        if future is None or not future.done():
+            return 'pending', None
+        self._future = None
+        try:
+            delta = future.result()
+        except Exception:
+            # A preview is only a hint; never let it take the game down.
+            self._key = None
+            return None, None
+        self._cache[key] = delta
+        if len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return 'ready', delta
+
+    def _cancel(self):
+        # A job that is already running cannot be interrupted, but its
+        # result is never read once the key has moved on.
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+
+    def clear(self):
+        """Forget the current request."""
+        self._cancel()
+        self._key = None
@@ -0,0 +1,134 @@
+"""Adaptive render quality: shed drawing effects when frames run long.
+
+QualityGovernor keeps a rolling window of frame times and compares the
+mean against a frame budget. Past DEGRADE_RATIO x budget it steps one
+quality level down; it steps back up only after RECOVER_WINDOWS windows
+in a row under RECOVER_RATIO x budget. After every change it waits a full
+window before deciding again, and if restoring a level pushes frames
+straight back over budget, the wait before the next attempt doubles, so a
+device sitting on the edge of a level does not flap between the two.
+
+Levels are cumulative; each drops one more effect:
+    0  full quality
+    1  no hint particles
+    2  cars drawn as plain rectangles instead of rotated sprites
+    3  spawn-marker labels vanish instead of fading out
+    4  overlays (heatmap) refresh four times less often
+"""
+
+from collections import deque
+
+from heatmap import REFRESH_INTERVAL
+
+QUALITY_NAMES = ('full', 'no particles', 'plain cars', 'no label fade', 'slow overlays')
+MAX_QUALITY_LEVEL = len(QUALITY_NAMES) - 1
+
+FRAME_BUDGET_MS = 1000.0 / 60.0
+WINDOW_FRAMES = 30      # frames averaged per decision
+DEGRADE_RATIO = 1.25    # step down when the mean frame is this much over budget
+RECOVER_RATIO = 1.05    # step back up only once it is this close to budget
+RECOVER_WINDOWS = 4     # consecutive good windows needed to step back up
+MAX_RECOVER_WINDOWS = 64
+SLOW_OVERLAY_FACTOR = 4
+
+
+class QualityGovernor:
+    """Chooses a quality level from rolling frame times, with hysteresis."""
+
+    def __init__(self, budget_ms=FRAME_BUDGET_MS, window=WINDOW_FRAMES,
+                 degrade_ratio=DEGRADE_RATIO, recover_ratio=RECOVER_RATIO, enabled=True):
+        """
+        Initialize the governor.
+
+        Args:
+            budget_ms: Target frame time in milliseconds
+            window: Frames averaged before each decision
+            degrade_ratio: Mean/budget ratio above which quality drops
+            recover_ratio: Mean/budget ratio below which quality comes back
+            enabled: When False the level stays at 0 (full quality)
+        """
+        self.budget_ms = budget_ms
+        self.window = window
+        self.degrade_ms = budget_ms * degrade_ratio
+        self.recover_ms = budget_ms * recover_ratio
+        self.enabled = enabled
+        self.level = 0
+        self.changes = 0  # level changes so far, for debugging
+        self._frames = deque(maxlen=window)
+        self._total = 0.0
+        self._good_windows = 0
+        self._recover_windows = RECOVER_WINDOWS
+        self._just_recovered = False
+
+    @property
+    def name(self):
+        """Human-readable name of the current level."""
+        return QUALITY_NAMES[self.level]
+
+    @property
+    def mean_ms(self):
+        """Mean frame time over the current window (0 before any frames)."""
+        return self._total / len(self._frames) if self._frames else 0.0
+
+    def observe(self, frame_ms):
+        """Record one frame's duration; returns the (possibly new) level."""
+        if not self.enabled:
+            return self.level
+        if len(self._frames) == self.window:
+            self._total -= self._frames[0]
+        self._frames.append(frame_ms)
+        self._total += frame_ms
+        if len(self._frames) < self.window:
+            return self.level
+
+        mean = self._total / self.window
+        if mean > self.degrade_ms:
+            self._good_windows = 0
+            if self.level < MAX_QUALITY_LEVEL:
+                if self._just_recovered:
+                    self._recover_windows = min(self._recover_windows * 2, MAX_RECOVER_WINDOWS)
+                self._change(self.level + 1)
+            self._just_recovered = False
+        elif mean < self.recover_ms and self.level > 0:
+            self._good_windows += 1
+            self._just_recovered = False
+            if self._good_windows >= self._recover_windows:
+                self._change(self.level - 1)
+                self._just_recovered = True
+            else:
+                self._reset_window()
+        else:
+            self._good_windows = 0
+            self._just_recovered = False
+        return self.level
+
+    def _change(self, level):
+        self.level = level
+        self.changes += 1
+        self._good_windows = 0
+        # Judge the new level on its own frames only.
+        self._reset_window()
+
+    def _reset_window(self):
+        self._frames.clear()
+        self._total = 0.0
+
+    @property
+    def hint_particles(self):
+        """Whether floating hint particles are drawn."""
+        return self.level < 1
+
+    @property
+    def plain_cars(self):
+        """Whether cars are drawn as plain rectangles."""
+        return self.level >= 2
+
+    @property
+    def label_fade(self):
+        """Whether spawn-marker labels fade out gradually."""
+        return self.level < 3
+
+    @property
+    def overlay_refresh(self):
+        """Frames between overlay surface rebuilds."""
+        return REFRESH_INTERVAL * SLOW_OVERLAY_FACTOR if self.level >= 4 else REFRESH_INTERVAL
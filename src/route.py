@@ -0,0 +1,146 @@
+"""Shared, immutable routes for cars.
+
+Most cars on a board repeat one of a handful of paths, so the geometry of a
+path — its waypoints, cumulative arc lengths and total length — is computed
+once and shared. A car only keeps a reference to its Route plus how far
+along it has travelled; its position and heading are looked up from that
+distance, so motion stays exact however large a single step is.
+"""
+
+import math
+import weakref
+from bisect import bisect_right
+
+import numpy as np
+
+# Live routes keyed by (waypoints, stops). Entries disappear once no car
+# (or other owner) references the route any more.
+_interned = weakref.WeakValueDictionary()
+
+
+class Route:
+    """Waypoints of one path plus the arc-length tables derived from them."""
+
+    __slots__ = ('points', 'cumulative', 'headings', 'length', 'stops', '_arrays', '__weakref__')
+
+    def __init__(self, points, stops=None):
+        """
+        Build a route.
+
+        Args:
+            points: Sequence of (x, y) waypoints; at least one is required
+            stops: Distances at which a car must wait for each gate it
+                passes (default: one stop at every waypoint)
+        """
+        self.points = tuple((float(x), float(y)) for x, y in points)
+
+        # cumulative[i] is the distance from the first waypoint to waypoint i;
+        # headings[i] is the angle in degrees of the segment leaving waypoint i.
+        cumulative = [0.0]
+        headings = []
+        for (ax, ay), (bx, by) in zip(self.points, self.points[1:]):
+            cumulative.append(cumulative[-1] + math.hypot(bx - ax, by - ay))
+            headings.append(math.degrees(math.atan2(by - ay, bx - ax)) if (bx, by) != (ax, ay) else None)
+        self.cumulative = tuple(cumulative)
+        self.headings = tuple(headings)
+        self.length = cumulative[-1]
+        self.stops = self.cumulative if stops is None else tuple(min(stop, self.length) for stop in stops)
+        self._arrays = None
+
+    def segment_at(self, distance, hint=0):
+        """
+        Index of the segment containing a distance along the route.
+
+        Args:
+            distance: Pixels from the first waypoint (clamped to the route)
+            hint: Segment returned by the previous lookup; a car moving
+                forward usually stays in or just past it, which makes the
+                lookup O(1) instead of a binary search
+
+        Returns -1 for a route with a single waypoint.
+        """
+        cumulative = self.cumulative
+        last = len(cumulative) - 2
+        if last < 0:
+            return -1
+        if 0 <= hint <= last and cumulative[hint] <= distance:
+            # Walk forward past segments already completed.
+            while hint < last and cumulative[hint + 1] <= distance:
+                hint += 1
+            return hint
+        return min(max(bisect_right(cumulative, distance) - 1, 0), last)
+
+    def locate(self, distance, hint=0):
+        """
+        Position at a distance along the route.
+
+        Returns (x, y, heading, segment). heading is None on a zero-length
+        segment; segment can be passed back as the next hint.
+        """
+        segment = self.segment_at(distance, hint)
+        if segment < 0:
+            x, y = self.points[0]
+            return x, y, None, 0
+        start = self.cumulative[segment]
+        span = self.cumulative[segment + 1] - start
+        ax, ay = self.points[segment]
+        bx, by = self.points[segment + 1]
+        t = (distance - start) / span if span > 0 else 1.0
+        t = min(max(t, 0.0), 1.0)
+        return ax + (bx - ax) * t, ay + (by - ay) * t, self.headings[segment], segment
+
+    def locate_many(self, distances):
+        """
+        Vectorized locate for every car sharing this route.
+
+        Args:
+            distances: Array-like of distances along the route
+
+        Returns (xs, ys, headings) NumPy arrays; headings are NaN on
+        zero-length segments.
+        """
+        if self._arrays is None:
+            points = np.array(self.points, dtype=np.float64)
+            headings = np.array([np.nan if h is None else h for h in self.headings], dtype=np.float64)
+            self._arrays = (np.array(self.cumulative), points, headings)
+        cumulative, points, headings = self._arrays
+
+        distances = np.clip(np.asarray(distances, dtype=np.float64), 0.0, self.length)
+        if len(points) < 2:
+            n = len(distances)
+            return np.full(n, points[0, 0]), np.full(n, points[0, 1]), np.full(n, np.nan)
+        segment = np.clip(np.searchsorted(cumulative, distances, side='right') - 1, 0, len(points) - 2)
+        start = cumulative[segment]
+        span = cumulative[segment + 1] - start
+        t = np.divide(distances - start, span, out=np.ones_like(distances), where=span > 0)
+        a = points[segment]
+        b = points[segment + 1]
+        xy = a + (b - a) * t[:, None]
+        return xy[:, 0], xy[:, 1], headings[segment]
+
+    def __len__(self):
+        return len(self.points)
+
+    def __repr__(self):
+        return f"Route({len(self.points)} points, {self.length:.1f}px)"
+
+
+def intern_route(points, stops=None):
+    """Return the shared Route for a waypoint sequence and its stops, building it on first use.
+
+    The same waypoints with different stops are different routes: a car
+    waits at its route's stops, so sharing one between them would line a
+    car's gates up with the wrong stops.
+    """
+    points = tuple(points)
+    key = (points, None if stops is None else tuple(stops))
+    route = _interned.get(key)
+    if route is None:
+        route = Route(points, stops)
+        _interned[key] = route
+    return route
+
+
+def interned_count():
+    """Number of distinct routes currently alive."""
+    return len(_interned)
@@ -0,0 +1,49 @@
+"""Flow-rate scoring shared by the game and the headless engines."""
+
+from car import CAR_SPEED
+
+
+def calculate_flow_rate(completed_stats, spawn_attempts=0, spawn_successes=0):
+    """Compute flow rate using the equation from the README:
+
+    Flow Rate = (V_Avg / V_limit) x (T_Ideal / T_Actual) x (1 - T_Idle / T_Actual)
+
+    completed_stats is a list of (path_length, travel_time, idle_time) tuples
+    for every car that has reached its destination.
+
+    spawn_attempts / spawn_successes are used to penalise incomplete networks:
+    cars that cannot be routed drag the score down proportionally.
+    """
+    if not completed_stats:
+        return 0.0
+
+    total_dist   = sum(pl for pl, _, _  in completed_stats)
+    total_actual = sum(tt for _,  tt, _ in completed_stats)
+    total_idle   = sum(it for _,  _,  it in completed_stats)
+
+    if total_actual == 0:
+        return 0.0
+
+    v_avg    = total_dist / total_actual          # average speed (px/s)
+    v_ratio  = min(v_avg / CAR_SPEED, 1.0)        # V_Avg / V_limit
+    t_ideal  = total_dist / CAR_SPEED             # ideal travel time at speed limit
+    t_ratio  = min(t_ideal / total_actual, 1.0)   # T_Ideal / T_Actual
+    idle_ratio = 1.0 - (total_idle / total_actual) # 1 - T_Idle / T_Actual
+
+    base_rate = v_ratio * t_ratio * idle_ratio
+
+    # Penalise missed routings — an incomplete network lowers the score
+    if spawn_attempts > 0:
+        routing_ratio = spawn_successes / spawn_attempts
+        return base_rate * routing_ratio
+
+    return base_rate
+
+
+def get_grade(flow_rate):
+    """Convert a 0–1 flow rate to a letter grade."""
+    if flow_rate >= 0.80: return 'A'
+    if flow_rate >= 0.65: return 'B'
+    if flow_rate >= 0.45: return 'C'
+    if flow_rate >= 0.25: return 'D'
+    return 'F'
@@ -0,0 +1,110 @@
+"""Run a Simulation in its own asyncio task and publish immutable snapshots.
+
+The game loop feeds real frame time in with feed(); the task owns the
+accumulator and works off the whole SIM_DT steps that are due, yielding to
+the event loop every SLICE_STEPS steps so input and drawing (and, in the
+browser, the page itself) keep running while a heavy backlog is worked
+off. After every slice it publishes a SimSnapshot, which is all the
+render/input coroutine reads: car drawing states, clock and score.
+
+Everything runs on one event loop, so the input coroutine may still edit
+the network or the simulation directly: the task only ever pauses between
+steps. Step counts per slice are fixed, which keeps the interleaving of
+steps and input, and therefore replays, deterministic.
+"""
+
+import asyncio
+from collections import namedtuple
+
+from simulation import SIM_DT
+
+SLICE_STEPS = 30  # steps between yields to the event loop
+
+SimSnapshot = namedtuple('SimSnapshot', (
+    'steps',            # simulation steps taken so far
+    'game_timer',       # simulated clock
+    'finished',         # True once the day is over
+    'alpha',            # interpolation factor between each car's two states
+    'cars',             # tuple of Car.state() tuples
+    'delivered',        # completed trips
+    'spawn_attempts',
+    'spawn_successes',
+    'flow_rate',
+))
+
+
+class SimulationTask:
+    """Steps one Simulation from an asyncio task fed with frame time."""
+
+    def __init__(self, sim, slice_steps=SLICE_STEPS):
+        """
+        Initialize the task.
+
+        Args:
+            sim: Simulation to advance
+            slice_steps: Steps to run before yielding to the event loop
+        """
+        self.sim = sim
+        self.slice_steps = slice_steps
+        self.accumulator = 0.0
+        self._task = None
+        self._events = []
+        self._flow_inputs = None
+        self._flow_rate = 0.0
+        self.snapshot = None
+        self._publish()
+
+    def feed(self, dt):
+        """Add dt real seconds to the clock and make sure the task is working them off."""
+        self.accumulator += dt
+        if self.accumulator >= SIM_DT and (self._task is None or self._task.done()):
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    @property
+    def busy(self):
+        """True while steps are still being worked off."""
+        return self._task is not None and not self._task.done()
+
+    async def wait_idle(self):
+        """Wait until every due step has run."""
+        while self.busy:
+            await self._task
+
+    def drain_events(self):
+        """Return and clear the simulation events published since the last call."""
+        events = self._events
+        self._events = []
+        return events
+
+    async def _run(self):
+        sim = self.sim
+        taken = 0
+        while self.accumulator >= SIM_DT and not sim.finished:
+            sim.step(SIM_DT)
+            self.accumulator -= SIM_DT
+            taken += 1
+            if taken % self.slice_steps == 0:
+                self._publish()
+                await asyncio.sleep(0)
+        if sim.finished:
+            self.accumulator = min(self.accumulator, SIM_DT)
+        self._publish()
+
+    def _publish(self):
+        sim = self.sim
+        self._events.extend(sim.drain_events())
+        flow_inputs = (len(sim.completed_stats), sim.spawn_attempts)
+        if flow_inputs != self._flow_inputs:
+            self._flow_inputs = flow_inputs
+            self._flow_rate = sim.flow_rate()
+        self.snapshot = SimSnapshot(
+            steps=sim.steps,
+            game_timer=sim.game_timer,
+            finished=sim.finished,
+            alpha=min(self.accumulator / SIM_DT, 1.0),
+            cars=tuple(car.state() for car in sim.cars),
+            delivered=len(sim.completed_stats),
+            spawn_attempts=sim.spawn_attempts,
+            spawn_successes=sim.spawn_successes,
+            flow_rate=self._flow_rate,
+        )
@@ -0,0 +1,160 @@
+"""Fixed-timestep traffic simulation for one level.
+
+Everything that affects the score — spawning, intersection service, car
+motion and the completed-trip stats — lives here and only ever advances in
+steps of exactly SIM_DT. The game loop feeds real frame time into an
+accumulator and runs as many whole steps as fit, so a throttled browser
+tab and a fast desktop produce the same results for the same inputs.
+"""
+
+from car import CAR_COLORS, Car
+from rng import RandomStreams
+from scoring import calculate_flow_rate
+from telemetry import STATUS_DELIVERED, STATUS_UNROUTABLE, TYPE_COLUMNS, route_signature
+from throughput import ThroughputModel
+from traffic_data import get_spawn_interval
+from turn_geometry import build_route
+
+SIM_DT = 1.0 / 60.0       # seconds of simulated time per step
+MAX_FRAME_TIME = 0.25     # real seconds fed to the accumulator per frame at most
+
+# Bump whenever a change alters simulated results (spawning, routing, car
+# motion, intersection service or scoring) so cached scores are not reused.
+ENGINE_VERSION = 1
+
+
+def find_nearest_intersection(network, x, y):
+    """Find the nearest intersection to pixel coordinates (x, y)."""
+    nearest = None
+    min_dist = float('inf')
+
+    for intersection in network.get_all_intersections():
+        dist = ((intersection.x - x) ** 2 + (intersection.y - y) ** 2) ** 0.5
+        if dist < min_dist:
+            min_dist = dist
+            nearest = intersection
+
+    return nearest
+
+
+class Simulation:
+    """Spawns cars from start markers and moves them through a network."""
+
+    def __init__(self, network, spawn_markers, city, level, day_length, start_time=0.0, streams=None,
+                 telemetry=None, demand=None):
+        """
+        Initialize the simulation.
+
+        Args:
+            network: IntersectionNetwork cars are routed over (edited live by the player)
+            spawn_markers: Marker dicts from generate_spawn_points
+            city: TRAFFIC_DATA key driving the spawn rate
+            level: Level number (scales the spawn rate)
+            day_length: Simulated seconds in one 24-hour day
+            start_time: Clock value the day starts at
+            streams: RandomStreams for destinations and car colours
+                (default: freshly seeded)
+            telemetry: TelemetryWriter that receives a row per trip (optional)
+            demand: 24 hourly volumes used instead of the city's profile,
+                e.g. from level_generator.generate_demand (optional)
+        """
+        self.network = network
+        self.starts = [m for m in spawn_markers if m['type'] == 'start']
+        self.ends = [m for m in spawn_markers if m['type'] == 'end']
+        self.city = city
+        self.level = level
+        self.day_length = day_length
+        self.streams = streams if streams is not None else RandomStreams()
+        self.telemetry = telemetry
+        self.demand = demand
+
+        self.cars = []
+        self.throughput = ThroughputModel(network)
+        self.game_timer = start_time
+        self.spawn_timer = 0.0
+        self.steps = 0
+
+        # Flow-rate inputs
+        self.completed_stats = []
+        self.spawn_attempts = 0
+        self.spawn_successes = 0
+
+        # ('delivered' | 'unroutable', x, y) since the last drain_events()
+        self._events = []
+
+    @property
+    def finished(self):
+        """True once the simulated day is over."""
+        return self.game_timer >= self.day_length
+
+    def step(self, dt=SIM_DT):
+        """Advance the simulation by one fixed step."""
+        self.steps += 1
+        self.game_timer += dt
+
+        interval = get_spawn_interval(self.city, self.game_timer, self.day_length, self.level, self.demand)
+        self.spawn_timer += dt
+        if self.spawn_timer >= interval and self.ends:
+            self.spawn_timer = 0.0
+            self._spawn()
+
+        self.throughput.step(dt)
+        for car in self.cars:
+            car.update(dt)
+
+        if any(car.done for car in self.cars):
+            for car in self.cars:
+                if car.done:
+                    self.completed_stats.append((car.path_length, car.travel_time, car.idle_time))
+                    self._events.append(('delivered', car.x, car.y))
+                    if car.trip is not None:
+                        self._record_trip(STATUS_DELIVERED, car.trip, car.path_length,
+                                          car.travel_time, car.idle_time)
+            self.cars = [car for car in self.cars if not car.done]
+
+    def _spawn(self):
+        network = self.network
+        if not network.get_all_intersections():
+            return
+        for start_index, start_m in enumerate(self.starts):
+            end_m = self.streams.destinations.choice(self.ends)
+            self.spawn_attempts += 1
+            start_int = find_nearest_intersection(network, start_m['x'], start_m['y'])
+            end_int = find_nearest_intersection(network, end_m['x'], end_m['y'])
+            intersection_path = network.find_path(start_int, end_int) if start_int and end_int else []
+            if not intersection_path:
+                self._events.append(('unroutable', float(start_m['x']), float(start_m['y'])))
+                if self.telemetry is not None:
+                    trip = self._trip(start_index, end_m, (0, 0, (0,) * len(TYPE_COLUMNS)))
+                    self._record_trip(STATUS_UNROUTABLE, trip, 0.0, 0.0, 0.0)
+                continue
+            pixel_path = network.intersections_to_pixels(intersection_path)
+            gates = self.throughput.gates_for(intersection_path, pixel_path)
+            color = self.streams.cosmetics.choice(CAR_COLORS)
+            car = Car(build_route(intersection_path), gates=gates, color=color)
+            if self.telemetry is not None:
+                car.trip = self._trip(start_index, end_m, route_signature(intersection_path))
+            self.cars.append(car)
+            self.spawn_successes += 1
+
+    def _trip(self, start_index, end_m, signature):
+        hour = int((self.game_timer % self.day_length) / self.day_length * 24) % 24
+        return (self.game_timer, hour, start_index, end_m.get('number', 0)) + signature
+
+    def _record_trip(self, status, trip, path_length, travel_time, idle_time):
+        spawn_time, hour, start, end, route, hops, counts = trip
+        finish_time = spawn_time + travel_time
+        self.telemetry.record(
+            status, self.city, self.level, self.streams.seed, hour, spawn_time, finish_time,
+            start, end, route, hops, path_length, travel_time, idle_time, counts,
+        )
+
+    def drain_events(self):
+        """Return and clear the delivery/unroutable events raised since the last call."""
+        events = self._events
+        self._events = []
+        return events
+
+    def flow_rate(self):
+        """Current flow rate over every delivered car."""
+        return calculate_flow_rate(self.completed_stats, self.spawn_attempts, self.spawn_successes)
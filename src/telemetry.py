@@ -0,0 +1,230 @@
+"""Per-trip telemetry in an append-only columnar file.
+
+Attach a TelemetryWriter to a Simulation and every trip — delivered or
+unroutable — becomes one row: when and where it started, where it was
+going, how long it took, how much of that was spent waiting and which
+intersection types it passed. Rows are written into a preallocated NumPy
+chunk; a full chunk is handed to a background thread that appends it to
+the file, so recording a trip never waits on the disk.
+
+File layout (little-endian):
+    header  b'CLTR', u32 JSON length, JSON {"version", "columns": [[name, dtype], ...]}
+            space-padded to a multiple of 8 bytes
+    chunk   b'CHNK', u32 row count, then each column's rows back to back,
+            every column padded to a multiple of 8 bytes
+
+Each chunk stores its columns contiguously, so read_chunks() can memory-map
+the file and hand out zero-copy column views one chunk at a time.
+"""
+
+import json
+import queue
+import struct
+import threading
+import zlib
+
+import numpy as np
+
+from intersection import IntersectionType
+from traffic_data import TRAFFIC_DATA
+
+MAGIC = b'CLTR'
+CHUNK_MAGIC = b'CHNK'
+VERSION = 2  # 2: start, end and type counts widened to u16
+CHUNK_ROWS = 4096
+
+STATUS_DELIVERED = 0
+STATUS_UNROUTABLE = 1
+
+CITIES = tuple(sorted(TRAFFIC_DATA))  # city column codes
+TYPE_COLUMNS = tuple(f"n_{itype.name.lower()}" for itype in IntersectionType)
+
+COLUMNS = (
+    ('status', 'u1'),        # STATUS_DELIVERED / STATUS_UNROUTABLE
+    ('city', 'u1'),          # index into CITIES
+    ('level', 'u1'),
+    ('seed', '<u4'),
+    ('hour', 'u1'),          # city hour (0-23) at spawn
+    ('spawn_time', '<f4'),   # simulated seconds at spawn
+    ('finish_time', '<f4'),  # simulated seconds at delivery (spawn_time if unroutable)
+    ('start', '<u2'),        # index of the start marker
+    ('end', '<u2'),          # number of the end marker
+    ('route', '<u4'),        # CRC-32 of the route's cells
+    ('hops', '<u2'),         # intersections on the route
+    ('path_length', '<f4'),  # pixels
+    ('travel_time', '<f4'),  # seconds
+    ('idle_time', '<f4'),    # seconds
+) + tuple((name, '<u2') for name in TYPE_COLUMNS)  # intersections of each type passed
+
+_DTYPE = np.dtype([(name, dtype) for name, dtype in COLUMNS])
+_CHUNK_HEADER = struct.Struct('<4sI')
+_LENGTH = struct.Struct('<I')
+
+_TYPE_INDEX = {itype: index for index, itype in enumerate(IntersectionType)}
+
+
+def _padded(nbytes):
+    return (nbytes + 7) & ~7
+
+
+def route_signature(intersection_path):
+    """(route id, hops, per-type counts) describing an intersection path."""
+    cells = b''.join(struct.pack('<HH', i.row, i.col) for i in intersection_path)
+    counts = [0] * len(TYPE_COLUMNS)
+    for intersection in intersection_path:
+        counts[_TYPE_INDEX[intersection.intersection_type]] += 1
+    return zlib.crc32(cells), len(intersection_path), tuple(counts)
+
+
+def _header_bytes():
+    header = json.dumps({'version': VERSION, 'columns': [list(c) for c in COLUMNS]}).encode('utf-8')
+    # Pad with spaces so every chunk, and so every column, starts 8-byte aligned.
+    header += b' ' * (_padded(8 + len(header)) - 8 - len(header))
+    return MAGIC + _LENGTH.pack(len(header)) + header
+
+
+def _read_header(data):
+    if bytes(data[:4]) != MAGIC:
+        raise ValueError("not a trip telemetry file")
+    (length,) = _LENGTH.unpack_from(data, 4)
+    header = json.loads(bytes(data[8:8 + length]).decode('utf-8'))
+    if header['version'] != VERSION:
+        raise ValueError(f"unsupported trip telemetry version {header['version']}")
+    return header, 8 + length
+
+
+class TelemetryWriter:
+    """Buffers trip rows in NumPy chunks and appends full chunks to a file."""
+
+    def __init__(self, path, chunk_rows=CHUNK_ROWS, background=True):
+        """
+        Open (or create) a telemetry file for appending.
+
+        Args:
+            path: Telemetry file; new chunks are appended to an existing one,
+                after dropping any chunk a crash left incomplete
+            chunk_rows: Rows buffered before a chunk is written
+            background: Write chunks from a background thread. Pass False
+                where threads are unavailable (browser builds); full chunks
+                are then written inline.
+        """
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self._file = open(path, 'a+b')
+        self._file.seek(0, 2)
+        if self._file.tell() == 0:
+            self._file.write(_header_bytes())
+        else:
+            size = self._file.tell()
+            self._file.seek(0)
+            header, offset = _read_header(self._file.read(64 * 1024))
+            if [tuple(c) for c in header['columns']] != list(COLUMNS):
+                raise ValueError(f"{path} was written with different columns")
+            # Drop a chunk cut short by a crash, or new chunks would follow
+            # its partial bytes and the file could no longer be read.
+            end = self._complete_length(offset, size)
+            if end < size:
+                self._file.truncate(end)
+            self._file.seek(0, 2)
+
+        self.rows_written = 0
+        self._chunk = np.zeros(chunk_rows, dtype=_DTYPE)
+        self._count = 0
+        self._queue = None
+        self._thread = None
+        if background:
+            self._queue = queue.SimpleQueue()
+            self._thread = threading.Thread(target=self._drain, name='trip-telemetry', daemon=True)
+            self._thread.start()
+
+    def _complete_length(self, offset, size):
+        """Byte length of the file up to the end of its last complete chunk."""
+        chunk_bytes = [np.dtype(dtype).itemsize for _, dtype in COLUMNS]
+        while offset + _CHUNK_HEADER.size <= size:
+            self._file.seek(offset)
+            magic, rows = _CHUNK_HEADER.unpack(self._file.read(_CHUNK_HEADER.size))
+            if magic != CHUNK_MAGIC:
+                raise ValueError(f"corrupt trip telemetry at byte {offset}")
+            end = offset + _CHUNK_HEADER.size + sum(_padded(rows * itemsize) for itemsize in chunk_bytes)
+            if end > size:
+                break
+            offset = end
+        return offset
+
+    def record(self, status, city, level, seed, hour, spawn_time, finish_time, start, end,
+               route, hops, path_length, travel_time, idle_time, type_counts):
+        """Append one trip row. Never touches the disk unless background=False."""
+        self._chunk[self._count] = (
+            status, CITIES.index(city) if city in CITIES else 255, level, seed, hour,
+            spawn_time, finish_time, start, end, route, hops, path_length, travel_time, idle_time,
+        ) + tuple(type_counts)
+        self._count += 1
+        if self._count == self.chunk_rows:
+            self._hand_off()
+
+    def _hand_off(self):
+        chunk = self._chunk[:self._count]
+        self._chunk = np.zeros(self.chunk_rows, dtype=_DTYPE)
+        self._count = 0
+        if self._queue is not None:
+            self._queue.put(chunk)
+        else:
+            self._write(chunk)
+
+    def _drain(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+            self._write(chunk)
+
+    def _write(self, chunk):
+        parts = [_CHUNK_HEADER.pack(CHUNK_MAGIC, len(chunk))]
+        for name, _ in COLUMNS:
+            column = np.ascontiguousarray(chunk[name]).tobytes()
+            parts.append(column + b'\0' * (_padded(len(column)) - len(column)))
+        self._file.write(b''.join(parts))
+        self.rows_written += len(chunk)
+
+    def close(self):
+        """Write any buffered rows, wait for the writer thread and close the file."""
+        if self._file.closed:
+            return
+        if self._count:
+            self._hand_off()
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+        self._file.close()
+
+
+def read_chunks(path):
+    """
+    Memory-map a telemetry file and yield one {column: array} dict per chunk.
+
+    The arrays are read-only views into the mapping, so only the pages a
+    reduction touches are ever loaded. A chunk cut short by a crash is
+    ignored.
+    """
+    try:
+        data = np.memmap(path, dtype=np.uint8, mode='r')
+    except ValueError:  # empty file
+        return
+    _, offset = _read_header(data[:64 * 1024])
+    dtypes = [(name, np.dtype(dtype)) for name, dtype in COLUMNS]
+    size = len(data)
+    while offset + _CHUNK_HEADER.size <= size:
+        magic, rows = _CHUNK_HEADER.unpack_from(data, offset)
+        if magic != CHUNK_MAGIC:
+            raise ValueError(f"corrupt trip telemetry at byte {offset}")
+        position = offset + _CHUNK_HEADER.size
+        end = position + sum(_padded(rows * dtype.itemsize) for _, dtype in dtypes)
+        if end > size:
+            return
+        columns = {}
+        for name, dtype in dtypes:
+            nbytes = rows * dtype.itemsize
+            columns[name] = data[position:position + nbytes].view(dtype)
+            position += _padded(nbytes)
+        yield columns
+        offset = end
@@ -0,0 +1,231 @@
+"""Capacity-limited service model for placed intersections.
+
+Every placed intersection acts as a small server: cars queue on arrival and
+are admitted when a service slot is free (and, for signals, when their
+approach has green). The work done per tick is proportional to the number
+of cars admitted, so a whole network stays O(cars) per tick.
+"""
+
+from intersection import IntersectionType
+
+CONTROL_SIGNAL = "signal"
+CONTROL_YIELD = "yield"
+CONTROL_FREE_FLOW = "free_flow"
+
+AXIS_NS = 0
+AXIS_EW = 1
+
+# Per-type service behaviour:
+#   control      — how conflicting approaches share the intersection
+#   capacity     — cars that can be inside the intersection at once
+#   service_time — seconds each admitted car occupies a slot
+#   green        — seconds of green per signal phase (signals only)
+#   queue        — ring-buffer length per approach queue
+SERVICE_PROFILES = {
+    IntersectionType.FOUR_WAY: {
+        'control': CONTROL_SIGNAL, 'capacity': 2, 'service_time': 0.5, 'green': 1.0, 'queue': 16,
+    },
+    IntersectionType.T_INTERSECTION: {
+        'control': CONTROL_SIGNAL, 'capacity': 2, 'service_time': 0.5, 'green': 1.0, 'queue': 16,
+    },
+    IntersectionType.Y_INTERSECTION: {
+        'control': CONTROL_YIELD, 'capacity': 1, 'service_time': 0.5, 'green': 0.0, 'queue': 16,
+    },
+    IntersectionType.ROUNDABOUT: {
+        'control': CONTROL_YIELD, 'capacity': 2, 'service_time': 0.6, 'green': 0.0, 'queue': 24,
+    },
+    IntersectionType.TRUMPET: {
+        'control': CONTROL_FREE_FLOW, 'capacity': 2, 'service_time': 0.25, 'green': 0.0, 'queue': 24,
+    },
+    IntersectionType.PARTIAL_CLOVERLEAF: {
+        'control': CONTROL_FREE_FLOW, 'capacity': 3, 'service_time': 0.25, 'green': 0.0, 'queue': 24,
+    },
+    IntersectionType.DIAMOND: {
+        'control': CONTROL_FREE_FLOW, 'capacity': 3, 'service_time': 0.25, 'green': 0.0, 'queue': 24,
+    },
+    IntersectionType.CLOVERLEAF: {
+        'control': CONTROL_FREE_FLOW, 'capacity': 4, 'service_time': 0.2, 'green': 0.0, 'queue': 32,
+    },
+}
+
+
+class RingQueue:
+    """Fixed-capacity FIFO backed by a preallocated list."""
+
+    __slots__ = ('_items', '_head', '_size')
+
+    def __init__(self, capacity):
+        self._items = [None] * capacity
+        self._head = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def capacity(self):
+        return len(self._items)
+
+    def push(self, item):
+        """Append item. Returns False (and drops nothing) when the queue is full."""
+        if self._size == len(self._items):
+            return False
+        self._items[(self._head + self._size) % len(self._items)] = item
+        self._size += 1
+        return True
+
+    def pop(self):
+        """Remove and return the oldest item."""
+        if self._size == 0:
+            raise IndexError("pop from empty RingQueue")
+        item = self._items[self._head]
+        self._items[self._head] = None
+        self._head = (self._head + 1) % len(self._items)
+        self._size -= 1
+        return item
+
+
+class IntersectionServer:
+    """Queues and admits cars for one placed intersection."""
+
+    def __init__(self, intersection, profile=None):
+        """
+        Initialize the server.
+
+        Args:
+            intersection: Intersection this server controls
+            profile: Service profile dict (default: SERVICE_PROFILES for its type)
+        """
+        if profile is None:
+            profile = SERVICE_PROFILES[intersection.intersection_type]
+        self.intersection = intersection
+        self.control = profile['control']
+        self.capacity = profile['capacity']
+        self.service_time = profile['service_time']
+        self.green = profile['green']
+
+        # Signals keep one queue per axis so a red approach never blocks a green one.
+        queue_count = 2 if self.control == CONTROL_SIGNAL else 1
+        self.queues = [RingQueue(profile['queue']) for _ in range(queue_count)]
+        self._slot_release = [0.0] * self.capacity
+        self._clock = 0.0
+        self.pending = 0  # gates handed out by ThroughputModel and not yet admitted
+
+        # Offset neighbouring signals by half a cycle so they do not switch in lockstep.
+        self.position = (intersection.row, intersection.col)
+        row = intersection.row or 0
+        col = intersection.col or 0
+        self._phase_offset = self.green if (row + col) % 2 else 0.0
+
+    def green_axis(self):
+        """Axis currently allowed to enter, or None when every approach may enter."""
+        if self.control != CONTROL_SIGNAL:
+            return None
+        cycle_pos = (self._clock + self._phase_offset) % (2 * self.green)
+        return AXIS_NS if cycle_pos < self.green else AXIS_EW
+
+    def queued(self):
+        """Number of cars waiting at this intersection."""
+        return sum(len(queue) for queue in self.queues)
+
+    def arrive(self, car, axis):
+        """Queue a car on the given approach axis. Returns False when that queue is full."""
+        queue = self.queues[axis if self.control == CONTROL_SIGNAL else 0]
+        return queue.push(car)
+
+    def step(self, dt):
+        """Advance the server clock and admit as many queued cars as slots allow."""
+        self._clock += dt
+        green = self.green_axis()
+        queue = self.queues[green] if green is not None else self.queues[0]
+        if not len(queue):
+            return
+
+        now = self._clock
+        releases = self._slot_release
+        for slot, free_at in enumerate(releases):
+            if free_at > now:
+                continue
+            if not len(queue):
+                break
+            releases[slot] = now + self.service_time
+            if self.pending:
+                self.pending -= 1
+            queue.pop().admit()
+
+
+class ThroughputModel:
+    """Owns one IntersectionServer per intersection that cars are routed through."""
+
+    def __init__(self, network=None):
+        """
+        Initialize the model.
+
+        Args:
+            network: IntersectionNetwork the intersections are placed in; when
+                given, servers of intersections no longer placed there are
+                dropped once no car is routed through them (optional)
+        """
+        self.network = network
+        self.servers = {}  # {Intersection: IntersectionServer}
+        self._retired = []  # replaced servers that cars are still routed through
+
+    def _is_current(self, server):
+        """True while the server's intersection is still placed where it was built."""
+        intersection = server.intersection
+        position = (intersection.row, intersection.col)
+        if position != server.position:
+            return False
+        return self.network is None or self.network.placed_intersections.get(position) is intersection
+
+    def server_for(self, intersection):
+        """Return the server for an intersection, building a new one on first use or after a move."""
+        server = self.servers.get(intersection)
+        if server is not None and not self._is_current(server):
+            # Re-placed: the old server's signal phase belongs to its old cell.
+            if server.pending:
+                self._retired.append(server)
+            server = None
+        if server is None:
+            server = IntersectionServer(intersection)
+            self.servers[intersection] = server
+        return server
+
+    def gates_for(self, intersection_path, pixel_path):
+        """Build the per-waypoint (server, axis) gates for a car following a path."""
+        gates = []
+        for index, intersection in enumerate(intersection_path):
+            if index > 0:
+                ax, ay = pixel_path[index - 1]
+                bx, by = pixel_path[index]
+            elif len(pixel_path) > 1:
+                ax, ay = pixel_path[0]
+                bx, by = pixel_path[1]
+            else:
+                ax = ay = bx = by = 0
+            axis = AXIS_EW if abs(bx - ax) >= abs(by - ay) else AXIS_NS
+            server = self.server_for(intersection)
+            server.pending += 1
+            gates.append((server, axis))
+        return gates
+
+    def step(self, dt):
+        """Advance every server.
+
+        Servers of removed or moved intersections keep running until every
+        car routed through them has been admitted, then they are dropped.
+        """
+        stale = None
+        for intersection, server in self.servers.items():
+            server.step(dt)
+            if not server.pending and not self._is_current(server):
+                if stale is None:
+                    stale = []
+                stale.append(intersection)
+        if stale is not None:
+            for intersection in stale:
+                del self.servers[intersection]
+        if self._retired:
+            for server in self._retired:
+                server.step(dt)
+            self._retired = [server for server in self._retired if server.pending]
@@ -88,6 +88,23 @@ TRAFFIC_DATA = {
     ],
 }
 
+# Weekend volume as a share of the weekday volume for the same hour (0–23).
+# TRAFFIC_DATA is a weekday profile; weekends lose the commuter peaks, keep
+# a broad midday/afternoon hump and are busier late at night. Approximate
+# shape of day-of-week factors from urban arterial count programs.
+WEEKEND_HOURLY_FACTORS = [
+    1.45, 1.60, 1.70, 1.50, 0.90, 0.55,   # 00:00–05:00 - late nights out
+    0.45, 0.35, 0.45, 0.65, 0.85, 0.95,   # 06:00–11:00 - no morning rush
+    1.00, 1.00, 0.97, 0.85, 0.75, 0.68,   # 12:00–17:00 - midday shopping/leisure
+    0.72, 0.82, 0.92, 1.00, 1.10, 1.20,   # 18:00–23:00
+]
+
+# Volume in each month (January first) relative to the annual average:
+# lighter in winter, heaviest late spring through early autumn.
+MONTHLY_FACTORS = [0.90, 0.93, 0.99, 1.01, 1.04, 1.05, 1.03, 1.03, 1.03, 1.03, 0.99, 0.94]
+
+WEEKEND_DAYS = (5, 6)  # Saturday, Sunday (date.weekday() numbering, Monday = 0)
+
 # Global max volume across all cities — used for consistent scaling
 GLOBAL_MAX_VOLUME = max(v for city in TRAFFIC_DATA.values() for v in city)  # 3456
 
@@ -112,12 +129,13 @@ CITY_DIFFICULTY = {
 }
 
 
-def get_spawn_interval(city, game_timer, game_day_length, level=2):
+def get_spawn_interval(city, game_timer, game_day_length, level=2, volumes=None):
     """Return spawn interval (seconds) based on real traffic volume at the current game hour.
 
     More traffic → shorter interval (more cars). Scaled so the game stays playable.
     Difficulty varies by level (spawn rate range) and city (multiplier).
     Traffic volume is linearly interpolated between hours for smooth transitions.
+    volumes, if given, replaces the city's TRAFFIC_DATA profile (24 hourly values).
     """
     if game_day_length <= 0:
         return LEVEL_INTERVALS.get(level, (2.0, 10.0))[1]
@@ -128,7 +146,7 @@ def get_spawn_interval(city, game_timer, game_day_length, level=2):
     next_hour = (hour + 1) % 24
     frac = time_frac - int(time_frac)  # 0.0–1.0 within the current hour
 
-    city_data = TRAFFIC_DATA.get(city, TRAFFIC_DATA["New York City"])
+    city_data = volumes if volumes is not None else TRAFFIC_DATA.get(city, TRAFFIC_DATA["New York City"])
     volume = city_data[hour] * (1.0 - frac) + city_data[next_hour] * frac
 
     min_interval, max_interval = LEVEL_INTERVALS.get(level, (2.0, 10.0))
@@ -152,3 +170,23 @@ def get_current_volume(city, game_timer, game_day_length):
     frac = time_frac - int(time_frac)
     city_data = TRAFFIC_DATA.get(city, TRAFFIC_DATA["New York City"])
     return int(city_data[hour] * (1.0 - frac) + city_data[next_hour] * frac)
+
+
+def day_type(weekday):
+    """'weekend' for Saturday/Sunday (weekday 5/6, Monday = 0), else 'weekday'."""
+    return 'weekend' if weekday in WEEKEND_DAYS else 'weekday'
+
+
+def daily_profile(city, weekday=0, month=1, profile=None):
+    """Return the 24 hourly volumes for one day of the week and month of the year.
+
+    weekday follows date.weekday() (Monday = 0) and month runs 1–12. The
+    city's TRAFFIC_DATA weekday profile (or the given 24-value profile) is
+    reshaped by WEEKEND_HOURLY_FACTORS on weekends and scaled by
+    MONTHLY_FACTORS. Volumes stay floats so short-term totals are exact.
+    """
+    base = profile if profile is not None else TRAFFIC_DATA.get(city, TRAFFIC_DATA["New York City"])
+    season = MONTHLY_FACTORS[month - 1]
+    if day_type(weekday) == 'weekend':
+        return [v * f * season for v, f in zip(base, WEEKEND_HOURLY_FACTORS)]
+    return [v * season for v in base]
@@ -0,0 +1,213 @@
+"""Curved paths through intersections, precomputed per movement.
+
+A movement is how a car crosses one intersection: the arm it enters by,
+the arm it leaves by, and the shape drawn for that intersection type in
+between — an arc around a roundabout, a loop ramp on a cloverleaf, a ramp
+along a diamond's edge or a smooth curve through a plain junction. Every
+(type, rotation, entry arm, exit arm) movement is sampled once at import
+into a polyline in intersection-local coordinates along with its arc
+length, so building a car's route is a matter of translating and joining
+table entries.
+"""
+
+import math
+
+from intersection import Intersection, IntersectionType
+from route import intern_route
+
+# Unit vector pointing out of the intersection along each arm (screen axes).
+ARM_VECTORS = {
+    'N': (0, -1),
+    'S': (0, 1),
+    'E': (1, 0),
+    'W': (-1, 0),
+}
+
+# Grid direction from one intersection to the next → arm used to leave it.
+_DIRECTION_ARMS = {'up': 'N', 'down': 'S', 'left': 'W', 'right': 'E'}
+_OPPOSITE = {'N': 'S', 'S': 'N', 'E': 'W', 'W': 'E'}
+
+STOP_LINE = 15       # pixels from the centre where every movement starts and ends
+CURVE_SAMPLES = 8    # segments per curve
+ARC_STEP = math.radians(15)
+
+# Shapes matching Intersection.draw
+ROUNDABOUT_RADIUS = 10
+LOOP_OFFSET = 14     # cloverleaf loop centre offset along each axis
+LOOP_RADIUS = 7
+TRUMPET_OFFSET = 16
+TRUMPET_RADIUS = 8
+DIAMOND_RADIUS = 11
+
+_PARTIAL_LOOPS = {(-LOOP_OFFSET, -LOOP_OFFSET), (LOOP_OFFSET, LOOP_OFFSET)}
+
+
+def _arm_point(arm, radius=STOP_LINE):
+    vx, vy = ARM_VECTORS[arm]
+    return (vx * radius, vy * radius)
+
+
+def _turn(entry, exit):
+    """+1 for a right turn, -1 for a left turn, 0 for straight on."""
+    ix, iy = ARM_VECTORS[entry]
+    ox, oy = ARM_VECTORS[exit]
+    # Travel direction on entry points into the intersection, against the arm.
+    cross = (-ix) * oy - (-iy) * ox
+    return (cross > 0) - (cross < 0)
+
+
+def _bezier(a, control, b):
+    points = []
+    for i in range(CURVE_SAMPLES + 1):
+        t = i / CURVE_SAMPLES
+        u = 1 - t
+        points.append((
+            u * u * a[0] + 2 * u * t * control[0] + t * t * b[0],
+            u * u * a[1] + 2 * u * t * control[1] + t * t * b[1],
+        ))
+    return points
+
+
+def _arc(center, radius, start, sweep):
+    """Points on a circle from angle start through sweep radians (screen angles)."""
+    steps = max(1, int(math.ceil(abs(sweep) / ARC_STEP)))
+    return [
+        (center[0] + radius * math.cos(start + sweep * i / steps),
+         center[1] + radius * math.sin(start + sweep * i / steps))
+        for i in range(steps + 1)
+    ]
+
+
+def _loop(entry, exit, center, radius):
+    """Enter, drive once round a loop ramp turning right, then leave."""
+    cx, cy = center
+    start = math.atan2(-cy, -cx)  # point of the loop nearest the centre
+    return [_arm_point(entry)] + _arc(center, radius, start, 2 * math.pi) + [_arm_point(exit)]
+
+
+def _roundabout(entry, exit):
+    # Right-hand traffic circulates counter-clockwise as seen on screen,
+    # which is decreasing angle with y pointing down.
+    a = math.atan2(ARM_VECTORS[entry][1], ARM_VECTORS[entry][0])
+    b = math.atan2(ARM_VECTORS[exit][1], ARM_VECTORS[exit][0])
+    sweep = -((a - b) % (2 * math.pi))
+    return [_arm_point(entry)] + _arc((0, 0), ROUNDABOUT_RADIUS, a, sweep) + [_arm_point(exit)]
+
+
+def _movement_points(itype, missing, entry, exit):
+    """Local polyline for one movement. entry/exit of None mean the trip starts/ends here."""
+    if entry is None and exit is None:
+        return [(0.0, 0.0)]
+    if entry is None:
+        return [(0.0, 0.0), _arm_point(exit)]
+    if exit is None:
+        return [_arm_point(entry), (0.0, 0.0)]
+
+    if itype == IntersectionType.ROUNDABOUT:
+        return _roundabout(entry, exit)
+
+    turn = _turn(entry, exit)
+    a, b = _arm_point(entry), _arm_point(exit)
+    if turn == 0:
+        return [a, (0.0, 0.0), b]
+
+    if itype == IntersectionType.DIAMOND:
+        return [a, _arm_point(entry, DIAMOND_RADIUS), _arm_point(exit, DIAMOND_RADIUS), b]
+
+    if turn < 0:
+        # Left turns on grade-separated types use a loop ramp where one is drawn.
+        ix, iy = ARM_VECTORS[entry]
+        ox, oy = ARM_VECTORS[exit]
+        quadrant = (LOOP_OFFSET * (-ix - ox), LOOP_OFFSET * (-iy - oy))
+        if itype == IntersectionType.CLOVERLEAF:
+            return _loop(entry, exit, quadrant, LOOP_RADIUS)
+        if itype == IntersectionType.PARTIAL_CLOVERLEAF and quadrant in _PARTIAL_LOOPS:
+            return _loop(entry, exit, quadrant, LOOP_RADIUS)
+        if itype == IntersectionType.TRUMPET and missing is not None:
+            return _loop(entry, exit, _arm_point(missing, TRUMPET_OFFSET), TRUMPET_RADIUS)
+
+    return _bezier(a, (0.0, 0.0), b)
+
+
+def _length(points):
+    return sum(math.hypot(bx - ax, by - ay) for (ax, ay), (bx, by) in zip(points, points[1:]))
+
+
+def _build_tables():
+    tables = {}
+    for itype in IntersectionType:
+        probe = Intersection(None, None, 0, 0, intersection_type=itype)
+        rotations = set()
+        for rotation in range(4):
+            probe.rotation = rotation
+            arms = probe.get_arms()
+            if frozenset(arms) in rotations:
+                continue
+            rotations.add(frozenset(arms))
+            missing = next(iter(set(ARM_VECTORS) - arms), None)
+            ends = sorted(arms) + [None]
+            for entry in ends:
+                for exit in ends:
+                    if entry == exit and entry is not None:
+                        continue  # no U-turns
+                    points = tuple(_movement_points(itype, missing, entry, exit))
+                    tables[(itype, rotation, entry, exit)] = (points, _length(points))
+    return tables
+
+
+# {(type, rotation, entry arm, exit arm): (local points, arc length)}
+MOVEMENTS = _build_tables()
+
+
+def movement(intersection, entry, exit):
+    """Return (local points, arc length) for crossing an intersection."""
+    rotation = intersection.rotation % 4
+    key = (intersection.intersection_type, rotation, entry, exit)
+    found = MOVEMENTS.get(key)
+    if found is None:
+        # Four-arm types only build rotation 0; U-turns fall back to straight lines.
+        found = MOVEMENTS.get((intersection.intersection_type, 0, entry, exit))
+    if found is None:
+        points = tuple(_movement_points(None, None, entry, exit))
+        found = (points, _length(points))
+    return found
+
+
+def _arm_toward(a, b):
+    for direction, arm in _DIRECTION_ARMS.items():
+        if a.get_neighbor(direction) is b:
+            return arm
+    # Not linked (e.g. a stale path): pick the arm facing b.
+    dx, dy = b.x - a.x, b.y - a.y
+    if abs(dx) >= abs(dy):
+        return 'E' if dx >= 0 else 'W'
+    return 'S' if dy >= 0 else 'N'
+
+
+def build_route(intersection_path):
+    """
+    Build the shared Route a car follows along an intersection path.
+
+    The route's stops mark the stop line where the car waits before each
+    intersection (the centre for the one it starts at).
+    """
+    points = []
+    stops = []
+    distance = 0.0
+    for index, intersection in enumerate(intersection_path):
+        entry = exit = None
+        if index > 0:
+            entry = _OPPOSITE[_arm_toward(intersection_path[index - 1], intersection)]
+        if index + 1 < len(intersection_path):
+            exit = _arm_toward(intersection, intersection_path[index + 1])
+        local, length = movement(intersection, entry, exit)
+        cx, cy = intersection.x, intersection.y
+        first = (cx + local[0][0], cy + local[0][1])
+        if points:
+            px, py = points[-1]
+            distance += math.hypot(first[0] - px, first[1] - py)
+        stops.append(distance)
+        points.append(first)
+        points.extend((cx + x, cy + y) for x, y in local[1:])
+        distance += length
+    return intern_route(points, stops)
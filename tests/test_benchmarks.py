@@ -0,0 +1,52 @@
+import os, sys
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import pygame
+pygame.init()
+
+from tools.benchmarks import build_fleet, cases, compare, measure, run_suite
+
+
+def _doc(**seconds):
+    return {'meta': {}, 'results': {name: {'seconds': s, 'number': 1, 'repeats': 1} for name, s in seconds.items()}}
+
+
+def test_compare_flags_only_slowdowns_past_threshold():
+    baseline = _doc(a=1.0, b=1.0, c=1.0)
+    current = _doc(a=1.2, b=1.3, c=0.5, d=9.0)
+    rows = {row['name']: row for row in compare(current, baseline, threshold=0.25)}
+    assert set(rows) == {'a', 'b', 'c'}  # d has no baseline
+    assert not rows['a']['regressed']
+    assert rows['b']['regressed']
+    assert not rows['c']['regressed']
+    assert abs(rows['b']['ratio'] - 1.3) < 1e-9
+
+
+def test_measure_reports_seconds_per_call():
+    calls = []
+    result = measure(lambda: calls.append(1), repeats=3, min_seconds=0.001)
+    assert result['repeats'] == 3
+    assert result['number'] >= 1
+    assert result['seconds'] > 0
+    assert len(calls) >= 3 * result['number']
+
+
+def test_fleet_cars_stay_on_the_road_while_timed():
+    cars = build_fleet(20)
+    for _ in range(600):
+        for car in cars:
+            car.update(1.0 / 60.0)
+    assert not any(car.done for car in cars)
+
+
+def test_quick_suite_covers_every_case_family():
+    names = cases(quick=True)
+    for family in ('car_update', 'car_draw', 'find_path', 'reconnect_around', 'edit_intersection',
+                   'calculate_flow_rate', 'cell_automaton_step', 'get_spawn_interval', 'run_game_frame'):
+        assert any(name.startswith(family) for name in names)
+    document = run_suite(quick=True, name_filter='calculate_flow_rate[10]', log=lambda *_: None)
+    assert list(document['results']) == ['calculate_flow_rate[10]']
+    assert document['results']['calculate_flow_rate[10]']['seconds'] > 0
+    assert 'python' in document['meta']
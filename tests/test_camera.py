@@ -0,0 +1,96 @@
+import os, sys
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import pygame
+pygame.init()
+
+from camera import (BoardRenderer, Camera, CAR_DOT_COLOR, SpatialIndex, SpriteMips,
+                    ZOOM_LEVELS, build_car_sprite)
+from grid_network import IntersectionNetwork
+from layout import Layout
+from intersection import IntersectionType
+
+STYLE = {
+    'cell': (60, 60, 60), 'grid': (100, 100, 100), 'start': (0, 200, 0), 'end': (200, 0, 0),
+    'marker_radius': 14, 'marker_offset': 30,
+}
+
+
+def _board(rows, cols):
+    cells = [(row, col, IntersectionType.FOUR_WAY, 0) for row in range(rows) for col in range(cols)]
+    network, _ = Layout(rows, cols, 150, [], cells).build()
+    return network
+
+
+def test_screen_world_round_trip_and_zoom_keeps_anchor():
+    camera = Camera((0, 0, 800, 600), (0, 0, 30000, 30000))
+    for index in range(len(ZOOM_LEVELS)):
+        camera.zoom_index = index
+        camera.center_on(12000, 9000)
+        sx, sy = camera.world_to_screen(12000, 9000)
+        wx, wy = camera.screen_to_world(sx, sy)
+        assert abs(wx - 12000) <= 1 / camera.zoom and abs(wy - 9000) <= 1 / camera.zoom
+
+    anchor = (200, 150)
+    before = camera.screen_to_world(*anchor)
+    camera.zoom_by(-3, anchor)
+    after = camera.screen_to_world(*anchor)
+    assert abs(before[0] - after[0]) <= 1 / camera.zoom
+    assert abs(before[1] - after[1]) <= 1 / camera.zoom
+
+
+def test_clamp_and_fit_keep_the_world_on_screen():
+    camera = Camera((0, 0, 800, 600), (0, 0, 3000, 3000))
+    camera.pan(100000, 100000)
+    assert (camera.x, camera.y) == (0, 0)
+    camera.fit()
+    assert 3000 * camera.zoom <= 600
+    assert camera.zoom_index + 1 == len(ZOOM_LEVELS) or 3000 * ZOOM_LEVELS[camera.zoom_index + 1] > 600
+    # Smaller than the viewport: the world is centred.
+    left, top = camera.world_to_screen(0, 0)
+    right, _ = camera.world_to_screen(3000, 3000)
+    assert abs(left - (800 - right)) <= 1
+
+
+def test_spatial_index_query_returns_nearby_buckets_only():
+    index = SpatialIndex(100)
+    index.insert('a', 10, 10)
+    index.insert('b', 550, 50)
+    index.insert('c', 950, 950)
+    assert set(index.query(0, 0, 120, 120)) == {'a'}
+    assert set(index.query(0, 0, 600, 100)) == {'a', 'b'}
+    index.remove('b', 550, 50)
+    assert set(index.query(0, 0, 1000, 1000)) == {'a', 'c'}
+    assert len(index) == 2
+
+
+def test_sprite_mips_build_once_and_scale_per_level():
+    built = []
+
+    def build(key):
+        built.append(key)
+        return build_car_sprite(key)
+
+    mips = SpriteMips(build)
+    full = mips.get(((255, 0, 0), 0), ZOOM_LEVELS.index(1.0))
+    half = mips.get(((255, 0, 0), 0), ZOOM_LEVELS.index(0.5))
+    assert mips.get(((255, 0, 0), 0), ZOOM_LEVELS.index(0.5)) is half
+    assert built == [((255, 0, 0), 0)]
+    assert half.get_width() == round(full.get_width() * 0.5)
+
+
+def test_renderer_culls_to_the_viewport_and_draws_dots_far_out():
+    network = _board(40, 40)
+    camera = Camera((0, 0, 800, 600), (0, 0, 6000, 6000))
+    renderer = BoardRenderer(network, [], camera, STYLE)
+    screen = pygame.Surface((800, 600))
+
+    renderer.draw(screen)
+    assert 0 < renderer.drawn <= 4 * 64  # a 1:1 view touches a few 8x8 buckets of 1600 cells
+
+    camera.fit()
+    car = (3000.0, 3000.0, 0.0, 3000.0, 3000.0, 0.0, (255, 0, 0))
+    renderer.draw(screen, (car,))
+    assert renderer.drawn == 0  # cell map and car dots, no sprites
+    assert screen.get_at(camera.world_to_screen(3000, 3000))[:3] == CAR_DOT_COLOR
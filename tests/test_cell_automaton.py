@@ -0,0 +1,93 @@
+import os, sys
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import pygame
+pygame.init()
+
+import numpy as np
+from intersection import Intersection
+from grid_network import IntersectionNetwork
+from cell_automaton import CellAutomaton, CellTrafficTask
+
+
+def _grid(rows, cols, cell_size=150):
+    net = IntersectionNetwork(rows, cols, 0, 0, cell_size)
+    for row in range(rows):
+        for col in range(cols):
+            i = Intersection(row, col, col * cell_size + cell_size // 2, row * cell_size + cell_size // 2)
+            i.snapped = True
+            net.add_intersection(i)
+    return net
+
+
+def test_free_road_vehicle_reports_flow_inputs():
+    net = _grid(1, 3)
+    ca = CellAutomaton(net, p_slow=0.0, seed=0)
+    path = net.find_path(net.get_intersection(0, 0), net.get_intersection(0, 2))
+    assert ca.spawn(path)
+
+    for _ in range(100):
+        ca.step()
+    assert ca.count == 0
+    assert len(ca.completed_stats) == 1
+    path_length, travel_time, idle_time = ca.completed_stats[0]
+    assert path_length == 2 * ca.seg_len[0] * ca.cell_length
+    assert travel_time >= path_length / (ca.v_max * ca.cell_length / ca.step_seconds)
+    assert 0.0 <= idle_time < travel_time
+
+
+def test_vehicles_never_share_a_cell():
+    net = _grid(3, 3)
+    ca = CellAutomaton(net, seed=4)
+    corners = [net.get_intersection(0, 0), net.get_intersection(2, 2),
+               net.get_intersection(0, 2), net.get_intersection(2, 0)]
+    paths = [net.find_path(a, b) for a in corners for b in corners if a is not b]
+    for step in range(300):
+        for path in paths:
+            ca.spawn(path)
+        ca.step()
+        gpos = ca.seg_offset[ca.seg[:ca.count]] + ca.pos[:ca.count]
+        assert len(np.unique(gpos)) == ca.count
+    # Demand far above capacity: the entry backlog spills back.
+    assert ca.pending() > 0
+
+
+def test_every_spawned_vehicle_is_eventually_reported():
+    net = _grid(2, 2)
+    ca = CellAutomaton(net, seed=1)
+    a, b = net.get_intersection(0, 0), net.get_intersection(1, 1)
+    for _ in range(25):
+        ca.spawn(net.find_path(a, b))
+    ca.spawn([a])
+    ca.advance(400 * ca.step_seconds)
+    assert ca.count == 0 and ca.pending() == 0
+    assert len(ca.completed_stats) == 26
+
+
+def test_unroutable_path_is_rejected():
+    net = _grid(1, 3)
+    ca = CellAutomaton(net)
+    a, c = net.get_intersection(0, 0), net.get_intersection(0, 2)
+    assert ca.spawn([a, c]) is False
+    assert ca.spawn([]) is False
+
+
+def test_traffic_task_spawns_trips_and_publishes_snapshots():
+    net = _grid(3, 3)
+    markers = [
+        {'type': 'start', 'side': 'left', 'index': 1, 'x': 0, 'y': 225},
+        {'type': 'end', 'side': 'right', 'index': 1, 'x': 450, 'y': 225, 'number': 1},
+    ]
+    task = CellTrafficTask(net, markers, "Chicago", 3, 300.0, start_time=100.0)
+    assert task.snapshot.cars == ()
+    for _ in range(60 * 30):
+        task.feed(1 / 60)
+    snapshot = task.snapshot
+    assert snapshot.steps == 60 * 30
+    assert abs(snapshot.game_timer - 130.0) < 1e-6
+    assert snapshot.spawn_attempts == snapshot.spawn_successes > 0
+    assert snapshot.delivered > 0 and 0.0 < snapshot.flow_rate <= 1.0
+    for prev_x, prev_y, _, x, y, angle, _ in snapshot.cars:
+        assert 0 <= x <= 450 and abs(y - 225) < 1e-6 and angle == 0.0
+        assert prev_x <= x
@@ -0,0 +1,56 @@
+import os, sys
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import pygame
+pygame.init()
+
+from estimator import DEFAULT_PARAMS, FlowEstimator, calibrate, error_report
+from intersection import IntersectionType
+from layout import Layout, simulate_layout
+
+CITY = "New York City"
+MARKERS = [('start', 0, 0, 75), ('end', 1, 450, 75)]
+
+
+def _row(*types):
+    return Layout(1, 3, 150, MARKERS, [(0, col, itype, 0) for col, itype in enumerate(types) if itype])
+
+
+def test_free_flow_road_scores_near_one():
+    estimate = FlowEstimator().estimate_layout(_row(*[IntersectionType.CLOVERLEAF] * 3), CITY, 1)
+    assert 0.9 < estimate <= 1.0
+
+
+def test_broken_road_scores_zero():
+    assert FlowEstimator().estimate_layout(_row(IntersectionType.FOUR_WAY, None, IntersectionType.FOUR_WAY),
+                                           CITY, 1) == 0.0
+
+
+def test_signals_and_heavier_demand_lower_the_estimate():
+    estimator = FlowEstimator()
+    signals = _row(*[IntersectionType.FOUR_WAY] * 3)
+    free = _row(*[IntersectionType.CLOVERLEAF] * 3)
+    assert estimator.estimate_layout(signals, CITY, 1) < estimator.estimate_layout(free, CITY, 1)
+    assert estimator.estimate_layout(signals, "Los Angeles", 3) < estimator.estimate_layout(signals, "Chicago", 1)
+
+
+def test_estimate_tracks_simulation():
+    layouts = [
+        _row(*[IntersectionType.FOUR_WAY] * 3),
+        _row(IntersectionType.ROUNDABOUT, IntersectionType.FOUR_WAY, IntersectionType.Y_INTERSECTION),
+        _row(*[IntersectionType.CLOVERLEAF] * 3),
+    ]
+    samples = [(layout, CITY, 1, simulate_layout(layout, CITY, 1, 5)['flow_rate']) for layout in layouts]
+    report = error_report(FlowEstimator(), samples)
+    assert report['count'] == 3
+    assert report['max_abs_error'] < 0.15
+
+
+def test_calibration_does_not_increase_error():
+    layout = _row(*[IntersectionType.FOUR_WAY] * 3)
+    samples = [(layout, CITY, 1, 0.5)]  # pretend the simulation was much slower
+    before = error_report(FlowEstimator(), samples)['rmse']
+    fitted = calibrate(samples, rounds=3)
+    assert set(fitted.params) == set(DEFAULT_PARAMS)
+    assert error_report(fitted, samples)['rmse'] < before
@@ -0,0 +1,68 @@
+import os, sys
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import pygame
+pygame.init()
+
+import time
+
+import pytest
+from heatmap import CongestionHeatmap
+
+
+def _state(x, y, moving=True):
+    prev_x = x - 1.0 if moving else x
+    return (prev_x, y, 0.0, x, y, 0.0, (200, 50, 50))
+
+
+def test_cars_land_in_their_patch():
+    heatmap = CongestionHeatmap(2, 3, 100, 50, 150, subdivisions=4)
+    # Patch size 37.5px: (100 + 160, 50 + 80) is patch row 2, col 4.
+    heatmap.accumulate((_state(260.0, 130.0), _state(261.0, 131.0)), 0.5)
+    occupancy = heatmap.occupancy
+    assert occupancy.shape == (8, 12)
+    assert occupancy[2, 4] == pytest.approx(1.0)
+    assert occupancy.sum() == pytest.approx(1.0)
+    assert heatmap.idle.sum() == 0.0
+
+
+def test_cars_off_the_board_are_ignored():
+    heatmap = CongestionHeatmap(2, 2, 0, 0, 150)
+    heatmap.accumulate((_state(-5.0, 10.0), _state(10.0, 400.0)), 1.0)
+    assert heatmap.occupancy.sum() == 0.0
+
+
+def test_stationary_cars_count_as_idle_and_weigh_more():
+    moving = CongestionHeatmap(1, 1, 0, 0, 150)
+    waiting = CongestionHeatmap(1, 1, 0, 0, 150)
+    moving.accumulate((_state(10.0, 10.0),), 0.5)
+    waiting.accumulate((_state(10.0, 10.0, moving=False),), 0.5)
+    assert waiting.idle[0, 0] == pytest.approx(0.5)
+    assert waiting.heat()[0, 0] > moving.heat()[0, 0] > 0.0
+
+
+def test_traffic_decays_with_half_life():
+    heatmap = CongestionHeatmap(1, 1, 0, 0, 150, half_life=2.0)
+    heatmap.accumulate((_state(10.0, 10.0),), 1.0)
+    for _ in range(200):
+        heatmap.accumulate((), 0.01)
+    assert heatmap.occupancy[0, 0] == pytest.approx(0.5)
+    heatmap.reset()
+    assert heatmap.occupancy.sum() == 0.0
+
+
+def test_large_board_draws_in_one_blit_quickly():
+    screen = pygame.Surface((1280, 800))
+    heatmap = CongestionHeatmap(100, 100, 240, 60, 150)
+    cars = tuple(_state(240.0 + 11 * i, 60.0 + 7 * i, moving=i % 3 != 0) for i in range(1000))
+    heatmap.accumulate(cars, 1.0)
+    heatmap.draw(screen)
+    assert screen.get_at((240 + 11 * 30, 60 + 7 * 30))[:3] != (0, 0, 0)
+    assert screen.get_at((1200, 100))[:3] == (0, 0, 0)
+
+    start = time.perf_counter()
+    for _ in range(30):
+        heatmap.accumulate(cars, 1 / 60)
+        heatmap.draw(screen)
+    assert (time.perf_counter() - start) / 30 < 0.01
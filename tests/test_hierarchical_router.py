@@ -0,0 +1,96 @@
+import os, sys
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import random
+import pygame
+pygame.init()
+
+from intersection import Intersection, IntersectionType
+from grid_network import IntersectionNetwork, HIERARCHICAL_MIN_CELLS
+from hierarchical_router import HierarchicalRouter
+
+
+def _place(network, row, col, itype=IntersectionType.FOUR_WAY, rotation=0):
+    cell_size = network.cell_size
+    x = network.start_x + col * cell_size + cell_size // 2
+    y = network.start_y + row * cell_size + cell_size // 2
+    i = Intersection(row, col, x, y, intersection_type=itype)
+    i.rotation = rotation
+    i.snapped = True
+    network.add_intersection(i)
+    return i
+
+
+def _random_network(rows, cols, seed, hole_rate=0.2):
+    rng = random.Random(seed)
+    net = IntersectionNetwork(rows, cols, 0, 0, 20)
+    for row in range(rows):
+        for col in range(cols):
+            if rng.random() < hole_rate:
+                continue
+            itype = rng.choice([IntersectionType.FOUR_WAY, IntersectionType.T_INTERSECTION])
+            _place(net, row, col, itype, rotation=rng.randrange(4))
+    return net
+
+
+def _bfs_path(net, a, b):
+    router, net.router = net.router, None
+    try:
+        return net.find_path(a, b)
+    finally:
+        net.router = router
+
+
+def _assert_connected(path):
+    for a, b in zip(path, path[1:]):
+        assert b in a.neighbors.values()
+
+
+def test_router_matches_bfs_reachability():
+    net = _random_network(24, 24, seed=3)
+    net.router = HierarchicalRouter(net, cluster_size=5)
+    rng = random.Random(7)
+    placed = net.get_all_intersections()
+    for _ in range(150):
+        a, b = rng.choice(placed), rng.choice(placed)
+        path = net.find_path(a, b)
+        expected = _bfs_path(net, a, b)
+        assert bool(path) == bool(expected)
+        if path:
+            assert path[0] is a and path[-1] is b
+            _assert_connected(path)
+            assert len(path) <= 1.5 * len(expected)
+
+
+def test_router_refreshes_after_edit():
+    net = IntersectionNetwork(1, 12, 0, 0, 20)
+    net.router = HierarchicalRouter(net, cluster_size=4)
+    row = [_place(net, 0, col) for col in range(12)]
+    assert len(net.find_path(row[0], row[-1])) == 12
+
+    net.remove_intersection(row[6])
+    assert net.find_path(row[0], row[-1]) == []
+
+    _place(net, 0, 6)
+    assert len(net.find_path(row[0], row[-1])) == 12
+
+
+def test_large_grid_uses_router_small_grid_does_not():
+    assert IntersectionNetwork(3, 3, 0, 0, 150).router is None
+    side = int(HIERARCHICAL_MIN_CELLS ** 0.5)
+    assert IntersectionNetwork(side, side, 0, 0, 10).router is not None
+
+
+def test_clear_cache_forces_a_fresh_search():
+    net = IntersectionNetwork(1, 12, 0, 0, 20)
+    net.router = HierarchicalRouter(net, cluster_size=4)
+    row = [_place(net, 0, col) for col in range(12)]
+    searches = []
+    find_cells = net.router._find_cells
+    net.router._find_cells = lambda start, end: searches.append(start) or find_cells(start, end)
+
+    first = net.find_path(row[0], row[-1])
+    assert net.find_path(row[0], row[-1]) == first and len(searches) == 1
+    net.router.clear_cache()
+    assert net.find_path(row[0], row[-1]) == first and len(searches) == 2
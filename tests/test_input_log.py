@@ -0,0 +1,131 @@
+import os, sys
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import pygame
+pygame.init()
+
+import main
+from input_log import InputRecorder, LiveInput, ReplayInput, read_log
+from tools.replay_session import frame_time_stats, replay
+
+
+def _click(pos):
+    return [
+        {'kind': 'down', 'pos': pos, 'button': 1, 'pointer': 'mouse'},
+        {'kind': 'up', 'pos': pos, 'button': 1, 'pointer': 'mouse'},
+    ]
+
+
+def _write_level_one_session(path, seed=11, play_frames=900):
+    """Pick NYC level 1, build a straight road of three intersections and let traffic run.
+
+    Dismissing the level 1 intro card starts the traffic.
+    """
+    surface = pygame.Surface((main.WINDOW_WIDTH, main.WINDOW_HEIGHT))
+    font, title_font = pygame.font.Font(None, 36), pygame.font.Font(None, 72)
+    city_buttons, _ = main.draw_menu(surface, font, title_font)
+    level_buttons, _ = main.draw_level_menu(surface, font, title_font, "New York City")
+    got_it = main.draw_intro_overlay(surface, font, pygame.font.Font(None, 28), (0, 0))
+    gx, gy = main.compute_grid_origin(1, 3, main.CELL_SIZE)
+
+    script = [
+        _click(city_buttons[0].center),
+        _click(level_buttons[0].center),
+        [],
+        _click(got_it.center),
+    ]
+    for col, slot in enumerate((3, 4, 5)):
+        script.append(_click((100, 300)))
+        script.append([{'kind': 'down', 'pos': (205, 142 + slot * 58), 'button': 1, 'pointer': 'mouse'}])
+        script.append([{'kind': 'up', 'pos': (gx + col * 150 + 75, gy + 75), 'button': 1, 'pointer': 'mouse'}])
+    script.extend([[]] * play_frames)
+
+    recorder = InputRecorder(path, seed)
+    for events in script:
+        recorder.frame(16)
+        for event in events:
+            recorder.pointer(event)
+    recorder.close()
+
+
+def test_log_round_trip(tmp_path):
+    path = tmp_path / "session.bin"
+    recorder = InputRecorder(path, seed=5)
+    recorder.frame(16)
+    recorder.pointer({'kind': 'down', 'pos': (10.0, 20.0), 'button': 3, 'pointer': 'mouse'})
+    recorder.pointer({'kind': 'move', 'pos': (400.0, 300.0), 'button': 1, 'pointer': 'touch'})
+    recorder.frame(17)
+    recorder.key(True, pygame.K_r)
+    recorder.quit()
+    recorder.close()
+
+    seed, frames = read_log(path)
+    assert seed == 5
+    assert [ms for ms, _ in frames] == [16, 17]
+    down, touch = frames[0][1]
+    assert main.normalize_pointer_event(down) == {'kind': 'down', 'pos': (10.0, 20.0), 'button': 3, 'pointer': 'mouse'}
+    assert main.normalize_pointer_event(touch)['pos'] == (400.0, 300.0)
+    key, quit_event = frames[1][1]
+    assert key.type == pygame.KEYDOWN and key.key == pygame.K_r
+    assert quit_event.type == pygame.QUIT
+
+
+def test_live_input_records_pointer_and_keys(tmp_path):
+    path = tmp_path / "live.bin"
+    live = LiveInput(path, seed=3, normalize=main.normalize_pointer_event)
+    pygame.event.clear()
+    live.tick(1000)
+    pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(5, 6), button=1))
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_p))
+    live.get_events()
+    live.close()
+
+    replayed = ReplayInput(path)
+    assert replayed.seed == 3
+    replayed.tick()
+    types = [event.type for event in replayed.get_events()]
+    assert pygame.MOUSEBUTTONDOWN in types and pygame.KEYDOWN in types
+
+
+def test_wheel_events_are_recorded_for_sandbox_replays(tmp_path):
+    path = tmp_path / "sandbox.bin"
+    live = LiveInput(path, seed=4, normalize=main.normalize_pointer_event)
+    pygame.event.clear()
+    live.tick(1000)
+    pygame.event.post(pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=-2, precise_x=0.0,
+                                         precise_y=-2.0, flipped=False))
+    live.get_events()
+    for _ in range(30):
+        live.tick(1000)
+    live.close()
+
+    _, frames = read_log(path)
+    wheel, = [event for event in frames[0][1] if event.type == pygame.MOUSEWHEEL]
+    assert (wheel.x, wheel.y) == (0, -2)
+    report = replay(path, sandbox="6x6")
+    pygame.init()
+    assert report['completed_log'] and report['seed'] == 4
+
+
+def test_replay_is_deterministic(tmp_path):
+    path = tmp_path / "level1.bin"
+    _write_level_one_session(path)
+    first = replay(path)
+    second = replay(path)
+    pygame.init()
+
+    assert first['completed_log'] and first['seed'] == 11
+    assert first['city'] == "New York City" and first['level'] == 1
+    assert first['delivered'] > 0
+    assert (first['flow_rate'], first['delivered']) == (second['flow_rate'], second['delivered'])
+    assert first['frames'] >= 900
+
+
+def test_frame_time_stats():
+    stats = frame_time_stats([0.001 * i for i in range(1, 101)])
+    assert stats['frames'] == 100
+    assert stats['max_ms'] == 100.0
+    assert 50.0 <= stats['p50_ms'] <= 51.5
+    assert stats['p95_ms'] >= 94.0
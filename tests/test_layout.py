@@ -0,0 +1,84 @@
+import os, sys
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import pygame
+pygame.init()
+
+from grid_network import IntersectionNetwork
+from intersection import Intersection, IntersectionType
+from layout import Layout, ScoreCache, score_key, simulate_layout
+from simulation import ENGINE_VERSION
+
+
+def _board(start_x=0, start_y=0, order=(0, 1, 2)):
+    net = IntersectionNetwork(1, 3, start_x, start_y, 150)
+    types = [IntersectionType.FOUR_WAY, IntersectionType.ROUNDABOUT, IntersectionType.T_INTERSECTION]
+    for col in order:
+        i = Intersection(0, col, start_x + col * 150 + 75, start_y + 75, intersection_type=types[col])
+        i.snapped = True
+        net.add_intersection(i)
+    net.get_intersection(0, 2).rotation = 2  # missing N arm keeps W-E open
+    markers = [
+        {'type': 'start', 'side': 'left', 'index': 0, 'x': start_x, 'y': start_y + 75},
+        {'type': 'end', 'side': 'right', 'index': 0, 'x': start_x + 450, 'y': start_y + 75, 'number': 1},
+    ]
+    return net, markers
+
+
+def test_snapshot_is_canonical():
+    a = Layout.capture(*_board())
+    b = Layout.capture(*_board(start_x=260, start_y=90, order=(2, 0, 1)))
+    assert a.to_bytes() == b.to_bytes()
+    assert a == b and a.digest() == b.digest()
+
+
+def test_snapshot_round_trip_rebuilds_the_board():
+    layout = Layout.capture(*_board())
+    loaded = Layout.from_bytes(layout.to_bytes())
+    assert loaded == layout
+    network, markers = loaded.build(100, 50)
+    assert sorted(network.placed_intersections) == [(0, 0), (0, 1), (0, 2)]
+    assert network.get_intersection(0, 2).rotation == 2
+    assert network.get_intersection(0, 0).get_neighbor('right') is network.get_intersection(0, 1)
+    assert markers[1] == {'type': 'end', 'x': 550, 'y': 125, 'number': 1}
+
+
+def test_snapshot_holds_sandbox_sized_boards():
+    markers = [('start', 0, -30, 999 * 150 + 75), ('end', 1, 1000 * 150 + 30, 75)]
+    layout = Layout(1000, 1000, 150, markers, [(999, 999, IntersectionType.CLOVERLEAF, 1)])
+    loaded = Layout.from_bytes(layout.to_bytes())
+    assert loaded.markers == layout.markers and loaded.cells == layout.cells
+
+
+def test_key_changes_with_every_input():
+    layout = Layout.capture(*_board())
+    base = score_key(layout, "New York City", 1, 7)
+    net, markers = _board()
+    net.get_intersection(0, 1).intersection_type = IntersectionType.CLOVERLEAF
+    others = {
+        score_key(Layout.capture(net, markers), "New York City", 1, 7),
+        score_key(layout, "Chicago", 1, 7),
+        score_key(layout, "New York City", 2, 7),
+        score_key(layout, "New York City", 1, 8),
+        score_key(layout, "New York City", 1, 7, day_length=60.0),
+        score_key(layout, "New York City", 1, 7, engine_version=ENGINE_VERSION + 1),
+    }
+    assert base not in others and len(others) == 6
+
+
+def test_cache_turns_rescoring_into_a_lookup(tmp_path):
+    layout = Layout.capture(*_board())
+    calls = []
+
+    def simulate(*args):
+        calls.append(args)
+        return simulate_layout(*args)
+
+    cache = ScoreCache(str(tmp_path))
+    first = cache.score(layout, "New York City", 1, 7, 60.0, simulate=simulate)
+    again = ScoreCache(str(tmp_path)).score(Layout.from_bytes(layout.to_bytes()), "New York City", 1, 7,
+                                            60.0, simulate=simulate)
+    assert len(calls) == 1
+    assert first == again
+    assert first['delivered'] > 0
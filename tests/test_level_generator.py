@@ -0,0 +1,61 @@
+import os, sys
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import pygame
+pygame.init()
+
+import random
+
+import pytest
+
+from level_generator import (MIN_MARKER_GAP, generate_demand, generate_level, generate_markers,
+                             perimeter_distance, spread_positions)
+from main import generate_spawn_points
+from rng import RandomStreams
+from traffic_data import get_spawn_interval
+
+
+def test_spread_positions_keep_their_distance_around_the_ring():
+    for total, count in ((12, 4), (400, 37), (4000, 250)):
+        chosen = spread_positions(total, count, random.Random(total))
+        assert len(set(chosen)) == count
+        ring = sorted(chosen)
+        gaps = [perimeter_distance(a, b, total) for a, b in zip(ring, ring[1:] + ring[:1])]
+        assert min(gaps) >= MIN_MARKER_GAP
+
+
+def test_spread_positions_without_jitter_are_evenly_spaced():
+    chosen = spread_positions(100, 10, random.Random(1), jitter=0)
+    assert {(b - a) % 100 for a, b in zip(chosen, chosen[1:])} == {10}
+    assert sorted(spread_positions(5, 5, random.Random(1))) == [0, 1, 2, 3, 4]
+    with pytest.raises(ValueError):
+        spread_positions(5, 6, random.Random(1))
+
+
+def test_generated_markers_match_the_game_format():
+    markers = generate_markers(50, 80, 7, 9, 10, 20, 150, rng=random.Random(4))
+    assert sum(m['type'] == 'start' for m in markers) == 7
+    assert sorted(m['number'] for m in markers if m['type'] == 'end') == list(range(1, 10))
+    for m in markers:
+        assert m['x'] in (10, 10 + 80 * 150) or m['y'] in (20, 20 + 50 * 150)
+    # Levels past 3 are generated the same way.
+    assert len(generate_spawn_points(6, 10, 10, 0, 0, 150, rng=random.Random(2))) == 10
+
+
+def test_demand_profile_has_two_rush_hours_at_the_requested_peak():
+    demand = generate_demand(random.Random(9), peak_volume=2500)
+    assert len(demand) == 24 and max(demand) == 2500
+    assert max(demand[6:11]) > 3 * demand[3]
+    assert max(demand[15:21]) > 3 * demand[3]
+    # A busier hour spawns more often when the profile replaces the city's.
+    quiet = get_spawn_interval("Chicago", 3 / 24 * 300, 300, 3, volumes=demand)
+    busy = get_spawn_interval("Chicago", demand.index(2500) / 24 * 300, 300, 3, volumes=demand)
+    assert busy < quiet
+
+
+def test_generate_level_is_reproducible_from_the_seed():
+    first = generate_level(30, 40, 5, 5, 150, RandomStreams(11))
+    second = generate_level(30, 40, 5, 5, 150, RandomStreams(11))
+    assert first == second
+    assert first != generate_level(30, 40, 5, 5, 150, RandomStreams(12))
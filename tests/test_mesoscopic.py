@@ -0,0 +1,103 @@
+import os, sys
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import pygame
+pygame.init()
+
+import datetime
+import statistics
+
+import pytest
+from intersection import Intersection, IntersectionType
+from grid_network import IntersectionNetwork
+from mesoscopic import (FlowRateDistribution, MesoscopicEngine, hourly_trip_counts, simulate_day,
+                        simulate_days)
+
+
+def _row_network(types):
+    net = IntersectionNetwork(1, len(types), 0, 0, 150)
+    for col, itype in enumerate(types):
+        i = Intersection(0, col, col * 150 + 75, 75, intersection_type=itype)
+        i.snapped = True
+        net.add_intersection(i)
+    return net
+
+
+def _end_to_end(net):
+    return net.find_path(net.get_intersection(0, 0), net.get_intersection(0, net.cols - 1))
+
+
+def test_light_packet_travels_at_free_flow():
+    net = _row_network([IntersectionType.CLOVERLEAF] * 3)
+    engine = MesoscopicEngine(net)
+    assert engine.add_packet(_end_to_end(net), 0.0, 10, spread=60.0)
+    engine.run()
+    assert engine.trips == 10
+    assert engine.flow_rate() == pytest.approx(1.0)
+
+
+def test_burst_queues_at_low_capacity_links():
+    free = MesoscopicEngine(_row_network([IntersectionType.CLOVERLEAF] * 3))
+    signal = MesoscopicEngine(_row_network([IntersectionType.FOUR_WAY] * 3))
+    for engine in (free, signal):
+        engine.add_packet(_end_to_end(engine.network), 0.0, 200, spread=10.0)
+        engine.run()
+    assert free.flow_rate() == pytest.approx(1.0)
+    assert signal.flow_rate() < 0.9
+
+
+def test_unroutable_demand_penalises_flow_rate():
+    net = _row_network([IntersectionType.FOUR_WAY, IntersectionType.FOUR_WAY])
+    engine = MesoscopicEngine(net)
+    engine.add_packet(_end_to_end(net), 0.0, 5, spread=60.0)
+    assert engine.add_packet([], 0.0, 5) is False
+    engine.run()
+    assert engine.spawn_attempts == 10 and engine.spawn_successes == 5
+    assert engine.flow_rate() == pytest.approx(0.5)
+
+
+def test_day_demand_is_split_exactly():
+    counts = hourly_trip_counts("Chicago", 12345)
+    assert sum(counts) == 12345
+    assert counts.index(max(counts)) == 17
+
+    net = _row_network([IntersectionType.ROUNDABOUT] * 3)
+    engine = simulate_day(net, [_end_to_end(net)], "Chicago", 5000, day_length=300.0, packet_seconds=2.5)
+    assert engine.trips == 5000
+    assert 0.0 < engine.flow_rate() <= 1.0
+
+
+def test_flow_rate_distribution_matches_batch_statistics():
+    rates = [0.2, 0.4, 0.4, 0.5, 0.9]
+    dist = FlowRateDistribution()
+    for rate in rates:
+        dist.add(rate)
+    assert dist.days == 5
+    assert dist.mean == pytest.approx(sum(rates) / 5)
+    assert dist.stdev == pytest.approx(statistics.stdev(rates))
+    assert (dist.min, dist.max) == (0.2, 0.9)
+    assert 0.4 <= dist.quantile(0.5) < 0.45
+    assert sum(dist.counts) == 5
+
+
+def test_multi_day_run_reports_weekday_and_weekend_distributions():
+    net = _row_network([IntersectionType.FOUR_WAY] * 3)
+    result = simulate_days(net, [_end_to_end(net)], "Chicago", 330, days=14, day_length=300.0,
+                           packet_seconds=2.5, start=datetime.date(2024, 6, 3))
+    dists = result['distributions']
+    assert result['days'] == 14 and result['trips'] == result['spawn_successes']
+    assert (dists['weekday'].days, dists['weekend'].days, dists['Jun'].days) == (10, 4, 14)
+    # Lighter weekend demand on the same board flows better.
+    assert dists['weekend'].mean > dists['weekday'].mean
+    assert dists['weekday'].min <= result['flow_rate'] <= dists['weekend'].max
+    single = simulate_day(net, [_end_to_end(net)], "Chicago", 1000, day_length=300.0, packet_seconds=2.5)
+    assert single.trips == 1000  # a reused engine leaves no traffic behind
+
+
+def test_reset_engine_repeats_a_day_exactly():
+    net = _row_network([IntersectionType.ROUNDABOUT] * 3)
+    engine = simulate_day(net, [_end_to_end(net)], "Chicago", 2000, day_length=300.0, packet_seconds=2.5)
+    first = (engine.trips, engine.flow_rate())
+    simulate_day(net, [_end_to_end(net)], "Chicago", 2000, day_length=300.0, packet_seconds=2.5, engine=engine)
+    assert (engine.trips, engine.flow_rate()) == first
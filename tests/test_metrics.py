@@ -0,0 +1,73 @@
+import os, sys
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import pygame
+pygame.init()
+
+import csv
+
+import pytest
+from metrics import METRIC_FIELDS, MetricsRecorder, MetricsRing, SparklineHUD
+from sim_task import SimSnapshot
+
+
+def _snapshot(steps, game_timer, delivered=0, attempts=0, successes=0, cars=()):
+    return SimSnapshot(steps, game_timer, False, 1.0, cars, delivered, attempts, successes, 0.0)
+
+
+def test_ring_keeps_only_the_newest_samples():
+    ring = MetricsRing(capacity=4)
+    for minute in range(10):
+        ring.record(minute, throughput=minute * 2)
+    assert len(ring) == 4
+    assert ring.minutes().tolist() == [6, 7, 8, 9]
+    assert ring.series('throughput').tolist() == [12, 14, 16, 18]
+    assert ring.series('throughput', last=2).tolist() == [16, 18]
+    assert ring.latest()['throughput'] == 18
+    assert ring.series('active_cars').tolist() == [0, 0, 0, 0]
+
+
+def test_export_csv_round_trips(tmp_path):
+    ring = MetricsRing(capacity=3)
+    for minute in range(5):
+        ring.record(minute, throughput=1, active_cars=minute, idle_fraction=0.5, spawn_failures=0)
+    path = tmp_path / 'metrics.csv'
+    ring.export_csv(path)
+    with open(path, newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ['minute'] + list(METRIC_FIELDS)
+    assert [float(row[0]) for row in rows[1:]] == [2, 3, 4]
+    assert [float(row[2]) for row in rows[1:]] == [2, 3, 4]
+
+
+def test_recorder_samples_once_per_game_minute():
+    ring = MetricsRing()
+    recorder = MetricsRecorder(ring, day_length=1440.0)  # one second per game minute
+    moving = (0.0, 0.0, 0.0, 1.0, 0.0, 0.0, (1, 1, 1))
+    stopped = (5.0, 5.0, 0.0, 5.0, 5.0, 0.0, (1, 1, 1))
+    recorder.observe(_snapshot(1, 600.2, delivered=3, attempts=4, successes=4, cars=(moving, stopped)))
+    recorder.observe(_snapshot(2, 600.6, delivered=4, attempts=5, successes=4, cars=(moving, stopped)))
+    recorder.observe(_snapshot(2, 600.6, delivered=4, attempts=5, successes=4, cars=(moving, stopped)))
+    assert len(ring) == 0
+    recorder.observe(_snapshot(3, 601.1, delivered=6, attempts=7, successes=5, cars=(moving,)))
+    sample = ring.latest()
+    assert sample['minute'] == 600
+    assert sample['throughput'] == 3
+    assert sample['spawn_failures'] == 2
+    assert sample['active_cars'] == 2
+    assert sample['idle_fraction'] == 0.5
+
+
+def test_sparklines_rerender_only_on_new_samples():
+    ring = MetricsRing()
+    hud = SparklineHUD(ring, pygame.font.Font(None, 22))
+    screen = pygame.Surface((400, 300))
+    hud.draw(screen, (10, 10))
+    first = dict(hud._surfaces)
+    hud.draw(screen, (10, 10))
+    assert all(hud._surfaces[name] is first[name] for name in METRIC_FIELDS)
+    ring.record(0, throughput=3)
+    ring.record(1, throughput=5)
+    hud.draw(screen, (10, 10))
+    assert all(hud._surfaces[name] is not first[name] for name in METRIC_FIELDS)
@@ -0,0 +1,64 @@
+import os, sys
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import pygame
+pygame.init()
+
+import numpy as np
+
+from camera import Camera
+from intersection import IntersectionType
+from layout import Layout
+from minimap import DENSITY_SMOOTHING, MINIMAP_VIEW, Minimap
+
+
+def _board(rows, cols):
+    cells = [(row, col, IntersectionType.FOUR_WAY, 0) for row in range(rows) for col in range(cols)]
+    network, _ = Layout(rows, cols, 150, [], cells).build()
+    return network
+
+
+def test_minimap_keeps_the_board_aspect_within_size():
+    minimap = Minimap(_board(20, 40), (0, 0, 0), size=160)
+    assert minimap.rect.size == (160, 80)
+    x, y = minimap.minimap_to_world(*minimap.world_to_minimap(3000, 1500))
+    assert abs(x - 3000) < 1 / minimap.scale and abs(y - 1500) < 1 / minimap.scale
+
+
+def test_density_bins_cars_and_smooths_over_refreshes():
+    minimap = Minimap(_board(10, 10), (0, 0, 0), size=100, refresh_interval=1)
+    screen = pygame.Surface((200, 200))
+    xs = np.array([10.0, 20.0, 1490.0, -50.0])
+    ys = np.array([10.0, 15.0, 1490.0, 10.0])  # the last car is off the board
+    minimap.update(xs, ys)
+    minimap.draw(screen)
+    assert minimap.density.sum() == DENSITY_SMOOTHING * 3
+    assert minimap.density[0, 0] == DENSITY_SMOOTHING * 2
+    assert minimap.density[-1, -1] == DENSITY_SMOOTHING
+    minimap.update(xs[:0], ys[:0])
+    minimap.draw(screen)
+    assert minimap.density[0, 0] == DENSITY_SMOOTHING * 2 * (1 - DENSITY_SMOOTHING)
+
+
+def test_density_refresh_is_throttled():
+    minimap = Minimap(_board(10, 10), (0, 0, 0), refresh_interval=5)
+    screen = pygame.Surface((200, 200))
+    refreshes = 0
+    for _ in range(20):
+        if minimap.due:
+            refreshes += 1
+            minimap.update(np.array([700.0]), np.array([700.0]))
+        minimap.draw(screen)
+    assert refreshes == 4
+    assert minimap.density.sum() > 0
+
+
+def test_minimap_outlines_the_camera_view():
+    network = _board(40, 40)
+    minimap = Minimap(network, (0, 0, 0), size=120)
+    camera = Camera((0, 0, 800, 600), (0, 0, 6000, 6000))
+    screen = pygame.Surface((800, 600))
+    minimap.draw(screen, camera)
+    left, top = minimap.world_to_minimap(*camera.visible_world()[:2])
+    assert screen.get_at((left, top + 2))[:3] == MINIMAP_VIEW
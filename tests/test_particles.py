@@ -0,0 +1,53 @@
+import os, sys
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import pygame
+pygame.init()
+
+import pytest
+from particles import ParticlePool
+
+
+def _pool(capacity=8):
+    return ParticlePool(pygame.font.Font(None, 24), capacity)
+
+
+def test_particles_rise_fade_and_expire():
+    pool = _pool()
+    pool.emit('+1', (80, 220, 80), 100, 200, -60.0)
+    pool.emit('?', (255, 160, 30), 50, 50, -40.0, alpha=100.0)
+    assert len(pool) == 2
+    pool.update(0.5)
+    assert pool.y[0] == pytest.approx(170.0)
+    assert pool.alpha[0] == pytest.approx(127.5)
+    assert len(pool) == 1  # the dimmer one has faded out
+    pool.update(0.6)
+    assert len(pool) == 0
+
+
+def test_full_pool_replaces_the_oldest_particle():
+    pool = _pool(capacity=3)
+    for i in range(5):
+        pool.emit('+1', (80, 220, 80), i, 0, -60.0)
+    assert len(pool) == 3
+    assert sorted(pool.x.tolist()) == [2.0, 3.0, 4.0]
+
+
+def test_glyphs_are_rendered_once_per_text_and_colour():
+    pool = _pool(capacity=64)
+    for i in range(50):
+        pool.emit('+1', (80, 220, 80), i, 0, -60.0)
+        pool.emit('?', (255, 160, 30), i, 0, -40.0)
+    assert len(pool._variants) == 2
+    pool.clear()
+    assert len(pool) == 0
+
+
+def test_draw_centres_glyphs_on_their_position():
+    pool = _pool()
+    screen = pygame.Surface((200, 200))
+    pool.emit('X', (255, 100, 100), 100, 100, 0.0)
+    pool.draw(screen)
+    assert screen.get_at((100, 100))[0] > 0
+    assert screen.get_at((10, 10))[:3] == (0, 0, 0)
@@ -0,0 +1,118 @@
+import os, sys
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import pygame
+pygame.init()
+
+import concurrent.futures
+import threading
+import time
+
+import preview
+from intersection import IntersectionType
+from layout import Layout
+from preview import PreviewWorker, preview_delta, shutdown_previews
+
+CITY = "New York City"
+
+
+def _layout(cells=((0, 0, IntersectionType.FOUR_WAY), (0, 2, IntersectionType.FOUR_WAY))):
+    markers = [('start', 0, 0, 75), ('end', 1, 450, 75)]
+    return Layout(1, 3, 150, markers, [(row, col, itype, 0) for row, col, itype in cells])
+
+
+def _wait(worker, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status, delta = worker.poll()
+        if status != 'pending':
+            return status, delta
+        time.sleep(0.01)
+    raise AssertionError("preview did not finish")
+
+
+def test_completing_the_road_is_predicted_to_help():
+    delta = preview_delta(_layout().to_bytes(), 0, 1, IntersectionType.FOUR_WAY, 0, CITY, 1, 7, 300.0)
+    assert delta > 0
+
+
+def test_worker_keeps_only_recent_baselines():
+    original = preview.simulate_window
+    preview.simulate_window = lambda layout, *args: float(len(layout.cells))
+    preview._baselines.clear()
+    try:
+        first = _layout().to_bytes()
+        preview_delta(first, 0, 1, IntersectionType.FOUR_WAY, 0, CITY, 1, 7, 300.0)
+        for col in range(1, preview.BASELINE_CACHE_SIZE + 3):
+            layout = Layout(1, col + 1, 150, [], [(0, c, IntersectionType.FOUR_WAY, 0) for c in range(col)])
+            preview_delta(layout.to_bytes(), 0, col, IntersectionType.FOUR_WAY, 0, CITY, 1, 7, 300.0)
+            # Hovering the first board again keeps it the most recent.
+            preview_delta(first, 0, 1, IntersectionType.FOUR_WAY, 0, CITY, 1, 7, 300.0)
+        assert len(preview._baselines) == preview.BASELINE_CACHE_SIZE
+        assert (first, CITY, 1, 7, 300.0) in preview._baselines
+    finally:
+        preview.simulate_window = original
+        preview._baselines.clear()
+
+
+def test_results_are_cached_per_cell_type_and_rotation():
+    calls = []
+
+    class CountingExecutor(concurrent.futures.ThreadPoolExecutor):
+        def submit(self, fn, *args):
+            calls.append(args[:4])
+            return super().submit(fn, *args)
+
+    with CountingExecutor(max_workers=1) as executor:
+        worker = PreviewWorker(CITY, 1, 7, 300.0, executor=executor)
+        layout = _layout()
+        worker.request(layout, (0, 1), IntersectionType.FOUR_WAY, 0)
+        assert _wait(worker)[0] == 'ready'
+        worker.request(layout, (0, 1), IntersectionType.ROUNDABOUT, 0)
+        _wait(worker)
+        worker.request(layout, (0, 1), IntersectionType.FOUR_WAY, 0)
+        assert worker.poll()[0] == 'ready'
+    assert len(calls) == 2
+
+
+def test_moving_on_abandons_the_pending_preview():
+    release = threading.Event()
+
+    def slow(*args):
+        release.wait(5)
+        return 0.5
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        worker = PreviewWorker(CITY, 1, 7, 300.0, executor=executor)
+        original = preview.preview_delta
+        preview.preview_delta = slow
+        try:
+            worker.request(_layout(), (0, 1), IntersectionType.FOUR_WAY, 0)
+            first = worker._future
+            worker.request(_layout(), (0, 0), IntersectionType.ROUNDABOUT, 0)
+            queued = worker._future
+            worker.clear()
+            assert queued.cancelled()
+            assert worker.poll() == (None, None)
+        finally:
+            release.set()
+            preview.preview_delta = original
+        first.result()
+
+
+def test_disabled_worker_never_submits():
+    worker = PreviewWorker(CITY, 1, 7, 300.0, enabled=False)
+    worker.request(_layout(), (0, 1), IntersectionType.FOUR_WAY, 0)
+    assert worker.poll() == (None, None)
+    assert preview._executor is None
+
+
+def test_runs_in_a_worker_process():
+    worker = PreviewWorker(CITY, 1, 7, 300.0)
+    try:
+        worker.request(_layout(), (0, 1), IntersectionType.FOUR_WAY, 0)
+        status, delta = _wait(worker, timeout=60.0)
+        assert status == 'ready' and delta > 0
+    finally:
+        shutdown_previews()
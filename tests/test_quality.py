@@ -0,0 +1,68 @@
+import os, sys
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import pygame
+pygame.init()
+
+from car import draw_car_rect
+from heatmap import REFRESH_INTERVAL
+from quality import MAX_QUALITY_LEVEL, RECOVER_WINDOWS, QualityGovernor
+
+
+def _feed(governor, frame_ms, frames):
+    for _ in range(frames):
+        governor.observe(frame_ms)
+    return governor.level
+
+
+def test_steps_down_one_level_per_slow_window():
+    governor = QualityGovernor(budget_ms=16.0, window=10)
+    assert _feed(governor, 16.0, 50) == 0
+    assert _feed(governor, 30.0, 3) == 1  # the rolling mean crosses 1.25x budget
+    assert not governor.hint_particles and not governor.plain_cars
+    assert _feed(governor, 30.0, 9) == 1  # waits a whole window at the new level
+    assert _feed(governor, 30.0, 1) == 2
+    assert governor.plain_cars
+    assert _feed(governor, 30.0, 100) == MAX_QUALITY_LEVEL
+    assert not governor.label_fade
+    assert governor.overlay_refresh > REFRESH_INTERVAL
+
+
+def test_a_single_spike_does_not_degrade():
+    governor = QualityGovernor(budget_ms=16.0, window=30)
+    _feed(governor, 16.0, 30)
+    governor.observe(120.0)
+    assert _feed(governor, 16.0, 100) == 0
+    assert governor.changes == 0
+
+
+def test_recovery_needs_several_good_windows_and_backs_off():
+    governor = QualityGovernor(budget_ms=16.0, window=10)
+    _feed(governor, 30.0, 10)
+    assert governor.level == 1
+    assert _feed(governor, 16.0, 10 * RECOVER_WINDOWS - 1) == 1
+    assert _feed(governor, 16.0, 1) == 0
+    # Full quality is immediately too slow again: the next recovery waits twice as long.
+    assert _feed(governor, 30.0, 10) == 1
+    assert _feed(governor, 16.0, 10 * RECOVER_WINDOWS) == 1
+    assert _feed(governor, 16.0, 10 * RECOVER_WINDOWS) == 0
+
+
+def test_frames_between_thresholds_hold_the_level():
+    governor = QualityGovernor(budget_ms=16.0, window=10)
+    _feed(governor, 30.0, 10)
+    assert _feed(governor, 18.0, 500) == 1
+
+
+def test_disabled_governor_keeps_full_quality():
+    governor = QualityGovernor(enabled=False)
+    assert _feed(governor, 100.0, 300) == 0
+    assert governor.hint_particles and governor.label_fade
+
+
+def test_plain_car_is_upright_on_vertical_roads():
+    screen = pygame.Surface((100, 100))
+    draw_car_rect(screen, (50, 40, 90.0, 50, 50, 90.0, (255, 0, 0)))
+    assert screen.get_at((50, 55))[:3] == (255, 0, 0)
+    assert screen.get_at((58, 50))[:3] == (0, 0, 0)
@@ -0,0 +1,83 @@
+import os, sys
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import pygame
+pygame.init()
+
+import pytest
+from car import Car
+from route import Route, intern_route
+
+
+def test_route_tables():
+    route = Route([(0, 0), (30, 40), (30, 40), (30, 100)])
+    assert route.cumulative == (0.0, 50.0, 50.0, 110.0)
+    assert route.length == 110.0
+    assert route.headings[1] is None
+    assert route.headings[2] == pytest.approx(90.0)
+
+
+def test_same_waypoints_share_one_route():
+    a = intern_route([(0, 0), (100, 0)])
+    b = intern_route(((0, 0), (100, 0)))
+    assert a is b
+    assert intern_route([(0, 0), (0, 100)]) is not a
+
+
+def test_interning_keeps_routes_with_different_stops_apart():
+    points = [(0, 0), (100, 0), (100, 50)]
+    default = intern_route(points)
+    gated = intern_route(points, [60.0])
+    assert gated is not default
+    assert default.stops == (0.0, 100.0, 150.0)
+    assert gated.stops == (60.0,)
+    assert intern_route(points, (60.0,)) is gated
+    assert intern_route(points) is default
+
+
+def test_cars_reference_shared_route():
+    route = intern_route([(0, 0), (100, 0), (100, 50)])
+    cars = [Car(route) for _ in range(3)] + [Car([(0, 0), (100, 0), (100, 50)])]
+    assert all(car.route is route for car in cars)
+    assert not hasattr(cars[0], '__dict__')
+    assert cars[0].path_length == 150.0
+
+
+def test_car_follows_route_to_the_end():
+    car = Car([(0, 0), (100, 0), (100, 50)])
+    car.update(0.5)
+    assert (car.x, car.y) == pytest.approx((40.0, 0.0))
+    for _ in range(20):
+        car.update(0.5)
+    assert car.done
+    assert (car.x, car.y) == (100.0, 50.0)
+    assert car.angle == pytest.approx(90.0)
+
+
+def test_motion_is_exact_under_any_dt():
+    points = [(0, 0), (100, 0), (100, 50), (20, 50)]
+    fine = Car(points)
+    coarse = Car(points)
+    for _ in range(200):
+        fine.update(0.01)
+    coarse.update(2.0)
+    assert (coarse.x, coarse.y) == pytest.approx((fine.x, fine.y))
+    assert (coarse.x, coarse.y) == pytest.approx((90.0, 50.0))
+    assert coarse.angle == pytest.approx(180.0)
+
+    coarse.update(60.0)
+    assert coarse.done and coarse.distance == coarse.path_length
+    assert coarse.idle_time == pytest.approx(60.0 - (230.0 - 160.0) / 80.0)
+
+
+def test_vectorized_lookup_matches_scalar():
+    route = Route([(0, 0), (100, 0), (100, 0), (100, 50), (20, 50)])
+    distances = [0.0, 12.5, 100.0, 120.0, 150.0, 199.0, 230.0, 500.0]
+    xs, ys, headings = route.locate_many(distances)
+    hint = 0
+    for d, x, y, h in zip(distances, xs, ys, headings):
+        sx, sy, sh, hint = route.locate(d, hint)
+        assert (x, y) == pytest.approx((sx, sy))
+        assert h == pytest.approx(sh)
+        assert route.segment_at(d) == hint
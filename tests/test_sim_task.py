@@ -0,0 +1,97 @@
+import os, sys
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import pygame
+pygame.init()
+
+import asyncio
+
+import pytest
+from grid_network import IntersectionNetwork
+from intersection import Intersection, IntersectionType
+from rng import RandomStreams
+from sim_task import SimulationTask
+from simulation import SIM_DT, Simulation
+
+
+def _simulation(seed=7):
+    net = IntersectionNetwork(1, 3, 0, 0, 150)
+    for col in range(3):
+        i = Intersection(0, col, col * 150 + 75, 75, intersection_type=IntersectionType.ROUNDABOUT)
+        i.snapped = True
+        net.add_intersection(i)
+    markers = [
+        {'type': 'start', 'side': 'left', 'index': 0, 'x': -22, 'y': 75},
+        {'type': 'end', 'side': 'right', 'index': 0, 'x': 472, 'y': 75, 'number': 1},
+    ]
+    return Simulation(net, markers, "New York City", 1, 300.0, start_time=300.0 * 7 / 24,
+                      streams=RandomStreams(seed))
+
+
+def test_task_matches_stepping_directly():
+    direct = _simulation()
+    for _ in range(1200):
+        direct.step(SIM_DT)
+
+    async def run():
+        task = SimulationTask(_simulation())
+        for _ in range(100):
+            task.feed(12 * SIM_DT)
+            await asyncio.sleep(0)
+        await task.wait_idle()
+        return task
+
+    task = asyncio.run(run())
+    assert task.snapshot.steps == 1200
+    assert task.sim.completed_stats == direct.completed_stats
+    assert task.snapshot.flow_rate == direct.flow_rate()
+    assert task.snapshot.delivered == len(direct.completed_stats) > 0
+
+
+def test_backlog_is_worked_off_in_slices():
+    frames = []
+
+    async def render(task):
+        while task.busy or not frames:
+            frames.append(task.snapshot.steps)
+            await asyncio.sleep(0)
+
+    async def run():
+        task = SimulationTask(_simulation(), slice_steps=10)
+        task.feed(100 * SIM_DT)
+        await render(task)
+        return task
+
+    task = asyncio.run(run())
+    assert task.snapshot.steps == 100
+    assert len(frames) >= 10
+    assert frames == sorted(frames) and frames[1] - frames[0] <= 10
+
+
+def test_snapshots_are_immutable():
+    async def run():
+        task = SimulationTask(_simulation())
+        task.feed(600 * SIM_DT)
+        await task.wait_idle()
+        return task
+
+    task = asyncio.run(run())
+    snapshot = task.snapshot
+    assert snapshot.cars and all(isinstance(car, tuple) for car in snapshot.cars)
+    with pytest.raises(AttributeError):
+        snapshot.steps = 0
+    assert 0.0 <= snapshot.alpha <= 1.0
+
+
+def test_events_are_delivered_once():
+    async def run():
+        task = SimulationTask(_simulation())
+        task.feed(1200 * SIM_DT)
+        await task.wait_idle()
+        return task
+
+    task = asyncio.run(run())
+    events = task.drain_events()
+    assert sum(1 for kind, _, _ in events if kind == 'delivered') == task.snapshot.delivered
+    assert task.drain_events() == []
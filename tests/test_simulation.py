@@ -0,0 +1,72 @@
+import os, sys
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import pygame
+pygame.init()
+
+import pytest
+from car import Car
+from grid_network import IntersectionNetwork
+from intersection import Intersection, IntersectionType
+from rng import RandomStreams
+from simulation import SIM_DT, Simulation
+
+
+def _simulation(day_length=300.0, seed=7):
+    net = IntersectionNetwork(1, 3, 0, 0, 150)
+    for col, itype in enumerate([IntersectionType.FOUR_WAY, IntersectionType.ROUNDABOUT, IntersectionType.CLOVERLEAF]):
+        i = Intersection(0, col, col * 150 + 75, 75, intersection_type=itype)
+        i.snapped = True
+        net.add_intersection(i)
+    markers = [
+        {'type': 'start', 'side': 'left', 'index': 0, 'x': -22, 'y': 75},
+        {'type': 'end', 'side': 'right', 'index': 0, 'x': 472, 'y': 75, 'number': 1},
+    ]
+    return Simulation(net, markers, "New York City", 1, day_length, start_time=day_length * 7 / 24,
+                      streams=RandomStreams(seed))
+
+
+def _run(frame_times):
+    sim = _simulation()
+    accumulator = 0.0
+    for frame in frame_times:
+        accumulator += frame
+        while accumulator >= SIM_DT:
+            sim.step(SIM_DT)
+            accumulator -= SIM_DT
+    return sim
+
+
+def test_results_do_not_depend_on_frame_rate():
+    smooth = _run([1 / 60] * 1200)
+    choppy = _run([1 / 60 * 4, 1 / 60 * 0.5, 1 / 60 * 7.5] * 100)
+    assert smooth.steps == choppy.steps
+    assert len(smooth.completed_stats) > 0
+    assert smooth.completed_stats == choppy.completed_stats
+    assert smooth.flow_rate() == choppy.flow_rate()
+
+
+def test_events_report_deliveries_once():
+    sim = _run([1 / 60] * 1200)
+    events = sim.drain_events()
+    assert sum(1 for kind, _, _ in events if kind == 'delivered') == len(sim.completed_stats)
+    assert sim.drain_events() == []
+
+
+def test_day_ends_on_schedule():
+    sim = _simulation(day_length=24.0)
+    while not sim.finished:
+        sim.step()
+    assert sim.game_timer == pytest.approx(24.0, abs=SIM_DT)
+
+
+def test_car_draw_interpolates_between_updates():
+    screen = pygame.Surface((200, 50))
+    car = Car([(0, 0), (160, 0)])
+    car.update(1.0)
+    assert (car.prev_x, car.x) == (0.0, 80.0)
+    screen.fill((0, 0, 0))
+    car.draw(screen, 0.5)
+    assert screen.get_at((40, 0)) != pygame.Color(0, 0, 0)
+    assert screen.get_at((80, 0)) == pygame.Color(0, 0, 0)
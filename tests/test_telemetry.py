@@ -0,0 +1,147 @@
+import os, sys
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import pygame
+pygame.init()
+
+import numpy as np
+
+from grid_network import IntersectionNetwork
+from intersection import Intersection, IntersectionType
+from rng import RandomStreams
+from simulation import Simulation
+from telemetry import (CITIES, STATUS_DELIVERED, STATUS_UNROUTABLE, TYPE_COLUMNS, TelemetryWriter,
+                       read_chunks)
+
+
+def _row(writer, index, city="Chicago"):
+    counts = [0] * len(TYPE_COLUMNS)
+    counts[index % len(counts)] = 2
+    writer.record(STATUS_DELIVERED, city, 2, 9, index % 24, float(index), float(index) + 5.0, 0, 1,
+                  1234, 3, 300.0, 5.0, 1.25, counts)
+
+
+def _concat(path, name):
+    return np.concatenate([chunk[name] for chunk in read_chunks(path)])
+
+
+def test_rows_round_trip_through_chunks(tmp_path):
+    path = str(tmp_path / 'trips.cltr')
+    writer = TelemetryWriter(path, chunk_rows=64)
+    for index in range(150):
+        _row(writer, index)
+    writer.close()
+    chunks = list(read_chunks(path))
+    assert [len(chunk['hour']) for chunk in chunks] == [64, 64, 22]
+    assert _concat(path, 'spawn_time').tolist() == [float(i) for i in range(150)]
+    assert set(_concat(path, 'city').tolist()) == {CITIES.index("Chicago")}
+    assert _concat(path, TYPE_COLUMNS[0])[::len(TYPE_COLUMNS)].tolist() == [2] * 19
+
+
+def test_long_routes_and_many_markers_fit(tmp_path):
+    path = str(tmp_path / 'trips.cltr')
+    writer = TelemetryWriter(path, background=False)
+    counts = [0] * len(TYPE_COLUMNS)
+    counts[1] = 300
+    writer.record(STATUS_DELIVERED, "Chicago", 3, 1, 8, 0.0, 90.0, 280, 300, 1, 300, 45000.0, 90.0, 0.0, counts)
+    writer.close()
+    chunk = next(read_chunks(path))
+    assert (chunk['start'][0], chunk['end'][0], chunk[TYPE_COLUMNS[1]][0]) == (280, 300, 300)
+
+
+def test_columns_are_memory_mapped_views(tmp_path):
+    path = str(tmp_path / 'trips.cltr')
+    writer = TelemetryWriter(path, chunk_rows=16, background=False)
+    for index in range(16):
+        _row(writer, index)
+    assert writer.rows_written == 16  # written inline at the chunk boundary
+    writer.close()
+    chunk = next(read_chunks(path))
+    column = chunk['idle_time']
+    assert isinstance(column.base, np.memmap) or isinstance(column.base.base, np.memmap)
+    assert not column.flags.writeable
+    assert column.ctypes.data % 4 == 0
+
+
+def test_reopening_appends_and_truncated_chunks_are_ignored(tmp_path):
+    path = str(tmp_path / 'trips.cltr')
+    for _ in range(2):
+        writer = TelemetryWriter(path, chunk_rows=10)
+        for index in range(10):
+            _row(writer, index)
+        writer.close()
+    size = os.path.getsize(path)
+    with open(path, 'ab') as f:
+        f.write(b'CHNK' + (10).to_bytes(4, 'little') + b'\0' * 7)
+    assert os.path.getsize(path) > size
+    assert len(_concat(path, 'seed')) == 20
+
+
+def test_appending_after_a_crash_drops_the_partial_chunk(tmp_path):
+    path = str(tmp_path / 'trips.cltr')
+    writer = TelemetryWriter(path, chunk_rows=4, background=False)
+    for index in range(8):
+        _row(writer, index)
+    writer.close()
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - 10)
+    assert len(_concat(path, 'seed')) == 4
+
+    writer = TelemetryWriter(path, chunk_rows=4, background=False)
+    for index in range(8, 12):
+        _row(writer, index)
+    writer.close()
+    assert _concat(path, 'spawn_time').tolist() == [0.0, 1.0, 2.0, 3.0, 8.0, 9.0, 10.0, 11.0]
+
+
+def test_simulation_records_every_trip(tmp_path):
+    net = IntersectionNetwork(1, 3, 0, 0, 150)
+    for col in range(3):
+        i = Intersection(0, col, col * 150 + 75, 75, intersection_type=IntersectionType.ROUNDABOUT)
+        i.snapped = True
+        net.add_intersection(i)
+    markers = [
+        {'type': 'start', 'side': 'left', 'index': 0, 'x': -22, 'y': 75},
+        {'type': 'end', 'side': 'right', 'index': 0, 'x': 472, 'y': 75, 'number': 1},
+        {'type': 'end', 'side': 'top', 'index': 1, 'x': 225, 'y': -600, 'number': 2},
+    ]
+    path = str(tmp_path / 'trips.cltr')
+    writer = TelemetryWriter(path, chunk_rows=8)
+    sim = Simulation(net, markers, "New York City", 1, 300.0, start_time=300.0 * 7 / 24,
+                     streams=RandomStreams(3), telemetry=writer)
+    for _ in range(2400):
+        sim.step()
+    writer.close()
+
+    status = _concat(path, 'status')
+    delivered = status == STATUS_DELIVERED
+    assert delivered.sum() == len(sim.completed_stats) > 0
+    assert np.allclose(_concat(path, 'travel_time')[delivered], [s[1] for s in sim.completed_stats])
+    assert set(_concat(path, 'hour').tolist()) >= {7}
+    hops = _concat(path, 'hops')[delivered]
+    assert (hops >= 1).all()
+    assert (_concat(path, 'n_roundabout')[delivered] == hops).all()
+
+
+def test_unroutable_spawns_are_recorded(tmp_path):
+    net = IntersectionNetwork(1, 3, 0, 0, 150)
+    for col in (0, 2):
+        i = Intersection(0, col, col * 150 + 75, 75)
+        i.snapped = True
+        net.add_intersection(i)
+    markers = [
+        {'type': 'start', 'side': 'left', 'index': 0, 'x': -22, 'y': 75},
+        {'type': 'end', 'side': 'right', 'index': 0, 'x': 472, 'y': 75, 'number': 1},
+    ]
+    path = str(tmp_path / 'trips.cltr')
+    writer = TelemetryWriter(path)
+    sim = Simulation(net, markers, "Los Angeles", 3, 300.0, start_time=300.0 * 7 / 24,
+                     streams=RandomStreams(3), telemetry=writer)
+    for _ in range(600):
+        sim.step()
+    writer.close()
+    status = _concat(path, 'status')
+    assert len(status) == sim.spawn_attempts > 0
+    assert (status == STATUS_UNROUTABLE).all()
+    assert set(_concat(path, 'end').tolist()) == {1}
@@ -0,0 +1,114 @@
+import os, sys
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import pygame
+pygame.init()
+
+import pytest
+from car import Car
+from grid_network import IntersectionNetwork
+from intersection import Intersection, IntersectionType
+from throughput import AXIS_EW, AXIS_NS, IntersectionServer, RingQueue, ThroughputModel
+
+
+class _StubCar:
+    def __init__(self):
+        self.admitted = 0
+
+    def admit(self):
+        self.admitted += 1
+
+
+def _server(itype, row=0, col=0):
+    return IntersectionServer(Intersection(row, col, 0, 0, intersection_type=itype))
+
+
+def _served_in(server, seconds, axis=AXIS_EW, dt=0.05):
+    cars = [_StubCar() for _ in range(40)]
+    for car in cars:
+        server.arrive(car, axis)
+    for _ in range(int(seconds / dt)):
+        server.step(dt)
+    return sum(car.admitted for car in cars)
+
+
+def test_ring_queue_is_bounded_fifo():
+    q = RingQueue(3)
+    assert q.push('a') and q.push('b') and q.push('c')
+    assert q.push('d') is False
+    assert q.pop() == 'a'
+    assert q.push('d')
+    assert [q.pop(), q.pop(), q.pop()] == ['b', 'c', 'd']
+    with pytest.raises(IndexError):
+        q.pop()
+
+
+def test_signal_only_admits_green_axis():
+    server = _server(IntersectionType.FOUR_WAY)
+    red_axis = AXIS_EW if server.green_axis() == AXIS_NS else AXIS_NS
+    car = _StubCar()
+    server.arrive(car, red_axis)
+    server.step(0.01)
+    assert car.admitted == 0
+    server.step(server.green)
+    assert car.admitted == 1
+
+
+def test_free_flow_types_outserve_signals():
+    cloverleaf = _served_in(_server(IntersectionType.CLOVERLEAF), 4.0)
+    roundabout = _served_in(_server(IntersectionType.ROUNDABOUT), 4.0)
+    t_signal = _served_in(_server(IntersectionType.T_INTERSECTION), 4.0)
+    assert cloverleaf > roundabout > t_signal > 0
+
+
+def test_car_idles_until_admitted():
+    model = ThroughputModel()
+    a = Intersection(0, 0, 0, 0, intersection_type=IntersectionType.FOUR_WAY)
+    b = Intersection(0, 1, 80, 0, intersection_type=IntersectionType.CLOVERLEAF)
+    pixels = [(0, 0), (80, 0)]
+    car = Car(pixels, gates=model.gates_for([a, b], pixels))
+
+    for _ in range(200):
+        model.step(0.05)
+        car.update(0.05)
+        if car.done:
+            break
+
+    assert car.done
+    assert car.travel_time > 1.0
+    assert 0.0 < car.idle_time < car.travel_time
+
+
+def test_servers_follow_removed_and_replaced_intersections():
+    network = IntersectionNetwork(1, 3, 0, 0, 80)
+    a = Intersection(0, 0, 40, 40, intersection_type=IntersectionType.CLOVERLEAF)
+    b = Intersection(0, 1, 120, 40, intersection_type=IntersectionType.FOUR_WAY)
+    for intersection in (a, b):
+        intersection.snapped = True
+        network.add_intersection(intersection)
+    model = ThroughputModel(network)
+    pixels = [(40, 40), (120, 40)]
+    car = Car(pixels, gates=model.gates_for([a, b], pixels))
+    old = model.server_for(b)
+
+    # A removed intersection keeps serving the car already routed through it.
+    network.remove_intersection(b)
+    model.step(0.05)
+    assert model.servers[b] is old
+    for _ in range(200):
+        model.step(0.05)
+        car.update(0.05)
+        if car.done:
+            break
+    assert car.done
+    model.step(0.05)
+    assert b not in model.servers
+
+    # Placed again one cell over, it gets a server phased for the new cell.
+    b.x = 200
+    b.snap_to_grid(0, 0, 80, 1, 3)
+    network.add_intersection(b)
+    server = model.server_for(b)
+    assert server is not old and server.position == (0, 2)
+    assert server._phase_offset == 0.0 != old._phase_offset
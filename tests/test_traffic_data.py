@@ -0,0 +1,28 @@
+import os, sys
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import pygame
+pygame.init()
+
+import pytest
+
+from traffic_data import MONTHLY_FACTORS, TRAFFIC_DATA, daily_profile, day_type
+
+
+def test_weekday_profile_is_the_city_profile_scaled_by_month():
+    base = TRAFFIC_DATA["Chicago"]
+    assert daily_profile("Chicago", weekday=2, month=1) == pytest.approx([v * MONTHLY_FACTORS[0] for v in base])
+    assert sum(MONTHLY_FACTORS) / 12 == pytest.approx(1.0, abs=0.01)
+    custom = list(range(1, 25))
+    assert daily_profile("Chicago", weekday=0, month=6, profile=custom)[0] == pytest.approx(MONTHLY_FACTORS[5])
+
+
+def test_weekends_lose_the_commuter_peaks():
+    weekday = daily_profile("New York City", weekday=4, month=5)
+    weekend = daily_profile("New York City", weekday=5, month=5)
+    assert (day_type(4), day_type(5), day_type(6)) == ('weekday', 'weekend', 'weekend')
+    assert sum(weekend) < sum(weekday)
+    assert weekend[8] < weekday[8] / 2         # no morning rush
+    assert weekend[2] > weekday[2]             # busier late at night
+    assert max(range(24), key=weekend.__getitem__) != 8
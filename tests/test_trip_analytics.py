@@ -0,0 +1,87 @@
+import os, sys
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import pygame
+pygame.init()
+
+import pytest
+from scoring import calculate_flow_rate
+from telemetry import STATUS_DELIVERED, STATUS_UNROUTABLE, TYPE_COLUMNS, TelemetryWriter
+from tools.trip_analytics import summarize
+
+ROUNDABOUT = TYPE_COLUMNS.index('n_roundabout')
+FOUR_WAY = TYPE_COLUMNS.index('n_four_way')
+
+
+def _write(path, trips, chunk_rows=7):
+    writer = TelemetryWriter(str(path), chunk_rows=chunk_rows)
+    for status, city, level, hour, length, travel, idle, type_index in trips:
+        counts = [0] * len(TYPE_COLUMNS)
+        if type_index is not None:
+            counts[type_index] = 1
+        writer.record(status, city, level, 1, hour, 0.0, travel, 0, 1, 0, 1, length, travel, idle, counts)
+    writer.close()
+
+
+def _trips():
+    trips = []
+    for i in range(40):
+        trips.append((STATUS_DELIVERED, "Chicago", 1, 8, 300.0, 4.0 + i * 0.1, 0.5, ROUNDABOUT))
+        trips.append((STATUS_DELIVERED, "Los Angeles", 3, 17, 300.0, 8.0 + i * 0.1, 3.0, FOUR_WAY))
+    for _ in range(10):
+        trips.append((STATUS_UNROUTABLE, "Los Angeles", 3, 17, 0.0, 0.0, 0.0, None))
+    return trips
+
+
+def test_groups_match_calculate_flow_rate(tmp_path):
+    _write(tmp_path / 'a.cltr', _trips())
+    report = summarize([tmp_path / 'a.cltr'])
+    assert report['rows'] == 90
+
+    la = [(300.0, 8.0 + i * 0.1, 3.0) for i in range(40)]
+    assert report['by_hour'][17]['flow_rate'] == pytest.approx(calculate_flow_rate(la, 50, 40))
+    assert report['by_city']['Los Angeles']['unroutable_share'] == pytest.approx(0.2)
+    assert report['by_level'][1]['delivered'] == 40
+    assert set(report['by_hour']) == {8, 17}
+
+
+def test_intersection_type_breakdown(tmp_path):
+    _write(tmp_path / 'a.cltr', _trips())
+    by_type = summarize([tmp_path / 'a.cltr'])['by_type']
+    assert set(by_type) == {'roundabout', 'four_way'}
+    assert by_type['roundabout']['mean_idle'] == pytest.approx(0.5)
+    assert by_type['four_way']['mean_idle'] == pytest.approx(3.0)
+    assert by_type['roundabout']['flow_rate'] > by_type['four_way']['flow_rate']
+
+
+def test_type_breakdown_leaves_unroutable_trips_out(tmp_path):
+    trips = [(STATUS_DELIVERED, "Chicago", 1, 8, 300.0, 6.0, 1.0, FOUR_WAY)] * 10
+    trips += [(STATUS_UNROUTABLE, "Chicago", 1, 8, 0.0, 0.0, 0.0, None)] * 10
+    _write(tmp_path / 'a.cltr', trips)
+    report = summarize([tmp_path / 'a.cltr'])
+    assert report['overall']['unroutable_share'] == pytest.approx(0.5)
+    four_way = report['by_type']['four_way']
+    assert four_way['trips'] == four_way['delivered'] == 10
+    assert 'unroutable_share' not in four_way
+    delivered = [(300.0 * 10, 6.0 * 10, 1.0 * 10)]
+    assert four_way['flow_rate'] == pytest.approx(calculate_flow_rate(delivered, 10, 10))
+    assert report['overall']['flow_rate'] == pytest.approx(calculate_flow_rate(delivered, 20, 10))
+
+
+def test_percentiles_are_exact_to_one_bin(tmp_path):
+    trips = [(STATUS_DELIVERED, "Chicago", 1, 9, 100.0, float(t), 0.0, None) for t in range(1, 101)]
+    _write(tmp_path / 'a.cltr', trips)
+    travel = summarize([tmp_path / 'a.cltr'], bin_width=0.1)['travel_time']
+    assert travel['p50'] == pytest.approx(50.0, abs=0.1)
+    assert travel['p99'] == pytest.approx(99.0, abs=0.1)
+
+
+def test_multiple_files_are_combined(tmp_path):
+    _write(tmp_path / 'a.cltr', _trips())
+    _write(tmp_path / 'b.cltr', _trips(), chunk_rows=1000)
+    combined = summarize([tmp_path / 'a.cltr', tmp_path / 'b.cltr'])
+    single = summarize([tmp_path / 'a.cltr'])
+    assert combined['rows'] == 180
+    assert combined['overall']['flow_rate'] == pytest.approx(single['overall']['flow_rate'])
@@ -0,0 +1,77 @@
+import os, sys
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import pygame
+pygame.init()
+
+import pytest
+from car import Car
+from grid_network import IntersectionNetwork
+from intersection import Intersection, IntersectionType
+from throughput import ThroughputModel
+from turn_geometry import MOVEMENTS, STOP_LINE, build_route
+
+
+def _network(types):
+    """types: {(row, col): IntersectionType}"""
+    net = IntersectionNetwork(3, 3, 0, 0, 150)
+    for (row, col), itype in types.items():
+        i = Intersection(row, col, col * 150 + 75, row * 150 + 75, intersection_type=itype)
+        i.snapped = True
+        net.add_intersection(i)
+    return net
+
+
+def test_every_movement_starts_and_ends_on_an_arm():
+    for (itype, rotation, entry, exit), (points, length) in MOVEMENTS.items():
+        if entry is not None:
+            assert max(abs(points[0][0]), abs(points[0][1])) == pytest.approx(STOP_LINE)
+        if exit is not None:
+            assert max(abs(points[-1][0]), abs(points[-1][1])) == pytest.approx(STOP_LINE)
+        assert length >= 0.0
+
+
+def test_design_changes_turn_length():
+    def left(itype):
+        return MOVEMENTS[(itype, 0, 'S', 'W')][1]
+    def right(itype):
+        return MOVEMENTS[(itype, 0, 'S', 'E')][1]
+    # A cloverleaf left turn drives a full loop ramp; a roundabout goes most of the way round.
+    assert left(IntersectionType.CLOVERLEAF) > left(IntersectionType.ROUNDABOUT) > left(IntersectionType.FOUR_WAY)
+    assert right(IntersectionType.ROUNDABOUT) < left(IntersectionType.ROUNDABOUT)
+    assert MOVEMENTS[(IntersectionType.FOUR_WAY, 0, 'S', 'N')][1] == pytest.approx(2 * STOP_LINE)
+
+
+def test_route_joins_movements_and_stops_at_stop_lines():
+    net = _network({
+        (0, 0): IntersectionType.FOUR_WAY,
+        (0, 1): IntersectionType.ROUNDABOUT,
+        (1, 1): IntersectionType.CLOVERLEAF,
+    })
+    path = net.find_path(net.get_intersection(0, 0), net.get_intersection(1, 1))
+    route = build_route(path)
+    assert route.points[0] == (75.0, 75.0)
+    assert route.points[-1] == (225.0, 225.0)
+    # Stops sit at the centre of the first intersection, then STOP_LINE short of each later one.
+    assert route.stops[0] == 0.0
+    assert route.stops[1] == pytest.approx(150 - STOP_LINE)
+    # The roundabout's right turn follows the ring instead of the grid corner.
+    assert len(route.points) > 10
+    assert route.length != pytest.approx(300.0)
+    assert build_route(path) is route
+
+
+def test_gated_car_waits_at_stop_line():
+    net = _network({(0, 0): IntersectionType.CLOVERLEAF, (0, 1): IntersectionType.FOUR_WAY})
+    path = net.find_path(net.get_intersection(0, 0), net.get_intersection(0, 1))
+    model = ThroughputModel()
+    car = Car(build_route(path), gates=model.gates_for(path, net.intersections_to_pixels(path)))
+    for _ in range(40):
+        model.step(0.05)
+        car.update(0.05)
+        if car.gate_index == 1 and car.queued:
+            break
+    assert car.queued
+    assert car.distance == pytest.approx(car.route.stops[1])
+    assert (car.x, car.y) == pytest.approx((225.0 - STOP_LINE, 75.0))
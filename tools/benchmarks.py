@@ -0,0 +1,410 @@
+"""Benchmark the simulation and rendering hot paths.
+
+Run ``python tools/benchmarks.py`` to time every case and compare it with
+the stored baseline (tools/benchmark_baseline.json). A case regresses when
+it is slower than its baseline by more than the threshold; the script then
+exits with status 1. Use ``--output`` to keep the machine-readable results
+and ``--save-baseline`` after an intentional performance change.
+
+Baselines are machine specific: regenerate them on the machine that runs
+the comparison.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import pygame  # noqa: E402
+
+pygame.init()
+
+import main as game  # noqa: E402
+from car import Car  # noqa: E402
+from cell_automaton import CellAutomaton  # noqa: E402
+from grid_network import IntersectionNetwork  # noqa: E402
+from intersection import Intersection, IntersectionType  # noqa: E402
+from level_generator import generate_level  # noqa: E402
+from rng import RandomStreams  # noqa: E402
+from scoring import calculate_flow_rate  # noqa: E402
+from traffic_data import get_spawn_interval  # noqa: E402
+from turn_geometry import build_route  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "benchmark_baseline.json"
+DEFAULT_THRESHOLD = 0.25
+
+CAR_COUNTS = (10, 100, 1000, 10000)
+GRID_SIZES = (3, 10, 32, 100)
+QUICK_CAR_COUNTS = (10, 100)
+QUICK_GRID_SIZES = (3, 10)
+
+MIN_REPEAT_SECONDS = 0.05
+REPEATS = 5
+
+
+def measure(func: Callable[[], object], setup: Callable[[], object] | None = None,
+            repeats: int = REPEATS, min_seconds: float = MIN_REPEAT_SECONDS) -> dict:
+    """Time func like timeit: calls per repeat grow until a repeat takes min_seconds.
+
+    Returns the median seconds per call plus the counts used.
+    """
+    number = 1
+    while True:
+        if setup:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds or number >= 1 << 20:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_seconds / elapsed) + 1))
+
+    samples = [elapsed / number]
+    for _ in range(repeats - 1):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return {"seconds": statistics.median(samples), "number": number, "repeats": repeats}
+
+
+# ----------------------------------------------------------------------
+# Fixtures
+# ----------------------------------------------------------------------
+
+def build_grid(size: int, cell_size: int = 150) -> IntersectionNetwork:
+    """A size x size network of connected four-way intersections."""
+    network = IntersectionNetwork(size, size, 0, 0, cell_size)
+    for row in range(size):
+        for col in range(size):
+            intersection = Intersection(
+                row, col, col * cell_size + cell_size // 2, row * cell_size + cell_size // 2,
+                intersection_type=IntersectionType.FOUR_WAY,
+            )
+            intersection.snapped = True
+            network.add_intersection(intersection)
+    return network
+
+
+def build_fleet(count: int, seed: int = 1) -> list[Car]:
+    """Cars spread along one long serpentine route, so none finish while being timed."""
+    rng = random.Random(seed)
+    size = 30
+    network = build_grid(size)
+    path = []
+    for row in range(size):
+        cols = range(size) if row % 2 == 0 else range(size - 1, -1, -1)
+        path.extend(network.get_intersection(row, col) for col in cols)
+    route = build_route(path)
+    cars = []
+    for _ in range(count):
+        car = Car(route, color=(255, 220, 30))
+        car.update(rng.uniform(0.0, 600.0))
+        cars.append(car)
+    return cars
+
+
+class ScriptedInput:
+    """Input source that plays scripted events at a fixed 60 fps for run_game."""
+
+    def __init__(self, script: dict[int, list], frames: int):
+        self.script = script
+        self.frames = frames
+        self.frame = 0
+        self.frame_times: list[float] = []
+        self._last = None
+
+    def tick(self, fps: int = 60) -> int:
+        now = time.perf_counter()
+        if self._last is not None:
+            self.frame_times.append(now - self._last)
+        self._last = now
+        self.frame += 1
+        return 1000 // 60
+
+    def get_events(self) -> list:
+        if self.frame >= self.frames:
+            return [pygame.event.Event(pygame.QUIT)]
+        return self.script.get(self.frame, [])
+
+    def now_ms(self) -> int:
+        return self.frame * 1000 // 60
+
+    def close(self) -> None:
+        pass
+
+
+def level_three_script() -> dict[int, list]:
+    """Fill the 3x3 board from the desktop palette, then start traffic."""
+    rows, cols = 3, 3
+    gx, gy = game.compute_grid_origin(rows, cols, game.CELL_SIZE)
+    slots = [3, 4, 5, 6, 1, 2, 0, 7, 3]
+    script: dict[int, list] = {}
+    frame = 2
+    for index, slot in enumerate(slots):
+        row, col = divmod(index, cols)
+        script[frame] = [pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(100, 300), button=1)]
+        script[frame + 1] = [pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(205, 142 + slot * 58), button=1)]
+        script[frame + 2] = [pygame.event.Event(
+            pygame.MOUSEBUTTONUP, pos=(gx + col * game.CELL_SIZE + 75, gy + row * game.CELL_SIZE + 75), button=1,
+        )]
+        frame += 4
+    script[frame] = [pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(180, 40), button=1)]
+    return script
+
+
+# ----------------------------------------------------------------------
+# Cases
+# ----------------------------------------------------------------------
+
+def bench_car_update(count: int) -> dict:
+    cars = build_fleet(count)
+    state = [(car.distance, car.segment, car.travel_time, car.idle_time) for car in cars]
+
+    def reset():
+        for car, (distance, segment, travel, idle) in zip(cars, state):
+            car.distance, car.segment, car.travel_time, car.idle_time = distance, segment, travel, idle
+            car.done = False
+
+    def run():
+        for car in cars:
+            car.update(1.0 / 60.0)
+
+    return measure(run, setup=reset)
+
+
+def build_cell_fleet(count: int, seed: int = 1) -> CellAutomaton:
+    """A CellAutomaton with count vehicles spread along one serpentine route."""
+    size = 30
+    network = build_grid(size)
+    path = []
+    for row in range(size):
+        cols = range(size) if row % 2 == 0 else range(size - 1, -1, -1)
+        path.extend(network.get_intersection(row, col) for col in cols)
+    ca = CellAutomaton(network, seed=seed, capacity=count)
+    route_id = ca._route_id(path)
+    segments = ca._route_segments[route_id]
+    # Place vehicles directly on distinct cells instead of queueing them at the entry.
+    cells = [(leg, segment, pos) for leg, segment in enumerate(segments.tolist())
+             for pos in range(int(ca.seg_len[segment]))]
+    chosen = sorted(random.Random(seed).sample(range(len(cells)), min(count, len(cells))))
+    for i, index in enumerate(chosen):
+        leg, segment, pos = cells[index]
+        ca.seg[i], ca.pos[i], ca.leg[i], ca.route[i] = segment, pos, leg, route_id
+    ca.count = len(chosen)
+    return ca
+
+
+def bench_cell_automaton_step(count: int) -> dict:
+    ca = build_cell_fleet(count)
+    arrays = ("seg", "pos", "vel", "route", "leg", "born", "idle")
+    state = {name: getattr(ca, name).copy() for name in arrays}
+    active = ca.count
+
+    def reset():
+        for name in arrays:
+            getattr(ca, name)[:] = state[name]
+        ca.count = active
+
+    return measure(ca.step, setup=reset)
+
+
+def bench_car_draw(count: int) -> dict:
+    cars = build_fleet(count)
+    surface = pygame.Surface((1600, 1600))
+
+    def run():
+        for car in cars:
+            car.draw(surface, 0.5)
+
+    return measure(run)
+
+
+def bench_find_path(size: int) -> dict:
+    network = build_grid(size)
+    rng = random.Random(size)
+    cells = list(network.placed_intersections.values())
+    pairs = [(rng.choice(cells), rng.choice(cells)) for _ in range(64)]
+    index = [0]
+
+    def run():
+        if network.router is not None:
+            network.router.clear_cache()  # time cold queries, not cache hits
+        a, b = pairs[index[0] % len(pairs)]
+        index[0] += 1
+        network.find_path(a, b)
+
+    network.find_path(*pairs[0])  # build the router's abstract graph outside the timing
+    return measure(run)
+
+
+def bench_reconnect_around(size: int) -> dict:
+    network = build_grid(size)
+    centre = size // 2
+    return measure(lambda: network._reconnect_around(centre, centre))
+
+
+def bench_edit_intersection(size: int) -> dict:
+    """Remove the centre intersection and place it again, as a sandbox edit does."""
+    network = build_grid(size)
+    centre = size // 2
+    intersection = network.get_intersection(centre, centre)
+
+    def run():
+        network.remove_intersection(intersection)
+        intersection.snap_to_grid(0, 0, network.cell_size, size, size)
+        network.add_intersection(intersection)
+
+    return measure(run)
+
+
+def bench_generate_level(size: int) -> dict:
+    """Markers on a quarter of the perimeter of a size x size board, plus demand."""
+    count = max(1, size // 2)
+
+    def run():
+        generate_level(size, size, count, count, 150, RandomStreams(size))
+
+    return measure(run)
+
+
+def bench_calculate_flow_rate(count: int) -> dict:
+    rng = random.Random(count)
+    stats = [(rng.uniform(100, 900), rng.uniform(2, 20), rng.uniform(0, 5)) for _ in range(count)]
+    return measure(lambda: calculate_flow_rate(stats, count + 5, count))
+
+
+def bench_get_spawn_interval() -> dict:
+    times = [i * 0.37 for i in range(1000)]
+
+    def run():
+        for t in times:
+            get_spawn_interval("Los Angeles", t, 300.0, 3)
+
+    return measure(run)
+
+
+def bench_run_game_frame(frames: int = 600) -> dict:
+    """Mean real time of a headless run_game frame on a full level 3 board."""
+    screen = pygame.display.set_mode((game.WINDOW_WIDTH, game.WINDOW_HEIGHT))
+    inputs = ScriptedInput(level_three_script(), frames)
+    asyncio.run(game.run_game(screen, "Los Angeles", 3, seed=1, inputs=inputs))
+    measured = inputs.frame_times[len(inputs.frame_times) // 4:]  # skip board building
+    return {"seconds": statistics.median(measured), "number": len(measured), "repeats": 1}
+
+
+def cases(quick: bool = False) -> dict[str, Callable[[], dict]]:
+    """All benchmark cases by name."""
+    car_counts = QUICK_CAR_COUNTS if quick else CAR_COUNTS
+    grid_sizes = QUICK_GRID_SIZES if quick else GRID_SIZES
+    found: dict[str, Callable[[], dict]] = {}
+    for count in car_counts:
+        found[f"car_update[{count}]"] = lambda count=count: bench_car_update(count)
+        found[f"car_draw[{count}]"] = lambda count=count: bench_car_draw(count)
+        found[f"calculate_flow_rate[{count}]"] = lambda count=count: bench_calculate_flow_rate(count)
+        found[f"cell_automaton_step[{count}]"] = lambda count=count: bench_cell_automaton_step(count)
+    for size in grid_sizes:
+        found[f"find_path[{size}x{size}]"] = lambda size=size: bench_find_path(size)
+        found[f"reconnect_around[{size}x{size}]"] = lambda size=size: bench_reconnect_around(size)
+        found[f"edit_intersection[{size}x{size}]"] = lambda size=size: bench_edit_intersection(size)
+        found[f"generate_level[{size}x{size}]"] = lambda size=size: bench_generate_level(size)
+    found["get_spawn_interval[1000]"] = bench_get_spawn_interval
+    found["run_game_frame[level3]"] = lambda: bench_run_game_frame(120 if quick else 600)
+    return found
+
+
+def run_suite(quick: bool = False, name_filter: str | None = None, log=print) -> dict:
+    """Run every (matching) case and return the results document."""
+    results = {}
+    for name, case in cases(quick).items():
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = case()
+        log(f"{name:<32} {results[name]['seconds'] * 1e6:>12.1f} us")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list[dict]:
+    """
+    Compare two results documents case by case.
+
+    Returns one row per case present in both, with the slowdown ratio and
+    whether it exceeds 1 + threshold.
+    """
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None or base["seconds"] <= 0:
+            continue
+        ratio = result["seconds"] / base["seconds"]
+        rows.append({
+            "name": name,
+            "baseline": base["seconds"],
+            "current": result["seconds"],
+            "ratio": ratio,
+            "regressed": ratio > 1.0 + threshold,
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark City Limits hot paths.")
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="baseline JSON to compare with")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before a case counts as a regression (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--filter", default=None, help="only run cases whose name contains this text")
+    parser.add_argument("--quick", action="store_true", help="small sizes only")
+    args = parser.parse_args()
+
+    document = run_suite(quick=args.quick, name_filter=args.filter)
+    if args.output:
+        args.output.write_text(json.dumps(document, indent=2) + "\n")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(document, indent=2) + "\n")
+        print(f"baseline written to {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+
+    rows = compare(document, json.loads(args.baseline.read_text()), args.threshold)
+    regressions = [row for row in rows if row["regressed"]]
+    for row in rows:
+        flag = "REGRESSED" if row["regressed"] else ""
+        print(f"{row['name']:<32} {row['ratio']:>6.2f}x baseline {flag}")
+    if regressions:
+        print(f"{len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Fit the analytic flow estimator to simulated days and report its error.
+
+Run ``python tools/calibrate_estimator.py`` to simulate a set of random
+boards across every city and level, fit src/estimator.py's delay
+parameters to them and print the error before and after fitting. Pass
+``--cache-dir`` to reuse simulated scores between runs and ``--output`` to
+save the fitted parameters as JSON.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+from pathlib import Path
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import main as game  # noqa: E402
+from estimator import FlowEstimator, calibrate, error_report  # noqa: E402
+from intersection import IntersectionType  # noqa: E402
+from layout import Layout, ScoreCache, simulate_layout  # noqa: E402
+from traffic_data import TRAFFIC_DATA  # noqa: E402
+
+LEVEL_GRIDS = {1: (1, 3), 2: (2, 3), 3: (3, 3)}
+
+
+def random_layout(level: int, rng: random.Random, fill: float = 0.9) -> Layout:
+    """A board for level with the game's markers and random intersections."""
+    rows, cols = LEVEL_GRIDS[level]
+    markers = game.generate_spawn_points(level, rows, cols, 0, 0, game.CELL_SIZE, rng=rng)
+    types = list(IntersectionType)
+    cells = [
+        (row, col, rng.choice(types), rng.randrange(4))
+        for row in range(rows) for col in range(cols)
+        if rng.random() < fill
+    ]
+    return Layout(rows, cols, game.CELL_SIZE,
+                  [(m['type'], m.get('number', 0), m['x'], m['y']) for m in markers], cells)
+
+
+def build_samples(count: int, seed: int, cache: ScoreCache | None = None) -> list[tuple]:
+    """(layout, city, level, simulated flow) for count random boards."""
+    rng = random.Random(seed)
+    cities = sorted(TRAFFIC_DATA)
+    samples = []
+    for index in range(count):
+        level = 1 + index % len(LEVEL_GRIDS)
+        city = cities[index % len(cities)]
+        layout = random_layout(level, rng)
+        run_seed = seed + index
+        if cache is not None:
+            result = cache.score(layout, city, level, run_seed)
+        else:
+            result = simulate_layout(layout, city, level, run_seed)
+        samples.append((layout, city, level, result['flow_rate']))
+    return samples
+
+
+def _print_report(title: str, report: dict) -> None:
+    print(f"{title:<12} n={report['count']}  bias {report['bias']:+.3f}  "
+          f"MAE {report['mean_abs_error']:.3f}  RMSE {report['rmse']:.3f}  "
+          f"max {report['max_abs_error']:.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Calibrate the analytic flow estimator.")
+    parser.add_argument("--samples", type=int, default=60, help="random boards to simulate")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--cache-dir", type=Path, default=None, help="score cache for simulated days")
+    parser.add_argument("--output", type=Path, default=None, help="write fitted parameters JSON here")
+    parser.add_argument("--verbose", action="store_true", help="print every sample")
+    args = parser.parse_args()
+
+    cache = ScoreCache(str(args.cache_dir)) if args.cache_dir else None
+    samples = build_samples(args.samples, args.seed, cache)
+
+    _print_report("default", error_report(FlowEstimator(), samples))
+    fitted = calibrate(samples)
+    report = error_report(fitted, samples)
+    _print_report("calibrated", report)
+    print(json.dumps(fitted.params, indent=2))
+    if args.verbose:
+        for row in report["rows"]:
+            print(f"  {row['city']:<14} L{row['level']}  sim {row['simulated']:.3f}  "
+                  f"est {row['estimated']:.3f}  err {row['error']:+.3f}")
+    if args.output:
+        args.output.write_text(json.dumps(fitted.params, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Replay a recorded session headlessly and report frame times and the final score.
+
+Record a session with ``python src/main.py --record session.bin``, then run
+``python tools/replay_session.py session.bin``. The replay uses the SDL
+dummy drivers, feeds the recorded frame times and inputs back into the game
+and processes frames as fast as possible, so the reported frame times are
+the real cost of each frame on this machine.
+
+Sessions recorded with ``--sandbox ROWSxCOLS`` replay with the same
+``--sandbox`` and ``--traffic`` options; the log does not store them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def frame_time_stats(frame_times: list[float]) -> dict:
+    """Summarize per-frame processing times (seconds) in milliseconds."""
+    ordered = sorted(frame_times)
+    count = len(ordered)
+    return {
+        "frames": count,
+        "mean_ms": 1000.0 * sum(ordered) / count if count else 0.0,
+        "p50_ms": 1000.0 * _percentile(ordered, 0.50),
+        "p95_ms": 1000.0 * _percentile(ordered, 0.95),
+        "p99_ms": 1000.0 * _percentile(ordered, 0.99),
+        "max_ms": 1000.0 * ordered[-1] if count else 0.0,
+    }
+
+
+def replay(log_path: Path | str, sandbox: str | None = None, traffic: str = "cars") -> dict:
+    """Run a recorded session to completion and return its report.
+
+    sandbox is the ROWSxCOLS board of a sandbox session (None for the game)
+    and traffic its traffic model.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    if str(SRC_DIR) not in sys.path:
+        sys.path.insert(0, str(SRC_DIR))
+
+    import pygame
+    import main as game
+    from input_log import ReplayInput
+
+    inputs = ReplayInput(log_path, game.WINDOW_WIDTH, game.WINDOW_HEIGHT)
+    results: dict = {}
+    pygame.init()
+    try:
+        if sandbox:
+            rows, cols = game.parse_board_size(sandbox)
+            asyncio.run(game.sandbox_main(rows, cols, seed=inputs.seed, inputs=inputs, traffic=traffic))
+        else:
+            asyncio.run(game.async_main(seed=inputs.seed, inputs=inputs, results=results))
+    except SystemExit:
+        pass
+
+    report = frame_time_stats(inputs.frame_times)
+    report.update({
+        "seed": inputs.seed,
+        "completed_log": inputs.finished,
+        "city": results.get("city"),
+        "level": results.get("level"),
+        "flow_rate": results.get("flow_rate"),
+        "delivered": results.get("delivered"),
+        "passed": results.get("passed"),
+    })
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay a recorded City Limits session headlessly.")
+    parser.add_argument("log_path", type=Path)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--sandbox", metavar="ROWSxCOLS", default=None,
+                        help="the session was recorded in the sandbox on a board of this size")
+    parser.add_argument("--traffic", choices=("cars", "cells"), default="cars",
+                        help="traffic model the sandbox session was recorded with")
+    args = parser.parse_args()
+
+    report = replay(args.log_path, args.sandbox, args.traffic)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"frames      {report['frames']}")
+    print(f"frame ms    mean {report['mean_ms']:.2f}  p50 {report['p50_ms']:.2f}  "
+          f"p95 {report['p95_ms']:.2f}  p99 {report['p99_ms']:.2f}  max {report['max_ms']:.2f}")
+    if report["flow_rate"] is not None:
+        print(f"flow rate   {report['flow_rate']:.4f}  ({report['delivered']} delivered, "
+              f"{report['city']} level {report['level']}, seed {report['seed']})")
+
+
+if __name__ == "__main__":
+    main()
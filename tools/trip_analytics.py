@@ -0,0 +1,186 @@
+"""Aggregate recorded trip telemetry: flow by hour, time percentiles and breakdowns.
+
+Record trips with ``python src/main.py --telemetry trips.cltr`` (or by
+passing a TelemetryWriter to a headless Simulation), then run
+``python tools/trip_analytics.py trips.cltr [more.cltr ...]``.
+
+Files are memory-mapped and reduced one chunk at a time with vectorized
+bincounts, so memory use stays flat however many gigabytes are scanned.
+Travel and idle time percentiles come from fixed-width histograms
+(--bin-width seconds), so they are exact to within one bin.
+
+Unroutable trips pass no intersections, so the by-type breakdown covers
+delivered trips only: it has no unroutable share, and its flow rates are
+not comparable with the overall, hourly, city or level ones.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from scoring import calculate_flow_rate  # noqa: E402
+from telemetry import CITIES, STATUS_DELIVERED, TYPE_COLUMNS, read_chunks  # noqa: E402
+
+PERCENTILES = (50, 90, 95, 99)
+DEFAULT_BIN_WIDTH = 0.05   # seconds per histogram bin
+DEFAULT_MAX_SECONDS = 900.0  # longer times land in the last bin
+MAX_LEVELS = 16
+
+
+class _Groups:
+    """Running per-key sums for one grouping of the trips."""
+
+    def __init__(self, size: int):
+        self.attempts = np.zeros(size, dtype=np.int64)
+        self.delivered = np.zeros(size, dtype=np.int64)
+        self.distance = np.zeros(size)
+        self.travel = np.zeros(size)
+        self.idle = np.zeros(size)
+
+    def add(self, keys: np.ndarray, delivered: np.ndarray, distance: np.ndarray,
+            travel: np.ndarray, idle: np.ndarray) -> None:
+        size = len(self.attempts)
+        self.attempts += np.bincount(keys, minlength=size)[:size]
+        self.delivered += np.bincount(keys, weights=delivered, minlength=size)[:size].astype(np.int64)
+        self.distance += np.bincount(keys, weights=distance, minlength=size)[:size]
+        self.travel += np.bincount(keys, weights=travel, minlength=size)[:size]
+        self.idle += np.bincount(keys, weights=idle, minlength=size)[:size]
+
+    def row(self, index: int, delivered_only: bool = False) -> dict:
+        """Totals for one key; delivered_only groups leave out the unroutable share."""
+        delivered = int(self.delivered[index])
+        attempts = int(self.attempts[index])
+        stats = [(self.distance[index], self.travel[index], self.idle[index])] if delivered else []
+        row = {
+            "trips": attempts,
+            "delivered": delivered,
+            "unroutable_share": 1.0 - delivered / attempts if attempts else 0.0,
+            "flow_rate": calculate_flow_rate(stats, attempts, delivered),
+            "mean_travel": self.travel[index] / delivered if delivered else 0.0,
+            "mean_idle": self.idle[index] / delivered if delivered else 0.0,
+        }
+        if delivered_only:
+            del row["unroutable_share"]
+        return row
+
+
+def _percentiles(histogram: np.ndarray, bin_width: float) -> dict:
+    total = histogram.sum()
+    if total == 0:
+        return {f"p{p}": 0.0 for p in PERCENTILES}
+    cumulative = np.cumsum(histogram)
+    result = {}
+    for p in PERCENTILES:
+        index = int(np.searchsorted(cumulative, total * p / 100.0))
+        result[f"p{p}"] = (index + 0.5) * bin_width
+    return result
+
+
+def summarize(paths: list[Path | str], bin_width: float = DEFAULT_BIN_WIDTH,
+              max_seconds: float = DEFAULT_MAX_SECONDS) -> dict:
+    """Scan telemetry files chunk by chunk and return the report."""
+    bins = int(max_seconds / bin_width) + 1
+    by_hour = _Groups(24)
+    by_city = _Groups(len(CITIES) + 1)  # last slot: unknown cities
+    by_level = _Groups(MAX_LEVELS)
+    by_type = _Groups(len(TYPE_COLUMNS))
+    overall = _Groups(1)
+    travel_hist = np.zeros(bins, dtype=np.int64)
+    idle_hist = np.zeros(bins, dtype=np.int64)
+    rows = 0
+
+    for path in paths:
+        for chunk in read_chunks(str(path)):
+            count = len(chunk["status"])
+            if not count:
+                continue
+            rows += count
+            delivered = chunk["status"] == STATUS_DELIVERED
+            weight = delivered.astype(np.float64)
+            distance = chunk["path_length"] * weight
+            travel = chunk["travel_time"] * weight
+            idle = chunk["idle_time"] * weight
+            sums = (weight, distance, travel, idle)
+
+            overall.add(np.zeros(count, dtype=np.intp), *sums)
+            by_hour.add(chunk["hour"].astype(np.intp) % 24, *sums)
+            by_city.add(np.minimum(chunk["city"], len(CITIES)).astype(np.intp), *sums)
+            by_level.add(np.minimum(chunk["level"], MAX_LEVELS - 1).astype(np.intp), *sums)
+
+            # A delivered trip counts towards every intersection type it passes
+            # through; unroutable trips pass none.
+            for index, name in enumerate(TYPE_COLUMNS):
+                uses = (chunk[name] > 0) & delivered
+                if uses.any():
+                    keys = np.full(int(uses.sum()), index, dtype=np.intp)
+                    by_type.add(keys, weight[uses], distance[uses], travel[uses], idle[uses])
+
+            travel_hist += np.bincount(
+                np.minimum(chunk["travel_time"][delivered] / bin_width, bins - 1).astype(np.intp),
+                minlength=bins,
+            )
+            idle_hist += np.bincount(
+                np.minimum(chunk["idle_time"][delivered] / bin_width, bins - 1).astype(np.intp),
+                minlength=bins,
+            )
+
+    city_names = list(CITIES) + ["(other)"]
+    return {
+        "rows": rows,
+        "overall": overall.row(0),
+        "travel_time": _percentiles(travel_hist, bin_width),
+        "idle_time": _percentiles(idle_hist, bin_width),
+        "by_hour": {hour: by_hour.row(hour) for hour in range(24) if by_hour.attempts[hour]},
+        "by_city": {city_names[i]: by_city.row(i) for i in range(len(city_names)) if by_city.attempts[i]},
+        "by_level": {level: by_level.row(level) for level in range(MAX_LEVELS) if by_level.attempts[level]},
+        "by_type": {TYPE_COLUMNS[i][2:]: by_type.row(i, delivered_only=True)
+                    for i in range(len(TYPE_COLUMNS)) if by_type.attempts[i]},
+    }
+
+
+def _print_table(title: str, groups: dict, unroutable: bool = True) -> None:
+    print(f"\n{title}")
+    column = f" {'unroutable':>10}" if unroutable else ""
+    print(f"  {'':<20} {'trips':>9} {'flow':>6}{column} {'travel s':>9} {'idle s':>7}")
+    for key, row in groups.items():
+        share = f" {row['unroutable_share']:>10.1%}" if unroutable else ""
+        print(f"  {str(key):<20} {row['trips']:>9} {row['flow_rate']:>6.3f}{share} "
+              f"{row['mean_travel']:>9.2f} {row['mean_idle']:>7.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Aggregate City Limits trip telemetry.")
+    parser.add_argument("paths", type=Path, nargs="+", help="telemetry files written with --telemetry")
+    parser.add_argument("--bin-width", type=float, default=DEFAULT_BIN_WIDTH,
+                        help="histogram resolution for percentiles, in seconds")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = summarize(args.paths, bin_width=args.bin_width)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    overall = report["overall"]
+    print(f"{report['rows']} trips, {overall['delivered']} delivered, flow rate {overall['flow_rate']:.3f}")
+    for name in ("travel_time", "idle_time"):
+        values = "  ".join(f"{key} {value:.2f}" for key, value in report[name].items())
+        print(f"{name:<12} {values}")
+    _print_table("By hour", report["by_hour"])
+    _print_table("By city", report["by_city"])
+    _print_table("By level", report["by_level"])
+    _print_table("By intersection type (delivered trips passing at least one; delivered-only flow)",
+                 report["by_type"], unroutable=False)
+
+
+if __name__ == "__main__":
+    main()